@@ -0,0 +1,166 @@
+"""
+Throughput of the WSGI and ASGI applications with a slow database.
+
+Every query is delayed by `delay` seconds to stand in for a loaded
+database. The WSGI application serves the sync views from a fixed number
+of threads, like the uWSGI workers of `scripts/run.sh`, and the ASGI
+application serves config.asgi_urls with up to `concurrency` requests in
+flight on one event loop. Both get the same requests to the hot read
+endpoints and report requests per second.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO
+from itertools import cycle, islice
+from time import perf_counter, sleep
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+from django.db.backends.utils import CursorWrapper
+from django.test.utils import override_settings
+from django.urls import reverse
+
+
+ASGI_URLCONF = 'config.asgi_urls'
+
+
+def get_paths(data):
+    """Return the paths of the hot read endpoints"""
+    blog = data['blog']
+    return [
+        reverse('blog:blogs'),
+        reverse('blog:detail', args=[blog.slug]),
+        reverse('blog:category_list'),
+        reverse('comment:comments', args=[blog.id]),
+    ]
+
+
+@contextmanager
+def slow_queries(delay):
+    """Delay every query by delay seconds, in every thread"""
+    execute = CursorWrapper.execute
+
+    def slow_execute(self, *args, **kwargs):
+        sleep(delay)
+        return execute(self, *args, **kwargs)
+
+    with patch.object(CursorWrapper, 'execute', slow_execute):
+        yield
+
+
+def wsgi_get(handler, path):
+    """Send a GET request to a WSGI application and return its status"""
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': BytesIO(),
+    }
+    statuses = []
+    response = handler(environ, lambda status, headers: statuses.append(
+        int(status.split()[0])
+    ))
+    for _ in response:
+        pass
+    response.close()
+    return statuses[0]
+
+
+async def asgi_get(handler, path):
+    """Send a GET request to an ASGI application and return its status"""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'root_path': '',
+        'query_string': b'',
+        'headers': [(b'host', b'testserver')],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 50000),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await handler(scope, receive, send)
+    return messages[0]['status']
+
+
+def check(statuses):
+    failed = [status for status in statuses if status >= 400]
+    if failed:
+        raise RuntimeError(f'Benchmark request failed with {failed[0]}')
+
+
+def run_wsgi(paths, workers):
+    """Serve paths with the WSGI application from workers threads"""
+    handler = WSGIHandler()
+
+    def serve(path):
+        try:
+            return wsgi_get(handler, path)
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(workers) as executor:
+        check(list(executor.map(serve, paths)))
+
+
+def run_asgi(paths, concurrency):
+    """Serve paths with the ASGI application, concurrency at a time"""
+    handler = ASGIHandler()
+
+    async def serve_all():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def serve(path):
+            async with semaphore:
+                return await asgi_get(handler, path)
+
+        return await asyncio.gather(*(serve(path) for path in paths))
+
+    with override_settings(ROOT_URLCONF=ASGI_URLCONF):
+        check(asyncio.run(serve_all()))
+
+
+def throughput(function, paths, *args):
+    start = perf_counter()
+    function(paths, *args)
+    elapsed = perf_counter() - start
+    return {
+        'requests': len(paths),
+        'seconds': round(elapsed, 3),
+        'rps': round(len(paths) / elapsed, 1),
+    }
+
+
+def run(data, requests=200, workers=4, concurrency=50, delay=0.05):
+    """Return WSGI and ASGI throughput of the hot read endpoints"""
+    paths = list(islice(cycle(get_paths(data)), requests))
+    results = {}
+    with slow_queries(delay):
+        cache.clear()
+        results['wsgi'] = throughput(run_wsgi, paths, workers)
+        cache.clear()
+        results['asgi'] = throughput(run_asgi, paths, concurrency)
+    results['speedup'] = round(
+        results['asgi']['rps'] / results['wsgi']['rps'], 1,
+    )
+    return results
@@ -0,0 +1,125 @@
+"""
+Synthetic data for benchmarks.
+
+Rows are inserted with bulk_create and a single precomputed password
+hash, and the generator is seeded so runs are comparable.
+"""
+from itertools import islice
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from blog.likes import Like, sync_like_counts
+from core.models import Blog, Category, Comment
+
+
+BATCH_SIZE = 1000
+
+
+def phone_numbers(start=0):
+    """Yield distinct valid phone numbers"""
+    number = start
+    while True:
+        yield f'98912{number:07d}'
+        number += 1
+
+
+def generate(users=50, categories=10, blogs=200, comments=5, replies=2,
+             likes=10, seed=0):
+    """Create users, nested categories, published blogs, likes and comments
+
+    `comments` top level comments are written on every blog and each gets
+    `replies` replies. Every blog is liked by up to `likes` users.
+    """
+    rng = random.Random(seed)
+    password = make_password('benchmark')
+    User = get_user_model()
+
+    user_objs = User.objects.bulk_create(
+        (
+            User(phone=phone, first_name=f'user {index}', password=password)
+            for index, phone in enumerate(islice(phone_numbers(), users))
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+    category_objs = []
+    for index in range(categories):
+        parent = rng.choice(category_objs) if category_objs else None
+        category_objs.append(Category.objects.create(
+            title=f'category {index}',
+            slug=f'category-{index}',
+            parent=parent if rng.random() < 0.5 else None,
+            status=True,
+        ))
+
+    blog_objs = Blog.objects.bulk_create(
+        (
+            Blog(
+                author=rng.choice(user_objs),
+                title=f'blog {index}',
+                slug=f'blog-{index}',
+                body=' '.join(['lorem ipsum dolor sit amet'] * 50),
+                summery='lorem ipsum',
+                image='blogs/image.jpg',
+                status='p',
+            )
+            for index in range(blogs)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+    Blog.category.through.objects.bulk_create(
+        (
+            Blog.category.through(blog_id=blog.id, category_id=category.id)
+            for blog in blog_objs
+            for category in rng.sample(
+                category_objs, min(2, len(category_objs))
+            )
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    Like.objects.bulk_create(
+        (
+            Like(blog_id=blog.id, user_id=user.id)
+            for blog in blog_objs
+            for user in rng.sample(user_objs, min(likes, len(user_objs)))
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    sync_like_counts([blog.id for blog in blog_objs])
+
+    content_type = Comment.objects.content_type_for(Blog)
+    roots = Comment.objects.bulk_create(
+        (
+            Comment(
+                user=rng.choice(user_objs),
+                content_type=content_type,
+                object_id=blog.id,
+                body='comment',
+            )
+            for blog in blog_objs
+            for _ in range(comments)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    Comment.objects.bulk_create(
+        (
+            Comment(
+                user=rng.choice(user_objs),
+                content_type=content_type,
+                object_id=root.object_id,
+                parent_id=root.id,
+                body='reply',
+            )
+            for root in roots
+            for _ in range(replies)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+    return {
+        'blog': blog_objs[0],
+        'category': category_objs[0] if category_objs else None,
+    }
@@ -0,0 +1,71 @@
+"""
+Benchmark of OTP verification as the PhoneOtp table grows.
+
+The table is filled with COPY (or bulk_create off PostgreSQL) up to each
+requested size, then codes of phones spread over the table are verified.
+Latency and queries per request should not depend on the table size.
+"""
+from django.core.cache import caches
+from django.db import connection
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from benchmarks.runner import measure
+from core.models import PhoneOtp
+from core.seed import load
+from extensions.code_generator import otp_generator
+from user.otp import save_code
+
+
+def otp_phone(number):
+    return f'98914{number:07d}'
+
+
+def fill(start, stop):
+    """Create PhoneOtp rows numbered from start up to stop"""
+    rows = (
+        (otp_phone(number), otp_generator(), 1, False)
+        for number in range(start, stop)
+    )
+    load(
+        PhoneOtp, ('phone', 'otp', 'count', 'verify'), rows,
+        batch_size=5000, use_copy=connection.vendor == 'postgresql',
+    )
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {PhoneOtp._meta.db_table}')
+
+
+def verify_flow(client, rows, requests):
+    """Verify codes of phones spread evenly over the first rows
+
+    Every request also stores its code first, one write to the OTP store.
+    """
+    step = max(rows // requests, 1)
+    pending = []
+    for number in range(0, step * requests, step):
+        phone, code = otp_phone(number % max(rows, 1)), otp_generator()
+        pending.append((phone, code))
+
+    def send():
+        phone, code = pending.pop()
+        save_code(phone, code)
+        return client.post(
+            reverse('user:verify'), {'phone': phone, 'code': code},
+        )
+
+    return send
+
+
+def run(sizes, iterations=50, warmup=5):
+    """Return verification results by PhoneOtp table size"""
+    client = APIClient()
+    results, filled = {}, 0
+    for size in sorted(sizes):
+        caches['throttle'].clear()
+        fill(filled, size)
+        filled = max(filled, size)
+        send = verify_flow(client, size, iterations + warmup)
+        results[size] = measure(send, iterations, warmup)
+    return results
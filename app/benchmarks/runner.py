@@ -0,0 +1,160 @@
+"""
+In-process request benchmarks for the public API.
+
+Each benchmark sends requests through the full Django stack with the
+test client and reports p50/p95/p99 latency in milliseconds and the mean
+number of queries per request. Results can be saved as a baseline and
+later runs compared against it.
+"""
+import json
+from math import ceil
+from time import perf_counter
+from unittest.mock import patch
+
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from benchmarks.data import phone_numbers
+
+
+def percentile(values, percent):
+    """Return the nearest-rank percentile of values"""
+    ordered = sorted(values)
+    rank = max(ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def otp_flow(client):
+    """Register a new phone and verify the code sent to it
+
+    Every flow comes from its own address, so the per-address OTP
+    throttle is checked but never reached.
+    """
+    phones = phone_numbers(start=5000000)
+    sent = {}
+
+    def send_otp(*, phone, otp):
+        sent[phone] = otp
+
+    def send():
+        phone = next(phones)
+        address = f'10.{phone[-6:-4]}.{phone[-4:-2]}.{phone[-2:]}'
+        with patch('user.views.send_otp', send_otp):
+            client.post(
+                reverse('user:register'), {'phone': phone},
+                REMOTE_ADDR=address,
+            )
+        return client.post(
+            reverse('user:verify'), {'phone': phone, 'code': sent.pop(phone)},
+        )
+
+    return send
+
+
+def get_benchmarks(client, data):
+    """Return benchmark names mapped to callables sending one request"""
+    blog, category = data['blog'], data['category']
+
+    def get(url, params=None):
+        return lambda: client.get(url, params)
+
+    benchmarks = {
+        'blog:blogs': get(reverse('blog:blogs')),
+        'blog:blogs?pagination=cursor': get(
+            reverse('blog:blogs'), {'pagination': 'cursor'},
+        ),
+        'blog:blogs?search': get(reverse('blog:blogs'), {'search': 'lorem'}),
+        'blog:detail': get(reverse('blog:detail', args=[blog.slug])),
+        'blog:category_list': get(reverse('blog:category_list')),
+        'comment:comments': get(reverse('comment:comments', args=[blog.id])),
+        'comment:comment_tree': get(
+            reverse('comment:comment_tree', args=[blog.id]),
+        ),
+        'user:otp': otp_flow(client),
+    }
+    if category is not None:
+        benchmarks['blog:category_blog'] = get(
+            reverse('blog:category_blog', args=[category.slug]),
+        )
+    return benchmarks
+
+
+def measure(send, iterations, warmup):
+    """Time send and count its queries over a number of iterations"""
+    for _ in range(warmup):
+        send()
+
+    timings, queries = [], []
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as context:
+            start = perf_counter()
+            response = send()
+            elapsed = perf_counter() - start
+        if response.status_code >= 400:
+            raise RuntimeError(
+                f'Benchmark request failed with {response.status_code}'
+            )
+        timings.append(elapsed * 1000)
+        queries.append(len(context.captured_queries))
+
+    return {
+        'p50': round(percentile(timings, 50), 3),
+        'p95': round(percentile(timings, 95), 3),
+        'p99': round(percentile(timings, 99), 3),
+        'queries': round(sum(queries) / len(queries), 2),
+    }
+
+
+def run(data, iterations=50, warmup=5, names=None):
+    """Run the benchmarks and return their results by name"""
+    client = APIClient()
+    results = {}
+    for name, send in get_benchmarks(client, data).items():
+        if names and name not in names:
+            continue
+        cache.clear()
+        caches['throttle'].clear()
+        results[name] = measure(send, iterations, warmup)
+    return results
+
+
+def compare(results, baseline, threshold, min_delta=1.0):
+    """Return a message for every result regressed beyond threshold
+
+    Latency regresses when p95 grows by more than threshold, a fraction
+    of the baseline, and by more than min_delta milliseconds, so timer
+    noise on very fast endpoints is ignored. Queries regress when they
+    grow at all.
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        limit = max(
+            expected['p95'] * (1 + threshold), expected['p95'] + min_delta,
+        )
+        if result['p95'] > limit:
+            regressions.append(
+                f'{name}: p95 {result["p95"]}ms > {expected["p95"]}ms'
+            )
+        if result['queries'] > expected['queries']:
+            regressions.append(
+                f'{name}: {result["queries"]} queries > {expected["queries"]}'
+            )
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as baseline:
+        return json.load(baseline)
+
+
+def save_baseline(path, results):
+    with open(path, 'w') as baseline:
+        json.dump(results, baseline, indent=2, sort_keys=True)
+        baseline.write('\n')
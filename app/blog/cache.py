@@ -0,0 +1,81 @@
+"""
+Response cache for blog details.
+
+Serialized details are cached by slug together with the version of the
+blog they were built from. Every blog has a random version token under
+its own key; changing the blog replaces the token, which invalidates all
+cached details of that blog without knowing their slugs. A token that is
+evicted from the cache is replaced by a new one, so an old entry can
+never become valid again.
+
+Readers take the token before reading the blog and writers replace it
+once their transaction is committed, so a detail built from data older
+than a change is always cached under a token older than the change.
+Tokens are read from the shared cache rather than the per-process tier
+of the default cache, so a change made in any process invalidates the
+details cached by every other process at once.
+"""
+from hashlib import md5
+import json
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+
+def detail_key(slug):
+    return f'blog:detail:{slug}'
+
+
+def version_key(pk):
+    return f'blog:version:{pk}'
+
+
+def get_version(pk):
+    """Return the current version token of a blog, creating it if needed"""
+    versions = caches['shared']
+    version = versions.get(version_key(pk))
+    if version is None:
+        versions.add(version_key(pk), uuid4().hex, None)
+        version = versions.get(version_key(pk))
+    return version
+
+
+def get_detail(slug):
+    """Return the cached detail entry of slug if it is still current"""
+    entry = cache.get(detail_key(slug))
+    if entry is None:
+        return None
+    if caches['shared'].get(version_key(entry['data']['id'])) != entry['version']:
+        return None
+    return entry
+
+
+def detail_etag(data):
+    """Return the ETag of serialized blog data"""
+    content = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return f'"{md5(content.encode()).hexdigest()}"'
+
+
+def set_detail(slug, data, version):
+    """Cache serialized data of a blog and return the new entry
+
+    version is the token taken before the blog was read.
+    """
+    entry = {
+        'data': data,
+        'version': version,
+        'etag': detail_etag(data),
+    }
+    cache.set(detail_key(slug), entry, settings.BLOG_DETAIL_CACHE_TIMEOUT)
+    return entry
+
+
+def invalidate_blogs(pks):
+    """Invalidate every cached detail of the given blogs once committed"""
+    pks = list(pks)
+    transaction.on_commit(lambda: caches['shared'].set_many(
+        {version_key(pk): uuid4().hex for pk in pks}, None,
+    ))
@@ -0,0 +1,54 @@
+"""
+Cached tree of active categories.
+
+The tree is built from `CategoryManager.active()` with one query and
+kept in the cache until a category change is committed, or for
+`CATEGORY_TREE_CACHE_TIMEOUT` seconds at most, since a tree being built
+from the state before a change may be cached just after it.
+Descendants are found by the materialized `Category.path`, so subtree
+lookups need no recursion and no queries.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.models import Category
+
+
+TREE_KEY = 'blog:category-tree'
+
+
+class CategoryTree:
+    """Active categories indexed by slug, with subtree lookups"""
+
+    def __init__(self, categories):
+        self.categories = categories
+        self.by_slug = {category.slug: category for category in categories}
+
+    def get(self, slug):
+        return self.by_slug.get(slug)
+
+    def subtree_ids(self, category):
+        """Return ids of category and its active descendants"""
+        return [
+            node.id for node in self.categories
+            if node.path.startswith(category.path)
+        ]
+
+
+def get_active_tree():
+    """Return the cached tree of active categories, building it if needed"""
+    return cache.get_or_set(
+        TREE_KEY, build_tree, settings.CATEGORY_TREE_CACHE_TIMEOUT,
+    )
+
+
+def build_tree():
+    return CategoryTree(
+        list(Category.objects.active().select_related('parent'))
+    )
+
+
+def invalidate_tree():
+    """Drop the cached tree once the current transaction is committed"""
+    transaction.on_commit(lambda: cache.delete(TREE_KEY))
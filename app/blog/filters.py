@@ -0,0 +1,52 @@
+import operator
+from functools import reduce
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, Q
+
+from rest_framework.filters import SearchFilter
+
+
+class FullTextSearchFilter(SearchFilter):
+    """Ranked full-text search over the maintained blog search vector
+
+    On PostgreSQL `?search=` matches the GIN indexed `search_vector` column
+    and orders results by rank. The view's `search_fields` that are not in
+    the vector, such as the author's name, are matched with the icontains
+    lookups of SearchFilter instead and OR'd with the vector match; those
+    results rank last. Other databases fall back to SearchFilter over all
+    of `search_fields`.
+    """
+
+    search_config = 'simple'
+    vector_field = 'search_vector'
+    vector_columns = ('title', 'summery', 'body')
+
+    def filter_queryset(self, request, queryset, view):
+        if connections[queryset.db].vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+
+        query = SearchQuery(
+            ' '.join(search_terms), config=self.search_config,
+        )
+        condition = Q(**{self.vector_field: query})
+        other_lookups = [
+            self.construct_search(str(field))
+            for field in self.get_search_fields(view, request) or ()
+            if str(field) not in self.vector_columns
+        ]
+        if other_lookups:
+            condition |= reduce(operator.and_, (
+                reduce(operator.or_, (
+                    Q(**{lookup: term}) for lookup in other_lookups
+                ))
+                for term in search_terms
+            ))
+        return queryset.filter(condition).annotate(
+            rank=SearchRank(F(self.vector_field), query),
+        ).order_by('-rank', *queryset.model._meta.ordering)
@@ -0,0 +1,266 @@
+"""
+Image pipeline for blog images.
+
+Uploaded images are kept as the original plus resized copies for every
+width in `BLOG_IMAGE_WIDTHS` that is smaller than the image, encoded in
+every format of `BLOG_IMAGE_FORMATS` this Pillow build can write. EXIF,
+XMP and IPTC metadata and comments are stripped from the copies and
+from the original, which keeps only its orientation tag and, for JPEG,
+its quantization tables so it is not recompressed. Multi-picture (MPO)
+originals of phone cameras are stored as a JPEG of their first picture;
+animated GIF and WebP originals keep all their frames.
+
+Images are processed after the upload is committed by a per-process
+pool of `BLOG_IMAGE_WORKERS` threads, not in the request. Jobs are not
+persisted: images of a worker that dies before processing them keep
+their original only until `process_images` is run.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+import logging
+import math
+import os
+import posixpath
+import threading
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection
+
+from PIL import Image, ImageOps, JpegImagePlugin, features
+
+from blog.cache import invalidate_blogs
+from core.models import Blog
+from extensions.upload_file_path import get_file_name_ext
+
+
+logger = logging.getLogger(__name__)
+
+ORIENTATION = 0x0112
+XMP_HEADER = b'http://ns.adobe.com/xap/1.0/\x00'
+# Keys of Image.info holding metadata that saving would drop
+METADATA_KEYS = {'comment', 'photoshop', 'xmp', 'XML:com.adobe.xmp'}
+EXTENSIONS = {'jpeg': 'jpg', 'webp': 'webp'}
+
+
+def available_formats():
+    """Return the configured variant formats this Pillow build can write"""
+    return [
+        fmt for fmt in settings.BLOG_IMAGE_FORMATS
+        if fmt != 'webp' or features.check('webp')
+    ]
+
+
+def variant_widths(width):
+    """Return the variant widths of an image `width` pixels wide"""
+    widths = sorted(w for w in set(settings.BLOG_IMAGE_WIDTHS) if w < width)
+    return widths or [width]
+
+
+def variant_name(name, width, fmt):
+    stem, _ = get_file_name_ext(name)
+    directory = posixpath.join(posixpath.dirname(name), 'variants')
+    return posixpath.join(directory, f'{stem}-{width}.{EXTENSIONS[fmt]}')
+
+
+def replace(storage, name, content):
+    """Write content to name, replacing an existing file"""
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, ContentFile(content))
+
+
+def has_metadata(image):
+    """Return whether image carries metadata besides its orientation"""
+    if image.format == 'MPO' or set(image.getexif()) - {ORIENTATION}:
+        return True
+    if METADATA_KEYS & set(image.info):
+        return True
+    # JPEG XMP is only listed among the APP segments
+    return any(
+        marker == 'APP1' and content.startswith(XMP_HEADER)
+        for marker, content in getattr(image, 'applist', ())
+    )
+
+
+def frame_durations(image):
+    """Return the display time of every frame of an animated image"""
+    durations = []
+    for frame in range(image.n_frames):
+        image.seek(frame)
+        durations.append(image.info.get('duration', 0))
+    image.seek(0)
+    return durations
+
+
+def strip_original(image):
+    """Return image encoded without metadata but its orientation
+
+    JPEG images keep their quantization tables and subsampling, so the
+    pixels are stored again without another lossy pass. MPO images,
+    which Pillow can not write, are written as a JPEG of their first
+    picture. Animated GIF and WebP images keep all their frames with
+    their durations and loop count.
+    """
+    exif = Image.Exif()
+    orientation = image.getexif().get(ORIENTATION)
+    if orientation:
+        exif[ORIENTATION] = orientation
+    params = {'exif': exif.tobytes()}
+    fmt = image.format
+    if fmt in ('JPEG', 'MPO'):
+        fmt = 'JPEG'
+        params.update(
+            qtables=image.quantization,
+            subsampling=JpegImagePlugin.get_sampling(image),
+        )
+    elif getattr(image, 'is_animated', False):
+        # Saving all GIF frames copies the comment of the first one
+        params.update(
+            save_all=True, duration=frame_durations(image), comment=b'',
+        )
+        if 'loop' in image.info:
+            params['loop'] = image.info['loop']
+    if 'icc_profile' in image.info:
+        params['icc_profile'] = image.info['icc_profile']
+
+    output = BytesIO()
+    image.save(output, format=fmt, **params)
+    return output.getvalue()
+
+
+def draft(image, width):
+    """Let JPEG decoding downscale to no less than width when displayed"""
+    raw_width, raw_height = image.size
+    rotated = image.getexif().get(ORIENTATION) in (5, 6, 7, 8)
+    scale = width / (raw_height if rotated else raw_width)
+    if scale < 1:
+        image.draft('RGB', (math.ceil(raw_width * scale),
+                            math.ceil(raw_height * scale)))
+
+
+def encode(image, fmt, icc_profile=None):
+    """Return image encoded as fmt, without any metadata"""
+    if fmt == 'jpeg' and image.mode != 'RGB':
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        else:
+            image = image.convert('RGB')
+    elif fmt == 'webp' and image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    params = {'quality': settings.BLOG_IMAGE_QUALITY}
+    if fmt == 'jpeg':
+        params.update(optimize=True, progressive=True)
+    else:
+        params['method'] = 4
+    if icc_profile:
+        params['icc_profile'] = icc_profile
+
+    output = BytesIO()
+    image.save(output, format=fmt.upper(), **params)
+    return output.getvalue()
+
+
+def process_image(name, storage=None):
+    """Strip the image stored at name and write its variants
+
+    Returns the name of the stripped original and the variant names by
+    format and width.
+    """
+    storage = storage or Blog._meta.get_field('image').storage
+    with storage.open(name) as file:
+        image = Image.open(file)
+        icc_profile = image.info.get('icc_profile')
+        if has_metadata(image):
+            name = replace(storage, name, strip_original(image))
+        else:
+            draft(image, max(settings.BLOG_IMAGE_WIDTHS))
+        image = ImageOps.exif_transpose(image)
+
+    variants = {}
+    for fmt in available_formats():
+        variants[fmt] = {}
+        for width in variant_widths(image.width):
+            height = max(round(image.height * width / image.width), 1)
+            resized = image
+            if width != image.width:
+                resized = image.resize(
+                    (width, height), Image.LANCZOS, reducing_gap=3.0,
+                )
+            variants[fmt][str(width)] = replace(
+                storage, variant_name(name, width, fmt),
+                encode(resized, fmt, icc_profile),
+            )
+    return name, variants
+
+
+def process_blog_image(blog_id, name):
+    """Process the image of a blog unless it was replaced meanwhile"""
+    try:
+        image, variants = process_image(name)
+        updated = Blog.objects.filter(pk=blog_id, image=name).update(
+            image=image, image_variants=variants,
+        )
+        if updated:
+            invalidate_blogs([blog_id])
+    except Exception:
+        logger.exception('Could not process image %s of blog %s',
+                         name, blog_id)
+
+
+def variant_urls(blog, request=None):
+    """Return urls of the image variants of blog by format and width"""
+    storage = Blog._meta.get_field('image').storage
+    urls = {}
+    for fmt, names in (blog.image_variants or {}).items():
+        urls[fmt] = {}
+        for width, name in names.items():
+            url = storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls[fmt][width] = url
+    return urls
+
+
+class ImageProcessor:
+    """Per-process thread pool processing uploaded blog images"""
+
+    def __init__(self):
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def executor(self):
+        """Start the pool once per process, including forked workers"""
+        if self._pid == os.getpid():
+            return self._executor
+
+        with self._lock:
+            if self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.BLOG_IMAGE_WORKERS,
+                    thread_name_prefix='blog-image',
+                )
+                self._pid = os.getpid()
+        return self._executor
+
+    def submit(self, blog_id, name):
+        """Process the image in the pool, or now without workers"""
+        if settings.BLOG_IMAGE_WORKERS <= 0:
+            process_blog_image(blog_id, name)
+            return None
+        return self.executor().submit(self.run, blog_id, name)
+
+    @staticmethod
+    def run(blog_id, name):
+        try:
+            process_blog_image(blog_id, name)
+        finally:
+            connection.close()
+
+
+processor = ImageProcessor()
@@ -0,0 +1,73 @@
+"""
+Like engine for blogs.
+
+Likes are toggled directly on the through table with one conditional
+DELETE or INSERT, and `Blog.like_count` is adjusted in the same
+transaction with an F() expression, so concurrent toggles never read
+the list of likers nor lose an update.
+"""
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.cache import invalidate_blogs
+from core.models import Blog
+
+
+Like = Blog.likes.through
+
+
+def _insert_like(blog_id, user_id):
+    """Insert a like unless it exists and return the inserted row count"""
+    table = connection.ops.quote_name(Like._meta.db_table)
+    blog_column = connection.ops.quote_name(Like._meta.get_field('blog').column)
+    user_column = connection.ops.quote_name(Like._meta.get_field('user').column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({blog_column}, {user_column}) '
+            f'VALUES (%s, %s) ON CONFLICT DO NOTHING',
+            [blog_id, user_id],
+        )
+        return cursor.rowcount
+
+
+def toggle_like(blog_id, user_id):
+    """Like or unlike a blog and return whether the user now likes it"""
+    with transaction.atomic():
+        removed, _ = Like.objects.filter(
+            blog_id=blog_id, user_id=user_id
+        ).delete()
+        if removed:
+            liked, delta = False, -1
+        else:
+            # A concurrent request may have inserted the like first, in
+            # which case the row exists and the counter is already right.
+            liked, delta = True, _insert_like(blog_id, user_id)
+
+        if delta:
+            Blog.objects.filter(pk=blog_id).update(
+                like_count=F('like_count') + delta
+            )
+
+    if delta:
+        invalidate_blogs([blog_id])
+    return liked
+
+
+def liked_blog_ids(user_id, blog_ids):
+    """Return the ids among blog_ids that the user likes, in one query"""
+    return set(
+        Like.objects.filter(
+            user_id=user_id, blog_id__in=blog_ids
+        ).values_list('blog_id', flat=True)
+    )
+
+
+def sync_like_counts(blog_ids):
+    """Recompute like_count of the given blogs from the through table"""
+    likes = Like.objects.filter(
+        blog=OuterRef('pk')
+    ).order_by().values('blog').annotate(count=Count('*')).values('count')
+    Blog.objects.filter(pk__in=blog_ids).update(
+        like_count=Coalesce(Subquery(likes), 0)
+    )
@@ -1,8 +1,288 @@
-from rest_framework.pagination import LimitOffsetPagination
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import datetime
+import json
 
+from django.db.models import Q
 
-class LimitOffsetPaginationBlog(LimitOffsetPagination):
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from extensions.count_estimator import estimate_count
+
+
+COUNT_EXACT = 'exact'
+COUNT_ESTIMATE = 'estimate'
+COUNT_NONE = 'none'
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATE, COUNT_NONE)
+
+
+class CountModeMixin:
+    """Lets the client choose how the total count is computed
+
+    `?count=exact` runs COUNT(*), `?count=estimate` uses the planner
+    estimate and `?count=none` skips counting altogether.
+    """
+
+    count_query_param = 'count'
+    count_mode = COUNT_EXACT
+
+    def get_count_mode(self, request):
+        mode = request.query_params.get(self.count_query_param)
+        if mode in COUNT_MODES:
+            return mode
+        return self.count_mode
+
+    def get_total_count(self, queryset):
+        if self.mode == COUNT_EXACT:
+            return queryset.count()
+        if self.mode == COUNT_ESTIMATE:
+            return estimate_count(queryset)
+        return None
+
+    def get_count_schema_parameter(self):
+        return {
+            'name': self.count_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'How to compute the total count.',
+            'schema': {'type': 'string', 'enum': list(COUNT_MODES)},
+        }
+
+
+class LimitOffsetPaginationBlog(CountModeMixin, LimitOffsetPagination):
     """Pagination for blog page"""
 
     default_limit = 20
     max_limit = 20
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.mode = self.get_count_mode(request)
+        if self.mode == COUNT_EXACT:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.offset = self.get_offset(request)
+        self.request = request
+        results = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(results) > self.limit
+        self.count = self.get_total_count(queryset)
+        return results[:self.limit]
+
+    def get_next_link(self):
+        if self.mode == COUNT_EXACT:
+            return super().get_next_link()
+
+        if not self.has_next:
+            return None
+
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        offset = self.offset + self.limit
+        return replace_query_param(url, self.offset_query_param, offset)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        return parameters + [self.get_count_schema_parameter()]
+
+
+class CursorPaginationBlog(CountModeMixin, BasePagination):
+    """Keyset pagination for blog page ordered by (publish, updated, id)
+
+    Pages are found with an indexed range condition instead of OFFSET, so
+    the cost of a page does not depend on how deep it is. The requested
+    ordering is ignored and the total count is skipped unless asked for.
+    """
+
+    page_size = 20
+    cursor_query_param = 'cursor'
+    count_mode = COUNT_NONE
+    ordering = ('-publish', '-updated', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.mode = self.get_count_mode(request)
+        self.count = self.get_total_count(queryset)
+
+        cursor = self.decode_cursor(request)
+        if cursor is None:
+            reverse, position = False, None
+            page = queryset.order_by(*self.ordering)
+        else:
+            reverse, position = cursor
+            if reverse:
+                page = queryset.filter(self.after(position)).order_by(
+                    *(field.lstrip('-') for field in self.ordering)
+                )
+            else:
+                page = queryset.filter(self.before(position)).order_by(
+                    *self.ordering
+                )
+
+        results = list(page[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        has_next = has_more or reverse
+        has_previous = has_more if reverse else position is not None
+        self.next_position = self.previous_position = None
+        if results and has_next:
+            self.next_position = self.get_position(results[-1])
+        if results and has_previous:
+            self.previous_position = self.get_position(results[0])
+
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'count': {'type': 'integer', 'nullable': True},
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            self.get_count_schema_parameter(),
+        ]
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(False, self.next_position)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(True, self.previous_position)
+
+    def get_position(self, blog):
+        return blog.publish, blog.updated, blog.id
+
+    def before(self, position):
+        publish, updated, pk = position
+        return Q(publish__lte=publish) & (
+            Q(publish__lt=publish)
+            | Q(publish=publish, updated__lt=updated)
+            | Q(publish=publish, updated=updated, pk__lt=pk)
+        )
+
+    def after(self, position):
+        publish, updated, pk = position
+        return Q(publish__gte=publish) & (
+            Q(publish__gt=publish)
+            | Q(publish=publish, updated__gt=updated)
+            | Q(publish=publish, updated=updated, pk__gt=pk)
+        )
+
+    def encode_cursor(self, reverse, position):
+        publish, updated, pk = position
+        payload = json.dumps(
+            [int(reverse), publish.isoformat(), updated.isoformat(), pk]
+        )
+        cursor = urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, cursor
+        )
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+
+        try:
+            reverse, publish, updated, pk = json.loads(
+                urlsafe_b64decode(cursor.encode())
+            )
+            position = (
+                datetime.fromisoformat(publish),
+                datetime.fromisoformat(updated),
+                int(pk),
+            )
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return bool(reverse), position
+
+
+class FeedPaginationBlog(BasePagination):
+    """Pagination for blog feeds selectable per request
+
+    `?pagination=cursor` switches to keyset pagination, anything else
+    keeps limit/offset pagination.
+    """
+
+    mode_query_param = 'pagination'
+    paginators = OrderedDict([
+        ('offset', LimitOffsetPaginationBlog),
+        ('cursor', CursorPaginationBlog),
+    ])
+    default_mode = 'offset'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        mode = request.query_params.get(self.mode_query_param)
+        if mode not in self.paginators:
+            mode = self.default_mode
+
+        self.paginator = self.paginators[mode]()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        paginator = self.paginators[self.default_mode]()
+        return paginator.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = [{
+            'name': self.mode_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Pagination mode.',
+            'schema': {'type': 'string', 'enum': list(self.paginators)},
+        }]
+        names = set()
+        for paginator_class in self.paginators.values():
+            for parameter in paginator_class().get_schema_operation_parameters(
+                view
+            ):
+                if parameter['name'] not in names:
+                    names.add(parameter['name'])
+                    parameters.append(parameter)
+        return parameters
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    @property
+    def display_page_controls(self):
+        paginator = getattr(self, 'paginator', None)
+        return getattr(paginator, 'display_page_controls', False)
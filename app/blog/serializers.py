@@ -1,6 +1,32 @@
+from django.conf import settings
+from django.db.models import Manager
+
 from rest_framework import serializers
 
-from core.models import Blog, Category
+from blog.images import variant_urls
+from blog.likes import liked_blog_ids
+from core.models import Blog, Category, Comment, ImageUpload
+from extensions.fast_serializer import FastSerializer
+from extensions.sparse_fields import SparseFieldsSerializerMixin
+
+
+class FeedListSerializer(serializers.ListSerializer):
+    """Looks up comment counts and liked state of a page of blogs
+
+    Each lookup is one query for the whole page instead of one per blog.
+    """
+
+    def to_representation(self, data):
+        blogs = list(data.all() if isinstance(data, Manager) else data)
+        self.context['comment_counts'] = Comment.objects.comment_counts_for(
+            blogs
+        )
+        request = self.context.get('request')
+        if request is not None and request.user.is_authenticated:
+            self.context['liked_ids'] = liked_blog_ids(
+                request.user.pk, [blog.pk for blog in blogs]
+            )
+        return super().to_representation(blogs)
 
 
 class ListBlogsSerializer(serializers.ModelSerializer):
@@ -8,11 +34,17 @@ class ListBlogsSerializer(serializers.ModelSerializer):
 
     author = serializers.SerializerMethodField(method_name='get_author')
     category = serializers.SerializerMethodField(method_name='get_category')
+    likes = serializers.IntegerField(source='like_count', read_only=True)
+    liked = serializers.SerializerMethodField(method_name='get_liked')
+    comments = serializers.SerializerMethodField(method_name='get_comments')
+    images = serializers.SerializerMethodField(method_name='get_images')
 
     class Meta:
         model = Blog
-        fields = ('id', 'author', 'category', 'likes', 'create', 'body',
-                  'status', 'updated', 'publish', 'visits', 'special')
+        fields = ('id', 'author', 'category', 'likes', 'liked', 'comments',
+                  'images', 'create', 'body', 'status', 'updated', 'publish',
+                  'visits', 'special')
+        list_serializer_class = FeedListSerializer
 
     def get_author(self, obj):
         return {
@@ -21,11 +53,107 @@ class ListBlogsSerializer(serializers.ModelSerializer):
         }
 
     def get_category(self, obj):
-        category = [cat.title for cat in obj.category.get_queryset()]
+        category = [cat.title for cat in obj.category.all()]
         return category
 
+    def get_liked(self, obj):
+        return obj.pk in self.context.get('liked_ids', ())
+
+    def get_comments(self, obj):
+        return self.context.get('comment_counts', {}).get(obj.pk, 0)
+
+    def get_images(self, obj):
+        return variant_urls(obj, self.context.get('request'))
+
+
+class FastListBlogsSerializer(FastSerializer):
+    """Read path of ListBlogsSerializer over values_list rows"""
+
+    model = Blog
+    fields = ListBlogsSerializer.Meta.fields
+    sources = {'likes': 'like_count'}
+    method_columns = {
+        'author': ('author__first_name', 'author__last_name'),
+        'images': ('image_variants',),
+    }
+    # The id for the page lookups, publish and updated for cursor positions
+    required_columns = ('id', 'publish', 'updated')
+
+    def prepare(self, rows):
+        ids = [row.id for row in rows]
+        if 'category' in self.fields:
+            self.categories = Blog.objects.category_titles(ids)
+        if 'comments' in self.fields:
+            self.comment_counts = Comment.objects.comment_counts(Blog, ids)
+        self.liked_ids = set()
+        request = self.context.get('request')
+        if ('liked' in self.fields and request is not None
+                and request.user.is_authenticated):
+            self.liked_ids = liked_blog_ids(request.user.pk, ids)
+
+    def get_author(self, row):
+        return {
+            'first_name': row.author__first_name,
+            'last_name': row.author__last_name,
+        }
+
+    def get_category(self, row):
+        return self.categories.get(row.id, [])
+
+    def get_liked(self, row):
+        return row.id in self.liked_ids
+
+    def get_comments(self, row):
+        return self.comment_counts.get(row.id, 0)
+
+    def get_images(self, row):
+        return variant_urls(row, self.context.get('request'))
+
+
+class ImageUploadField(serializers.PrimaryKeyRelatedField):
+    """Id of a finished image upload of the requesting user"""
+
+    def get_queryset(self):
+        request = self.context['request']
+        return ImageUpload.objects.complete().filter(user_id=request.user.pk)
+
+
+class BlogImageMixin:
+    """Takes the blog image either as a file or as a finished upload"""
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if 'image' in attrs and 'upload' in attrs:
+            raise serializers.ValidationError(
+                {'upload': 'Send either an image or an upload.'}
+            )
+        if self.instance is None and not attrs.get('image') \
+                and 'upload' not in attrs:
+            raise serializers.ValidationError(
+                {'image': 'No image or upload was submitted.'}
+            )
+        return attrs
 
-class CreateBlogSerializer(serializers.ModelSerializer):
+    def create(self, validated_data):
+        upload = validated_data.pop('upload', None)
+        if upload is not None:
+            validated_data['image'] = upload.image
+        blog = super().create(validated_data)
+        if upload is not None:
+            upload.delete()
+        return blog
+
+    def update(self, instance, validated_data):
+        upload = validated_data.pop('upload', None)
+        if upload is not None:
+            validated_data['image'] = upload.image
+        blog = super().update(instance, validated_data)
+        if upload is not None:
+            upload.delete()
+        return blog
+
+
+class CreateBlogSerializer(BlogImageMixin, serializers.ModelSerializer):
     """Create a new blog"""
 
     category = serializers.SlugRelatedField(
@@ -33,24 +161,38 @@ class CreateBlogSerializer(serializers.ModelSerializer):
         slug_field='id',
         queryset=Category.objects.all(),
     )
+    upload = ImageUploadField(write_only=True, required=False)
 
     class Meta:
         model = Blog
-        fields = ('id', 'title', 'body', 'image', 'summery', 'category',
-                  'publish', 'special', 'status')
+        fields = ('id', 'title', 'body', 'image', 'upload', 'summery',
+                  'category', 'publish', 'special', 'status')
+        extra_kwargs = {'image': {'required': False}}
 
 
-class DetailUpdateDeleteBlogSerializer(serializers.ModelSerializer):
+class DetailUpdateDeleteBlogSerializer(SparseFieldsSerializerMixin,
+                                       BlogImageMixin,
+                                       serializers.ModelSerializer):
     """get, update and delete blog"""
 
     author = serializers.SerializerMethodField(method_name='get_author')
     slug = serializers.ReadOnlyField()
     likes = serializers.SerializerMethodField(method_name='get_likes')
+    images = serializers.SerializerMethodField(method_name='get_images')
+    upload = ImageUploadField(write_only=True, required=False)
 
     class Meta:
         model = Blog
-        exclude = ('create', 'updated')
+        exclude = ('create', 'updated', 'like_count', 'search_vector',
+                   'image_variants')
         read_only_fields = ('likes',)
+        extra_kwargs = {'image': {'required': False}}
+
+    field_columns = {
+        'author': ('author__first_name', 'author__last_name'),
+        'likes': ('like_count',),
+        'images': ('image_variants',),
+    }
 
     def get_author(self, obj):
         return {
@@ -59,7 +201,10 @@ class DetailUpdateDeleteBlogSerializer(serializers.ModelSerializer):
         }
 
     def get_likes(self, obj):
-        return obj.likes.count()
+        return obj.like_count
+
+    def get_images(self, obj):
+        return variant_urls(obj, self.context.get('request'))
 
 
 class ListCategorySerializer(serializers.ModelSerializer):
@@ -75,3 +220,32 @@ class ListCategorySerializer(serializers.ModelSerializer):
         return {
             'title': str(obj.parent),
         }
+
+
+class FastListCategorySerializer(FastSerializer):
+    """Read path of ListCategorySerializer over the cached tree"""
+
+    model = Category
+    fields = ListCategorySerializer.Meta.fields
+
+    def get_parent(self, obj):
+        return {
+            'title': str(obj.parent),
+        }
+
+
+class ImageUploadSerializer(serializers.ModelSerializer):
+    """Start a chunked image upload and report its progress"""
+
+    class Meta:
+        model = ImageUpload
+        fields = ('id', 'name', 'size', 'offset', 'status', 'width',
+                  'height')
+        read_only_fields = ('offset', 'status', 'width', 'height')
+
+    def validate_size(self, value):
+        if not 0 < value <= settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f'Size must be between 1 and {settings.UPLOAD_MAX_SIZE} bytes.'
+            )
+        return value
@@ -0,0 +1,130 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.db import transaction
+from django.dispatch import receiver
+
+from blog.cache import invalidate_blogs
+from blog.categories import invalidate_tree
+from blog.images import processor
+from blog.likes import Like, sync_like_counts
+from core.models import Blog, Category
+
+
+def changed_blog_ids(instance, action, reverse, pk_set, related_name):
+    """Return ids of blogs affected by an m2m change, or None to ignore it
+
+    Reverse clears do not report which blogs were affected, so the ids are
+    collected on pre_clear and returned on post_clear.
+    """
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            return [instance.pk]
+        return None
+
+    if action == 'pre_clear':
+        instance._cleared_blog_ids = list(
+            getattr(instance, related_name).values_list('pk', flat=True)
+        )
+    elif action in ('post_add', 'post_remove'):
+        return list(pk_set)
+    elif action == 'post_clear':
+        return instance.__dict__.pop('_cleared_blog_ids', [])
+    return None
+
+
+@receiver(m2m_changed, sender=Like)
+def update_like_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep Blog.like_count right when likes change through the ORM"""
+    blog_ids = changed_blog_ids(
+        instance, action, reverse, pk_set, 'blogs_like'
+    )
+    if blog_ids is not None:
+        sync_like_counts(blog_ids)
+        invalidate_blogs(blog_ids)
+
+
+@receiver(m2m_changed, sender=Blog.category.through)
+def invalidate_blog_categories(sender, instance, action, reverse, pk_set,
+                               **kwargs):
+    blog_ids = changed_blog_ids(instance, action, reverse, pk_set, 'blogs')
+    if blog_ids is not None:
+        invalidate_blogs(blog_ids)
+
+
+@receiver(post_init, sender=Blog)
+def remember_image(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred image is not loaded
+    instance._saved_image = instance.__dict__.get('image')
+
+
+@receiver(pre_save, sender=Blog)
+def reset_image_variants(sender, instance, **kwargs):
+    """Drop variants of a replaced image until the new one is processed"""
+    if 'image' not in instance.__dict__:
+        return
+    image = instance.image
+    if not image:
+        return
+    if instance._state.adding or image.name != instance._saved_image:
+        instance.image_variants = {}
+        instance._image_changed = True
+
+
+@receiver(post_save, sender=Blog)
+def process_blog_image(sender, instance, **kwargs):
+    """Resize a new image in the background once it is committed"""
+    if not instance.__dict__.pop('_image_changed', False):
+        return
+    blog_id, name = instance.pk, instance.image.name
+    instance._saved_image = name
+    transaction.on_commit(lambda: processor.submit(blog_id, name))
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_delete, sender=Blog)
+def invalidate_blog(sender, instance, **kwargs):
+    invalidate_blogs([instance.pk])
+
+
+@receiver(pre_delete, sender=Category)
+def invalidate_category_blogs(sender, instance, **kwargs):
+    invalidate_blogs(instance.blogs.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_tree(sender, **kwargs):
+    invalidate_tree()
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_author_blogs(sender, instance, created, update_fields,
+                            **kwargs):
+    """Drop cached details showing the old name of an author"""
+    if created:
+        return
+    if update_fields and not {'first_name', 'last_name'} & update_fields:
+        return
+    invalidate_blogs(instance.blogs.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=get_user_model())
+def collect_liked_blogs(sender, instance, **kwargs):
+    instance._liked_blog_ids = list(
+        instance.blogs_like.values_list('pk', flat=True)
+    )
+
+
+@receiver(post_delete, sender=get_user_model())
+def update_liked_blogs(sender, instance, **kwargs):
+    """Recount likes of blogs the deleted user liked"""
+    blog_ids = instance.__dict__.pop('_liked_blog_ids', [])
+    sync_like_counts(blog_ids)
+    invalidate_blogs(blog_ids)
@@ -0,0 +1,135 @@
+import json
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync, sync_to_async
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import resolve, reverse
+
+from rest_framework.test import APIClient
+
+from blog.views import AsyncDetailUpdateDeleteBlogApiView, AsyncListBlogApiView
+from comment.views import AsyncListCommentApiView
+from core.metrics import registry
+from core.models import Blog, Category, Comment
+
+
+ASYNC_URLS = override_settings(ROOT_URLCONF='config.asgi_urls')
+
+
+@ASYNC_URLS
+class AsyncViewTests(TestCase):
+    """Test the async read endpoints of the ASGI application"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = get_user_model().objects.create_user(
+            phone='989361234567', first_name='name', author=True,
+        )
+        cls.category = Category.objects.create(
+            title='category', slug='category', status=True,
+        )
+        cls.blog = Blog.objects.create(
+            author=cls.author,
+            title='title',
+            slug='title',
+            body='body',
+            summery='summery',
+            image='blogs/image.jpg',
+            status='p',
+        )
+        cls.blog.category.add(cls.category)
+        Comment.objects.create(
+            user=cls.author,
+            content_type=Comment.objects.content_type_for(Blog),
+            object_id=cls.blog.id,
+            body='body',
+        )
+
+    def setUp(self):
+        cache.clear()
+        patcher = patch('blog.views.record_visit')
+        self.record_visit = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def sync_get(self, url, params=None):
+        """Return the JSON of the sync view serving url"""
+        with override_settings(ROOT_URLCONF='config.urls'):
+            response = APIClient().get(url, params)
+        if response.streaming:
+            return json.loads(b''.join(response.streaming_content))
+        return response.json()
+
+    def test_urls_resolve_to_async_views(self):
+        """Test that names are kept and async variants are served"""
+        self.assertEqual(reverse('blog:blogs'), '/api/blog/')
+        self.assertEqual(resolve('/api/blog/').func.view_class,
+                         AsyncListBlogApiView)
+        self.assertEqual(resolve('/api/comment/1/').func.view_class,
+                         AsyncListCommentApiView)
+
+    async def test_read_endpoints_match_sync_views(self):
+        """Test that async views answer like their sync counterparts"""
+        urls = [
+            (reverse('blog:blogs'), {}),
+            (reverse('blog:blogs'), {'fields': 'id,category'}),
+            (reverse('blog:detail', args=['title']), {}),
+            (reverse('blog:detail', args=['title']), {'exclude': 'body'}),
+            (reverse('blog:category_list'), {}),
+            (reverse('comment:comments', args=[self.blog.id]), {}),
+        ]
+        for url, params in urls:
+            res = await self.async_client.get(url, params)
+            expected = await sync_to_async(self.sync_get)(url, params)
+
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(res.json(), expected)
+
+    def test_cached_detail_runs_no_queries(self):
+        """Test that a cached detail is answered from the cache"""
+        url = reverse('blog:detail', args=['title'])
+        get = async_to_sync(self.async_client.get)
+        first = get(url)
+
+        with self.assertNumQueries(0):
+            res = get(
+                url, **{'if-none-match': first['ETag']},
+            )
+
+        self.assertEqual(res.status_code, 304)
+
+    async def test_missing_blog(self):
+        """Test that errors are handled like in sync views"""
+        res = await self.async_client.get(
+            reverse('blog:detail', args=['missing']),
+        )
+
+        self.assertEqual(res.status_code, 404)
+
+    def test_update_through_async_view(self):
+        """Test that writes of the async detail view still work"""
+        client = APIClient()
+        client.force_authenticate(self.author)
+        url = reverse('blog:detail', args=['title'])
+
+        res = client.patch(url, {'title': 'new title'})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(resolve(url).func.view_class,
+                         AsyncDetailUpdateDeleteBlogApiView)
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.title, 'new title')
+
+    @override_settings(METRICS_SAMPLE_RATE=1.0)
+    async def test_metrics_of_async_requests(self):
+        """Test that queries run in threads are counted for the request"""
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+        await self.async_client.get(reverse('blog:blogs'))
+
+        histograms = registry.views['blog:blogs']
+        self.assertEqual(histograms['request_seconds'].count, 1)
+        self.assertGreater(histograms['db_queries'].sum, 0)
@@ -0,0 +1,148 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Blog, Category, Comment
+
+
+CATEGORIES_URL = reverse('blog:category_list')
+
+
+def category_blogs_url(slug):
+    return reverse('blog:category_blog', args=[slug])
+
+
+def create_category(slug, parent=None, status=True):
+    return Category.objects.create(
+        title=slug, slug=slug, parent=parent, status=status,
+    )
+
+
+class CategoryPathTests(TestCase):
+    """Test the materialized path of categories"""
+
+    def setUp(self):
+        self.root = create_category('root')
+        self.child = create_category('child', parent=self.root)
+        self.grandchild = create_category('grandchild', parent=self.child)
+
+    def test_path_built_on_create(self):
+        """Test that the path lists the ids of all ancestors"""
+        self.assertEqual(self.root.path, f'{self.root.id}/')
+        self.assertEqual(
+            self.grandchild.path,
+            f'{self.root.id}/{self.child.id}/{self.grandchild.id}/',
+        )
+
+    def test_moving_updates_subtree(self):
+        """Test that moving a category rewrites the paths of its subtree"""
+        other = create_category('other')
+        self.child.parent = other
+        self.child.save()
+
+        self.grandchild.refresh_from_db()
+        self.assertEqual(
+            self.grandchild.path,
+            f'{other.id}/{self.child.id}/{self.grandchild.id}/',
+        )
+
+    def test_cannot_nest_under_descendant(self):
+        """Test that a category cannot become its own descendant"""
+        self.root.parent = self.grandchild
+
+        with self.assertRaises(ValidationError):
+            self.root.clean()
+        with self.assertRaises(ValueError):
+            self.root.save()
+
+
+class CategoryTreeApiTests(TestCase):
+    """Test the cached category tree endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.root = create_category('root')
+        self.child = create_category('child', parent=self.root)
+        create_category('hidden', status=False)
+        author = get_user_model().objects.create_user(phone='989361234567')
+        self.root_blog, self.child_blog = [
+            Blog.objects.create(
+                author=author,
+                title=slug,
+                slug=slug,
+                body='body',
+                summery='summery',
+                image='blogs/image.jpg',
+                status='p',
+            )
+            for slug in ('root-blog', 'child-blog')
+        ]
+        self.root_blog.category.add(self.root)
+        self.child_blog.category.add(self.child)
+        Comment.objects.content_type_for(Blog)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_list_served_from_cache(self):
+        """Test that the category list is read from the cached tree"""
+        self.client.get(CATEGORIES_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(CATEGORIES_URL)
+
+        self.assertEqual(res.data, [
+            {'parent': {'title': 'None'}, 'title': 'root'},
+            {'parent': {'title': 'root'}, 'title': 'child'},
+        ])
+
+    def test_change_invalidates_tree(self):
+        """Test that saving a category rebuilds the tree"""
+        self.client.get(CATEGORIES_URL)
+        self.child.title = 'renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.child.save()
+
+        res = self.client.get(CATEGORIES_URL)
+
+        self.assertEqual(res.data[1]['title'], 'renamed')
+
+    def test_tree_dropped_after_commit(self):
+        """Test that a tree built before a commit is not kept after it"""
+        with self.captureOnCommitCallbacks() as callbacks:
+            added = create_category('added', parent=self.root)
+            self.client.get(CATEGORIES_URL)
+        for callback in callbacks:
+            callback()
+
+        res = self.client.get(CATEGORIES_URL)
+
+        self.assertIn(added.title, [row['title'] for row in res.data])
+
+    def test_category_feed_with_descendants(self):
+        """Test that subcategory blogs are listed on request"""
+        url = category_blogs_url(self.root.slug)
+
+        res = self.client.get(url)
+        self.assertEqual(
+            [blog['id'] for blog in res.data['results']],
+            [self.root_blog.id],
+        )
+
+        res = self.client.get(url, {'descendants': 'true'})
+        self.assertEqual(
+            {blog['id'] for blog in res.data['results']},
+            {self.root_blog.id, self.child_blog.id},
+        )
+
+    def test_inactive_category_not_found(self):
+        """Test that blogs of inactive categories are not listed"""
+        res = self.client.get(category_blogs_url('hidden'))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,161 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from blog.cache import version_key
+from blog.likes import toggle_like
+from blog.views import DetailUpdateDeleteBlogApiView
+from core.models import Blog, Category
+
+
+def detail_url(slug):
+    return reverse('blog:detail', args=[slug])
+
+
+class BlogDetailCacheTests(TestCase):
+    """Test caching of serialized blog details"""
+
+    def setUp(self):
+        cache.clear()
+        patcher = patch('blog.views.record_visit')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        self.author = get_user_model().objects.create_user(
+            phone='989361234567', first_name='name',
+        )
+        self.blog = Blog.objects.create(
+            author=self.author,
+            title='title',
+            slug='title',
+            body='body',
+            summery='summery',
+            image='blogs/image.jpg',
+            status='p',
+        )
+        self.url = detail_url(self.blog.slug)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_cached_detail_skips_database(self):
+        """Test that a second read is served without queries"""
+        first = self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, first.data)
+        self.assertEqual(res['ETag'], first['ETag'])
+
+    def test_if_none_match_returns_not_modified(self):
+        """Test that a matching ETag returns 304 without a body"""
+        etag = self.client.get(self.url)['ETag']
+
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+        self.assertFalse(res.content)
+
+    def test_save_invalidates_detail(self):
+        """Test that saving a blog refreshes its cached detail"""
+        etag = self.client.get(self.url)['ETag']
+        self.blog.title = 'new title'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.blog.save()
+
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['title'], 'new title')
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_likes_and_categories_invalidate_detail(self):
+        """Test that like and category changes refresh the detail"""
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            toggle_like(self.blog.pk, self.author.pk)
+        self.assertEqual(self.client.get(self.url).data['likes'], 1)
+
+        category = Category.objects.create(title='category', slug='category')
+        with self.captureOnCommitCallbacks(execute=True):
+            category.blogs.add(self.blog)
+        self.assertEqual(
+            self.client.get(self.url).data['category'], [category.pk]
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            category.delete()
+        self.assertEqual(self.client.get(self.url).data['category'], [])
+
+    def test_author_rename_invalidates_detail(self):
+        """Test that renaming the author refreshes the detail"""
+        self.client.get(self.url)
+        self.author.first_name = 'other'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.save()
+
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.data['author']['first_name'], 'other')
+
+    def test_delete_invalidates_detail(self):
+        """Test that a deleted blog is no longer served from the cache"""
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.blog.delete()
+
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalidation_waits_for_commit(self):
+        """Test that versions change only once the change is committed"""
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.blog.title = 'new title'
+            self.blog.save()
+            cached = self.client.get(self.url)
+
+        self.assertEqual(cached.data['title'], 'title')
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.client.get(self.url).data['title'], 'new title')
+
+    def test_change_in_other_process_invalidates_at_once(self):
+        """Test that versions are not read from the per-process cache"""
+        self.client.get(self.url)
+        Blog.objects.filter(pk=self.blog.pk).update(title='new title')
+        caches['shared'].set(version_key(self.blog.pk), 'other', None)
+
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.data['title'], 'new title')
+
+    def test_change_during_read_is_not_cached_as_current(self):
+        """Test that a detail read before a change is not kept after it"""
+        get_object = DetailUpdateDeleteBlogApiView.get_object
+
+        def get_object_then_change(view):
+            blog = get_object(view)
+            with self.captureOnCommitCallbacks(execute=True):
+                Blog.objects.get(pk=blog.pk).save()
+            return blog
+
+        with patch.object(DetailUpdateDeleteBlogApiView, 'get_object',
+                          get_object_then_change):
+            self.client.get(self.url)
+        Blog.objects.filter(pk=self.blog.pk).update(title='new title')
+
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.data['title'], 'new title')
@@ -0,0 +1,122 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from blog.categories import get_active_tree
+from blog.serializers import (
+    FastListBlogsSerializer,
+    FastListCategorySerializer,
+    ListBlogsSerializer,
+    ListCategorySerializer,
+)
+from core.models import Blog, Category, Comment
+
+
+BLOGS_URL = reverse('blog:blogs')
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+class FastSerializerParityTests(TestCase):
+    """Test that fast list serializers render exactly like DRF's"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = get_user_model().objects.create_user(
+            phone='989361234567', first_name='name', last_name='family',
+        )
+        cls.reader = get_user_model().objects.create_user(
+            phone='989361234568',
+        )
+        root = Category.objects.create(
+            title='root', slug='root', status=True,
+        )
+        cls.categories = [root] + [
+            Category.objects.create(
+                title=f'category {index}', slug=f'category-{index}',
+                parent=root, status=True,
+            )
+            for index in range(2)
+        ]
+        content_type = Comment.objects.content_type_for(Blog)
+        for index in range(4):
+            blog = Blog.objects.create(
+                author=cls.author,
+                title=f'title {index}',
+                slug=f'title-{index}',
+                body='body',
+                summery='summery',
+                image='blogs/image.jpg',
+                image_variants={'jpeg': {'320': 'blogs/variants/a-320.jpg'}}
+                if index % 2 else {},
+                status='p',
+                special=bool(index % 2),
+            )
+            blog.category.set(cls.categories[index % 3:])
+            if index % 2:
+                blog.likes.add(cls.reader)
+            for _ in range(index):
+                Comment.objects.create(
+                    user=cls.reader, content_type=content_type,
+                    object_id=blog.id, body='body',
+                )
+
+    def setUp(self):
+        cache.clear()
+
+    def request(self, user=None):
+        request = Request(APIRequestFactory().get(BLOGS_URL))
+        request.user = user or self.reader
+        return request
+
+    def assertBlogsMatch(self, request):
+        context = {'request': request}
+        drf = ListBlogsSerializer(
+            Blog.objects.feed(), many=True, context=context,
+        ).data
+        rows = Blog.objects.feed().prefetch_related(None).values_list(
+            *FastListBlogsSerializer().columns(), named=True,
+        )
+        fast = FastListBlogsSerializer(context).serialize(rows)
+
+        self.assertEqual(len(fast), 4)
+        self.assertEqual(render(fast), render(drf))
+
+    def test_blogs_match_drf(self):
+        """Test blogs with categories, likes, comments and variants"""
+        self.assertBlogsMatch(self.request())
+
+    def test_blogs_match_drf_in_other_time_zone(self):
+        """Test that datetimes are converted to the current time zone"""
+        with timezone.override('Asia/Tehran'):
+            self.assertBlogsMatch(self.request())
+
+    def test_categories_match_drf(self):
+        """Test categories of the active tree, with and without parent"""
+        categories = get_active_tree().categories
+
+        drf = ListCategorySerializer(categories, many=True).data
+        fast = FastListCategorySerializer().serialize(categories)
+
+        self.assertEqual(render(fast), render(drf))
+
+    def test_feed_view_matches_drf(self):
+        """Test that the feed page renders what the DRF serializer did"""
+        client = APIClient()
+        client.force_authenticate(self.reader)
+
+        res = client.get(BLOGS_URL)
+
+        drf = ListBlogsSerializer(
+            Blog.objects.feed(), many=True,
+            context={'request': res.wsgi_request},
+        ).data
+        self.assertEqual(render(res.data['results']), render(drf))
@@ -0,0 +1,92 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Blog, Category, Comment
+
+
+BLOGS_URL = reverse('blog:blogs')
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+def create_blogs(author, count, categories=(), likers=()):
+    """Create published blogs with the given categories and likers"""
+    blogs = []
+    for index in range(count):
+        blog = Blog.objects.create(
+            author=author,
+            title=f'title {index}',
+            slug=f'title-{index}',
+            body='body',
+            summery='summery',
+            image='blogs/image.jpg',
+            status='p',
+        )
+        blog.category.set(categories)
+        blog.likes.set(likers)
+        blogs.append(blog)
+    return blogs
+
+
+class BlogFeedQueryTests(TestCase):
+    """Test the number of queries needed for the blog feed"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.author = create_user(
+            phone='989361234567', first_name='name', last_name='family',
+        )
+        self.likers = [
+            create_user(phone=f'98936123450{index}') for index in range(3)
+        ]
+        self.categories = [
+            Category.objects.create(
+                title=f'category {index}', slug=f'category-{index}',
+                status=True,
+            )
+            for index in range(2)
+        ]
+        # Content types are loaded once per process, not per request.
+        Comment.objects.content_type_for(Blog)
+
+    def test_feed_queries_do_not_grow_with_page_size(self):
+        """Test that a page costs a fixed number of queries"""
+        for count in (2, 20):
+            Blog.objects.all().delete()
+            create_blogs(self.author, count, self.categories, self.likers)
+
+            # count, blogs, categories and comment counts
+            with self.assertNumQueries(4):
+                res = self.client.get(BLOGS_URL)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(res.data['results']), count)
+
+    def test_feed_serializes_annotated_values(self):
+        """Test that the feed returns author, categories and like count"""
+        create_blogs(self.author, 1, self.categories, self.likers)
+
+        res = self.client.get(BLOGS_URL)
+
+        blog = res.data['results'][0]
+        self.assertEqual(blog['likes'], 3)
+        self.assertEqual(
+            blog['author'], {'first_name': 'name', 'last_name': 'family'}
+        )
+        self.assertEqual(blog['category'], ['category 0', 'category 1'])
+
+    def test_feed_excludes_drafts(self):
+        """Test that draft blogs are not listed in the feed"""
+        blog, = create_blogs(self.author, 1)
+        blog.status = 'd'
+        blog.save()
+
+        res = self.client.get(BLOGS_URL)
+
+        self.assertEqual(res.data['count'], 0)
@@ -0,0 +1,206 @@
+from io import BytesIO, StringIO
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from PIL import Image
+from rest_framework.test import APIClient
+
+from blog.images import (
+    ORIENTATION, XMP_HEADER, available_formats, processor, strip_original,
+)
+from core.models import Blog
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_file(size=(800, 600), orientation=None, name='photo.jpg'):
+    """Return an uploaded JPEG with camera metadata"""
+    exif = Image.Exif()
+    exif[0x010F] = 'Camera maker'
+    if orientation:
+        exif[ORIENTATION] = orientation
+    output = BytesIO()
+    Image.new('RGB', size, 'red').save(output, 'JPEG', exif=exif.tobytes())
+    return SimpleUploadedFile(name, output.getvalue(), 'image/jpeg')
+
+
+def segment(marker, content):
+    return marker + (len(content) + 2).to_bytes(2, 'big') + content
+
+
+def tagged_image_file():
+    """Return an uploaded JPEG with XMP and a comment but no EXIF"""
+    output = BytesIO()
+    Image.new('RGB', (800, 600), 'red').save(output, 'JPEG')
+    data = output.getvalue()
+    data = data[:2] + segment(
+        b'\xff\xe1', XMP_HEADER + b'<x:xmpmeta>location</x:xmpmeta>',
+    ) + segment(b'\xff\xfe', b'location') + data[2:]
+    return SimpleUploadedFile('photo.jpg', data, 'image/jpeg')
+
+
+def open_image(name):
+    with default_storage.open(name) as file:
+        image = Image.open(file)
+        image.load()
+    return image
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, BLOG_IMAGE_WORKERS=0,
+                   BLOG_IMAGE_WIDTHS=[320, 640, 1280])
+class BlogImageTests(TestCase):
+    """Test resizing of uploaded blog images"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.author = get_user_model().objects.create_user(
+            phone='989361234567', first_name='name',
+        )
+
+    def create_blog(self, image):
+        with self.captureOnCommitCallbacks(execute=True):
+            blog = Blog.objects.create(
+                author=self.author, title='title', slug='title',
+                body='body', summery='summery', image=image, status='p',
+            )
+        blog.refresh_from_db()
+        return blog
+
+    def test_variants_are_created_for_smaller_widths(self):
+        """Test that every format gets the widths below the image width"""
+        blog = self.create_blog(image_file())
+
+        self.assertEqual(list(blog.image_variants), available_formats())
+        for fmt, names in blog.image_variants.items():
+            self.assertEqual(list(names), ['320', '640'])
+            for width, name in names.items():
+                image = open_image(name)
+                self.assertEqual(image.format, fmt.upper())
+                self.assertEqual(image.width, int(width))
+                self.assertEqual(image.height, int(width) * 3 // 4)
+
+    def test_metadata_is_stripped(self):
+        """Test that only the orientation of the original is kept"""
+        blog = self.create_blog(image_file(orientation=6))
+
+        original = open_image(blog.image.name)
+        self.assertEqual(dict(original.getexif()), {ORIENTATION: 6})
+        for names in blog.image_variants.values():
+            variant = open_image(names['320'])
+            self.assertEqual(len(variant.getexif()), 0)
+            # Rotated images are resized as they are displayed
+            self.assertEqual(variant.size, (320, 427))
+
+    def test_xmp_and_comments_are_stripped(self):
+        """Test that originals without EXIF lose their other metadata"""
+        blog = self.create_blog(tagged_image_file())
+
+        with default_storage.open(blog.image.name) as file:
+            content = file.read()
+        self.assertNotIn(b'location', content)
+        self.assertEqual(Image.open(BytesIO(content)).size, (800, 600))
+
+    def test_mpo_original_is_stored_as_jpeg(self):
+        """Test that multi-picture originals are written as JPEG"""
+        image = Image.open(image_file(orientation=3))
+        # Pillow can not write MPO files, so one is imitated
+        image.format = 'MPO'
+
+        stripped = Image.open(BytesIO(strip_original(image)))
+
+        self.assertEqual(stripped.format, 'JPEG')
+        self.assertEqual(dict(stripped.getexif()), {ORIENTATION: 3})
+        self.assertEqual(stripped.quantization, image.quantization)
+
+    def test_animated_original_keeps_its_frames(self):
+        """Test that every frame of an animated original is stored"""
+        frames = [Image.new('P', (80, 60), color) for color in (1, 2, 3)]
+        output = BytesIO()
+        frames[0].save(
+            output, 'GIF', save_all=True, append_images=frames[1:],
+            duration=[100, 200, 300], loop=0, comment=b'location',
+        )
+        image = Image.open(output)
+
+        stripped = strip_original(image)
+
+        self.assertNotIn(b'location', stripped)
+        stripped = Image.open(BytesIO(stripped))
+        self.assertEqual(stripped.n_frames, 3)
+        self.assertEqual(stripped.info['loop'], 0)
+        durations = []
+        for frame in range(stripped.n_frames):
+            stripped.seek(frame)
+            durations.append(stripped.info['duration'])
+        self.assertEqual(durations, [100, 200, 300])
+
+    def test_small_image_keeps_its_width(self):
+        """Test that images are never enlarged"""
+        blog = self.create_blog(image_file(size=(200, 100)))
+
+        for names in blog.image_variants.values():
+            self.assertEqual(list(names), ['200'])
+
+    def test_unchanged_image_is_not_processed_again(self):
+        """Test that saving other fields does not queue the image"""
+        blog = self.create_blog(image_file())
+
+        with patch.object(processor, 'submit') as submit:
+            with self.captureOnCommitCallbacks(execute=True):
+                blog.title = 'new title'
+                blog.save()
+                Blog.objects.get(pk=blog.pk).save()
+
+        submit.assert_not_called()
+        blog.refresh_from_db()
+        self.assertTrue(blog.image_variants)
+
+    def test_processing_runs_in_worker_pool(self):
+        """Test that images are handed to the pool after commit"""
+        with override_settings(BLOG_IMAGE_WORKERS=1), \
+                patch('blog.images.process_blog_image') as process:
+            blog = self.create_blog(image_file())
+            processor.executor().submit(lambda: None).result()
+
+        process.assert_called_once_with(blog.pk, blog.image.name)
+        self.assertEqual(blog.image_variants, {})
+
+    def test_detail_and_feed_return_variant_urls(self):
+        """Test that the blog serializers expose variant urls"""
+        blog = self.create_blog(image_file())
+        client = APIClient()
+
+        with patch('blog.views.record_visit'):
+            detail = client.get(reverse('blog:detail', args=[blog.slug]))
+        feed = client.get(reverse('blog:blogs'))
+
+        url = default_storage.url(blog.image_variants['jpeg']['320'])
+        self.assertEqual(detail.data['images']['jpeg']['320'],
+                         f'http://testserver{url}')
+        self.assertEqual(feed.data['results'][0]['images'],
+                         detail.data['images'])
+
+    def test_process_images_command(self):
+        """Test that images without variants are processed"""
+        blog = self.create_blog(image_file())
+        Blog.objects.filter(pk=blog.pk).update(image_variants={})
+
+        call_command('process_images', workers=1, stdout=StringIO())
+
+        blog.refresh_from_db()
+        self.assertEqual(list(blog.image_variants['jpeg']), ['320', '640'])
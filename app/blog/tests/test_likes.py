@@ -0,0 +1,130 @@
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from blog.likes import liked_blog_ids, toggle_like
+from throttles import LikeThrottle
+from core.models import Blog, Comment
+
+
+BLOGS_URL = reverse('blog:blogs')
+
+
+def like_url(pk):
+    return reverse('blog:like', args=[pk])
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+def create_blog(author, slug, status='p'):
+    return Blog.objects.create(
+        author=author,
+        title=slug,
+        slug=slug,
+        body='body',
+        summery='summery',
+        image='blogs/image.jpg',
+        status=status,
+    )
+
+
+class LikeEngineTests(TestCase):
+    """Test toggling likes and the denormalized like counter"""
+
+    def setUp(self):
+        self.user = create_user(phone='989361234567')
+        self.other = create_user(phone='989361234568')
+        self.blog = create_blog(self.user, 'blog')
+
+    def test_toggle_like_updates_counter(self):
+        """Test that toggling twice likes and then unlikes the blog"""
+        self.assertTrue(toggle_like(self.blog.pk, self.user.pk))
+        self.assertTrue(toggle_like(self.blog.pk, self.other.pk))
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.like_count, 2)
+
+        self.assertFalse(toggle_like(self.blog.pk, self.user.pk))
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.like_count, 1)
+        self.assertEqual(list(self.blog.likes.all()), [self.other])
+
+    def test_liked_blog_ids_in_one_query(self):
+        """Test that liked state of many blogs is read in one query"""
+        blogs = [create_blog(self.user, f'blog-{index}') for index in range(3)]
+        toggle_like(blogs[1].pk, self.user.pk)
+
+        with self.assertNumQueries(1):
+            liked = liked_blog_ids(self.user.pk, [blog.pk for blog in blogs])
+
+        self.assertEqual(liked, {blogs[1].pk})
+
+    def test_orm_changes_keep_counter_in_sync(self):
+        """Test that likes changed through the m2m manager are counted"""
+        self.blog.likes.add(self.user, self.other)
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.like_count, 2)
+
+        self.other.blogs_like.clear()
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.like_count, 1)
+
+
+class LikeApiTests(TestCase):
+    """Test the like endpoint and liked state in the feed"""
+
+    def setUp(self):
+        caches['throttle'].clear()
+        self.client = APIClient()
+        self.user = create_user(phone='989361234567')
+        self.client.force_authenticate(user=self.user)
+        self.blog = create_blog(self.user, 'blog')
+        Comment.objects.content_type_for(Blog)
+
+    def test_like_and_unlike(self):
+        """Test that the endpoint toggles the like of the user"""
+        res = self.client.get(like_url(self.blog.pk))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data['liked'])
+
+        res = self.client.get(like_url(self.blog.pk))
+        self.assertFalse(res.data['liked'])
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.like_count, 0)
+
+    def test_like_draft_not_found(self):
+        """Test that draft blogs cannot be liked"""
+        draft = create_blog(self.user, 'draft', status='d')
+
+        res = self.client.get(like_url(draft.pk))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(draft.likes.count(), 0)
+
+    def test_likes_are_throttled(self):
+        """Test that too many likes are rejected before any query"""
+        with patch.object(LikeThrottle, 'rate', '2/min', create=True):
+            self.client.get(like_url(self.blog.pk))
+            self.client.get(like_url(self.blog.pk))
+            with self.assertNumQueries(0):
+                res = self.client.get(like_url(self.blog.pk))
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_feed_shows_liked_state(self):
+        """Test that the feed marks blogs liked by the user"""
+        other = create_blog(self.user, 'other')
+        toggle_like(self.blog.pk, self.user.pk)
+
+        with self.assertNumQueries(5):
+            res = self.client.get(BLOGS_URL)
+
+        liked = {blog['id']: blog['liked'] for blog in res.data['results']}
+        self.assertEqual(liked, {self.blog.pk: True, other.pk: False})
@@ -0,0 +1,120 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Blog, Category, Comment
+
+
+BLOGS_URL = reverse('blog:blogs')
+
+
+def category_blogs_url(slug):
+    return reverse('blog:category_blog', args=[slug])
+
+
+def create_blogs(author, count, publish):
+    """Create published blogs sharing the same publish time"""
+    return [
+        Blog.objects.create(
+            author=author,
+            title=f'title {index}',
+            slug=f'title-{index}',
+            body='body',
+            summery='summery',
+            image='blogs/image.jpg',
+            status='p',
+            publish=publish,
+        )
+        for index in range(count)
+    ]
+
+
+class CursorPaginationTests(TestCase):
+    """Test keyset pagination of the blog feeds"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.author = get_user_model().objects.create_user(
+            phone='989361234567',
+        )
+        self.blogs = create_blogs(self.author, 25, timezone.now())
+        Comment.objects.content_type_for(Blog)
+        self.expected = list(
+            Blog.objects.order_by('-publish', '-updated', '-id')
+            .values_list('id', flat=True)
+        )
+
+    def test_cursor_walks_all_blogs_once(self):
+        """Test that following next links returns every blog in order"""
+        res = self.client.get(BLOGS_URL, {'pagination': 'cursor'})
+        ids = [blog['id'] for blog in res.data['results']]
+        self.assertIsNone(res.data['count'])
+        self.assertIsNone(res.data['previous'])
+
+        res = self.client.get(res.data['next'])
+        ids += [blog['id'] for blog in res.data['results']]
+
+        self.assertEqual(ids, self.expected)
+        self.assertIsNone(res.data['next'])
+
+    def test_cursor_previous_link(self):
+        """Test that the previous link returns the preceding page"""
+        first = self.client.get(BLOGS_URL, {'pagination': 'cursor'})
+        second = self.client.get(first.data['next'])
+
+        res = self.client.get(second.data['previous'])
+
+        self.assertEqual(res.data['results'], first.data['results'])
+        self.assertIsNone(res.data['previous'])
+        self.assertIsNotNone(res.data['next'])
+
+    def test_cursor_count_modes(self):
+        """Test that the count can be requested exactly or estimated"""
+        for mode in ('exact', 'estimate'):
+            res = self.client.get(
+                BLOGS_URL, {'pagination': 'cursor', 'count': mode},
+            )
+            self.assertEqual(res.data['count'], 25)
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor returns not found"""
+        res = self.client.get(
+            BLOGS_URL, {'pagination': 'cursor', 'cursor': 'invalid'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_offset_without_count(self):
+        """Test that offset pagination can skip the count query"""
+        with self.assertNumQueries(3):
+            res = self.client.get(BLOGS_URL, {'count': 'none'})
+
+        self.assertIsNone(res.data['count'])
+        self.assertEqual(len(res.data['results']), 20)
+        self.assertIn('offset=20', res.data['next'])
+
+        res = self.client.get(res.data['next'])
+        self.assertEqual(len(res.data['results']), 5)
+        self.assertIsNone(res.data['next'])
+
+    def test_category_feed_cursor(self):
+        """Test that the category feed supports keyset pagination"""
+        category = Category.objects.create(
+            title='category', slug='category', status=True,
+        )
+        category.blogs.set(self.blogs[:3])
+
+        res = self.client.get(
+            category_blogs_url(category.slug), {'pagination': 'cursor'},
+        )
+
+        ids = {blog.id for blog in self.blogs[:3]}
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [blog['id'] for blog in res.data['results']],
+            [pk for pk in self.expected if pk in ids],
+        )
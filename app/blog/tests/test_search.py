@@ -0,0 +1,90 @@
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import Blog
+
+
+BLOGS_URL = reverse('blog:blogs')
+
+requires_postgres = skipUnless(
+    connection.vendor == 'postgresql', 'full-text search needs PostgreSQL',
+)
+
+
+def create_blog(author, slug, title='title', summery='summery', body='body'):
+    return Blog.objects.create(
+        author=author,
+        title=title,
+        slug=slug,
+        body=body,
+        summery=summery,
+        image='blogs/image.jpg',
+        status='p',
+    )
+
+
+class FullTextSearchTests(TestCase):
+    """Test full-text search over blogs"""
+
+    def setUp(self):
+        self.client = APIClient()
+        author = get_user_model().objects.create_user(phone='989361234567')
+        self.in_body = create_blog(author, 'body', body='django tips')
+        self.in_title = create_blog(author, 'title', title='django tips')
+        self.in_summery = create_blog(author, 'summery', summery='django')
+        self.other = create_blog(author, 'other', title='python')
+
+    def search(self, term):
+        res = self.client.get(BLOGS_URL, {'search': term})
+        return [blog['id'] for blog in res.data['results']]
+
+    def test_search_vector_maintained(self):
+        """Test that the search vector follows changes of the title"""
+        self.other.title = 'flask'
+        self.other.save()
+
+        self.assertEqual(self.search('flask'), [self.other.id])
+        self.assertEqual(self.search('python'), [])
+
+    @requires_postgres
+    def test_results_ranked_by_weight(self):
+        """Test that title matches rank above summery and body matches"""
+        self.assertEqual(
+            self.search('django'),
+            [self.in_title.id, self.in_summery.id, self.in_body.id],
+        )
+
+    @requires_postgres
+    def test_all_terms_must_match(self):
+        """Test that every search term has to be present"""
+        self.assertEqual(
+            sorted(self.search('django tips')),
+            sorted([self.in_title.id, self.in_body.id]),
+        )
+
+    def test_author_first_name_matches(self):
+        """Test that blogs are found by their author's first name"""
+        author = get_user_model().objects.create_user(phone='989361234568')
+        author.first_name = 'Ramin'
+        author.save()
+        by_name = create_blog(author, 'by-name')
+
+        self.assertEqual(self.search('ramin'), [by_name.id])
+        self.assertEqual(self.search('rami'), [by_name.id])
+
+    def test_fallback_without_postgres(self):
+        """Test that other databases use icontains search"""
+        with patch.object(connection, 'vendor', 'sqlite'):
+            ids = self.search('djang')
+
+        self.assertEqual(
+            sorted(ids),
+            sorted([self.in_title.id, self.in_summery.id]),
+        )
@@ -0,0 +1,116 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Blog, Category
+
+
+BLOGS_URL = reverse('blog:blogs')
+BODY_COLUMN = '"core_blog"."body"'
+
+
+def detail_url(slug):
+    return reverse('blog:detail', args=[slug])
+
+
+class SparseFieldsTests(TestCase):
+    """Test selecting the fields of blog lists and details"""
+
+    def setUp(self):
+        cache.clear()
+        patcher = patch('blog.views.record_visit')
+        self.record_visit = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        self.author = get_user_model().objects.create_user(
+            phone='989361234567', first_name='name', last_name='family',
+        )
+        category = Category.objects.create(
+            title='category', slug='category', status=True,
+        )
+        for index in range(3):
+            blog = Blog.objects.create(
+                author=self.author,
+                title=f'title {index}',
+                slug=f'title-{index}',
+                body='long body ' * 100,
+                summery='summery',
+                image='blogs/image.jpg',
+                status='p',
+            )
+            blog.category.add(category)
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        sql = ' '.join(query['sql'] for query in queries)
+        return res, sql
+
+    def test_feed_exclude_skips_column(self):
+        """Test that excluded fields are neither rendered nor selected"""
+        res, sql = self.get(BLOGS_URL, {'exclude': 'body'})
+
+        blog = res.data['results'][0]
+        self.assertNotIn('body', blog)
+        self.assertIn('author', blog)
+        self.assertNotIn(BODY_COLUMN, sql)
+
+    def test_feed_fields_skip_lookups(self):
+        """Test that page lookups of unselected fields are not run"""
+        with self.assertNumQueries(2):
+            res = self.client.get(BLOGS_URL, {'fields': 'id,likes'})
+
+        self.assertEqual(list(res.data['results'][0]), ['id', 'likes'])
+
+    def test_feed_cursor_with_fields(self):
+        """Test that cursor pages work without the ordering fields"""
+        res = self.client.get(BLOGS_URL, {
+            'pagination': 'cursor', 'fields': 'category',
+        })
+        self.assertEqual(res.data['results'][0], {'category': ['category']})
+
+    def test_unknown_field_is_rejected(self):
+        """Test that fields the endpoint does not have are refused"""
+        res = self.client.get(BLOGS_URL, {'fields': 'id,password'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
+
+    def test_detail_fields_skip_column(self):
+        """Test that a sparse detail is read without unselected columns"""
+        res, sql = self.get(detail_url('title-0'), {'fields': 'id,title'})
+
+        self.assertEqual(res.data, {'id': res.data['id'], 'title': 'title 0'})
+        self.assertNotIn(BODY_COLUMN, sql)
+        self.record_visit.assert_called_once_with(res.data['id'])
+
+    def test_detail_fields_from_cache(self):
+        """Test that a cached detail is cut to the selected fields"""
+        full = self.client.get(detail_url('title-0'))
+        uncached = self.client.get(detail_url('title-1'), {
+            'exclude': 'body',
+        })
+        self.client.get(detail_url('title-1'))
+
+        with self.assertNumQueries(0):
+            res = self.client.get(detail_url('title-0'), {
+                'fields': 'title,author',
+            })
+        cached = self.client.get(detail_url('title-1'), {'exclude': 'body'})
+
+        self.assertEqual(res.data, {
+            'title': 'title 0',
+            'author': full.data['author'],
+        })
+        self.assertEqual(cached.data, uncached.data)
+        self.assertEqual(cached['ETag'], uncached['ETag'])
+        self.assertNotEqual(cached['ETag'], full['ETag'])
@@ -0,0 +1,215 @@
+from datetime import timedelta
+from io import BytesIO, StringIO
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from blog.uploads import BUFFER, receive, temp_path
+from core.models import Blog, ImageUpload
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+UPLOAD_TEMP_DIR = tempfile.mkdtemp()
+CREATE_UPLOAD_URL = reverse('blog:upload_create')
+CREATE_BLOG_URL = reverse('blog:create')
+
+
+def upload_url(pk):
+    return reverse('blog:upload', args=[pk])
+
+
+def jpeg_bytes(size=(400, 300)):
+    output = BytesIO()
+    Image.effect_noise(size, 64).convert('RGB').save(output, 'JPEG')
+    return output.getvalue()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, UPLOAD_TEMP_DIR=UPLOAD_TEMP_DIR,
+                   UPLOAD_CHUNK_SIZE=4096, BLOG_IMAGE_WORKERS=0)
+class ImageUploadTests(TestCase):
+    """Test resumable chunked uploads of blog images"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        shutil.rmtree(UPLOAD_TEMP_DIR, ignore_errors=True)
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            phone='989361234567', first_name='name', author=True,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.image = jpeg_bytes()
+
+    def start(self, size=None):
+        res = self.client.post(CREATE_UPLOAD_URL, {
+            'name': 'photo.jpg', 'size': size or len(self.image),
+        })
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return res.data['id']
+
+    def send(self, pk, offset, data):
+        return self.client.generic(
+            'PATCH', upload_url(pk), data,
+            content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def upload(self):
+        pk = self.start()
+        for offset in range(0, len(self.image), 4096):
+            res = self.send(pk, offset, self.image[offset:offset + 4096])
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return pk
+
+    def test_upload_in_chunks(self):
+        """Test that chunks are assembled into a stored image"""
+        pk = self.upload()
+
+        upload = ImageUpload.objects.get(pk=pk)
+        self.assertEqual(upload.status, 'c')
+        self.assertEqual((upload.format, upload.width, upload.height),
+                         ('JPEG', 400, 300))
+        with default_storage.open(upload.image) as file:
+            self.assertEqual(file.read(), self.image)
+        self.assertFalse(os.path.exists(temp_path(upload)))
+
+    def test_upload_resumes_from_offset(self):
+        """Test that the received offset is reported for resuming"""
+        pk = self.start()
+        self.send(pk, 0, self.image[:4096])
+
+        res = self.client.head(upload_url(pk))
+
+        self.assertEqual(res['Upload-Offset'], '4096')
+        res = self.send(pk, 0, self.image[:4096])
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        res = self.send(pk, 4096, self.image[4096:8192])
+        self.assertEqual(res.data['offset'], 8192)
+
+    def test_received_buffers_survive_broken_chunk(self):
+        """Test that each buffer is committed before the next is read"""
+        image = jpeg_bytes((800, 600))
+        upload = ImageUpload.objects.create(
+            user=self.user, name='photo.jpg', size=len(image),
+        )
+        data = image[:BUFFER + 10]
+        stream = BytesIO(data)
+        read = stream.read
+
+        def read_then_fail(size):
+            if stream.tell() >= BUFFER:
+                raise OSError('Client disconnected')
+            return read(size)
+        stream.read = read_then_fail
+
+        with self.assertRaises(OSError):
+            receive(upload, stream, 0, len(data))
+
+        upload.refresh_from_db()
+        self.assertEqual(upload.offset, BUFFER)
+        self.assertEqual(upload.format, 'JPEG')
+
+    def test_non_image_is_rejected_with_first_chunk(self):
+        """Test that an upload that is not an image is discarded"""
+        pk = self.start(size=10000)
+
+        res = self.send(pk, 0, b'<?php echo "hello"; ?>' * 100)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ImageUpload.objects.filter(pk=pk).exists())
+
+    def test_too_many_pixels_is_rejected(self):
+        """Test that the pixel limit is checked from the header"""
+        pk = self.start()
+
+        with self.settings(UPLOAD_MAX_PIXELS=400 * 300 - 1):
+            res = self.send(pk, 0, self.image[:4096])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_chunk_size_is_limited(self):
+        """Test that chunks larger than the chunk size are refused"""
+        pk = self.start()
+
+        res = self.send(pk, 0, self.image[:4097])
+
+        self.assertEqual(res.status_code,
+                         status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    def test_upload_size_is_limited(self):
+        """Test that uploads larger than the maximum can not start"""
+        with self.settings(UPLOAD_MAX_SIZE=100):
+            res = self.client.post(CREATE_UPLOAD_URL, {
+                'name': 'photo.jpg', 'size': 101,
+            })
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_uploads_of_other_users_are_hidden(self):
+        """Test that an upload can only be used by its user"""
+        pk = self.upload()
+        other = get_user_model().objects.create_user(
+            phone='989361234568', author=True,
+        )
+        self.client.force_authenticate(other)
+
+        res = self.client.get(upload_url(pk))
+        create = self.client.post(CREATE_BLOG_URL, {
+            'title': 'title', 'body': 'body', 'summery': 'summery',
+            'category': [], 'status': 'p', 'upload': pk,
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(create.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_blog_is_created_from_upload(self):
+        """Test that a finished upload is attached by reference"""
+        pk = self.upload()
+        image = ImageUpload.objects.get(pk=pk).image
+
+        res = self.client.post(CREATE_BLOG_URL, {
+            'title': 'title', 'body': 'body', 'summery': 'summery',
+            'category': [], 'status': 'p', 'upload': pk,
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Blog.objects.get().image.name, image)
+        self.assertFalse(ImageUpload.objects.filter(pk=pk).exists())
+
+    def test_blog_needs_image_or_upload(self):
+        """Test that a blog can not be created without an image"""
+        res = self.client.post(CREATE_BLOG_URL, {
+            'title': 'title', 'body': 'body', 'summery': 'summery',
+            'category': [], 'status': 'p',
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('image', res.data)
+
+    def test_clean_uploads_command(self):
+        """Test that expired uploads are deleted with their files"""
+        pk = self.start()
+        self.send(pk, 0, self.image[:4096])
+        upload = ImageUpload.objects.get(pk=pk)
+        ImageUpload.objects.filter(pk=pk).update(
+            updated=timezone.now() - timedelta(days=2),
+        )
+
+        call_command('clean_uploads', stdout=StringIO())
+
+        self.assertFalse(ImageUpload.objects.filter(pk=pk).exists())
+        self.assertFalse(os.path.exists(temp_path(upload)))
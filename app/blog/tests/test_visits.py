@@ -0,0 +1,97 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from blog import visits
+from core.models import Blog
+
+
+def detail_url(slug):
+    return reverse('blog:detail', args=[slug])
+
+
+def create_blog(author, slug):
+    return Blog.objects.create(
+        author=author,
+        title=slug,
+        slug=slug,
+        body='body',
+        summery='summery',
+        image='blogs/image.jpg',
+        status='p',
+    )
+
+
+class VisitCounterTests(TestCase):
+    """Test buffered counting of blog visits"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = get_user_model().objects.create_user(
+            phone='989361234567',
+        )
+        self.first = create_blog(self.author, 'first')
+        self.second = create_blog(self.author, 'second')
+        self.counter = visits.VisitCounter()
+        self.flusher = visits.VisitFlusher(self.counter, interval=60)
+
+    def tearDown(self):
+        visits.counter.drain()
+
+    def test_flush_applies_counts_in_one_update(self):
+        """Test that all pending visits are written with one UPDATE"""
+        for _ in range(3):
+            self.counter.add(self.first.id)
+        self.counter.add(self.second.id)
+
+        with CaptureQueriesContext(connection) as context:
+            self.flusher.flush()
+
+        updates = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('UPDATE')
+        ]
+        self.assertEqual(len(updates), 1)
+
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual(self.first.visits, 3)
+        self.assertEqual(self.second.visits, 1)
+        self.assertEqual(len(self.counter), 0)
+
+    def test_flush_without_visits_skips_query(self):
+        """Test that an empty counter does not touch the database"""
+        with self.assertNumQueries(0):
+            self.flusher.flush()
+
+    def test_failed_flush_is_not_retried(self):
+        """Test that a failed batch is dropped rather than counted twice"""
+        self.counter.add(self.first.id)
+
+        with patch('blog.visits.apply_visits', side_effect=Exception):
+            with self.assertLogs('blog.visits', level='ERROR'):
+                self.flusher.flush()
+        self.flusher.flush()
+
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.visits, 0)
+
+    @patch('blog.visits.flusher.ensure_started')
+    def test_retrieve_records_visit(self, ensure_started):
+        """Test that reading a blog buffers a visit without writing it"""
+        res = self.client.get(detail_url(self.first.slug))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(visits.counter.drain(), {self.first.id: 1})
+        self.assertTrue(ensure_started.called)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.visits, 0)
@@ -0,0 +1,200 @@
+"""
+Resumable chunked uploads of blog images.
+
+A client creates an upload with the size of its image, then sends the
+image in chunks of at most `UPLOAD_CHUNK_SIZE` bytes with PATCH requests
+carrying the `Upload-Offset` they start at, much like the tus protocol.
+Chunks are copied from the request into a temporary file `BUFFER` bytes
+at a time, so a worker holds at most one buffer of an upload in memory
+however large the image is. Buffers are read from the client outside of
+any transaction; each one is then written and committed to the upload's
+offset under a short row lock, so an interrupted upload resumes from
+the offset returned by HEAD, and a slow client holds no lock.
+
+The image header is parsed as soon as enough bytes arrived: uploads
+that are not JPEG, PNG, WebP or GIF images, or have more than
+`UPLOAD_MAX_PIXELS` pixels, are rejected with their first chunk. A
+finished image is moved to storage and attached to a blog by upload id.
+"""
+from io import BytesIO
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+
+from PIL import Image
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from core.models import Blog, ImageUpload
+
+
+BUFFER = 64 * 1024
+# Headers not parsed within this many bytes are rejected
+HEADER_LIMIT = 256 * 1024
+EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+SIGNATURES = (
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+    (b'GIF87a', 'GIF'),
+    (b'GIF89a', 'GIF'),
+    (b'RIFF', 'WEBP'),
+)
+
+
+class OffsetConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Upload-Offset does not match the received size.'
+    default_code = 'offset_conflict'
+
+
+class ChunkTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Chunk is larger than the allowed chunk size.'
+    default_code = 'chunk_too_large'
+
+
+class InvalidImage(Exception):
+    pass
+
+
+def temp_path(upload):
+    return os.path.join(settings.UPLOAD_TEMP_DIR, f'{upload.pk}.part')
+
+
+def check_signature(head):
+    """Raise InvalidImage unless head can start a supported image"""
+    for signature, fmt in SIGNATURES:
+        length = min(len(head), len(signature))
+        if head[:length] != signature[:length]:
+            continue
+        if fmt == 'WEBP' and len(head) >= 12 and head[8:12] != b'WEBP':
+            continue
+        return
+    raise InvalidImage('Unsupported image type.')
+
+
+def identify(head, complete):
+    """Return the image described by head, or None until more arrived
+
+    Only the header is parsed; no pixel data is decoded.
+    """
+    check_signature(head)
+    try:
+        image = Image.open(BytesIO(head))
+    except Image.DecompressionBombError:
+        raise InvalidImage('Image has too many pixels.')
+    except OSError:
+        if complete or len(head) >= HEADER_LIMIT:
+            raise InvalidImage('Invalid image.')
+        return None
+
+    if image.format not in EXTENSIONS:
+        raise InvalidImage('Unsupported image type.')
+    if image.width * image.height > settings.UPLOAD_MAX_PIXELS:
+        raise InvalidImage('Image has too many pixels.')
+    return image
+
+
+def describe(upload, head):
+    """Record the format and size of the upload once its header arrived"""
+    image = identify(head, upload.offset == upload.size)
+    if image is not None:
+        upload.format = image.format
+        upload.width, upload.height = image.size
+
+
+def read_head(path, length):
+    if not length:
+        return b''
+    with open(path, 'rb') as file:
+        return file.read(length)
+
+
+def write_buffer(upload, data):
+    """Write data at the offset of the upload and advance the offset
+
+    Bytes past the committed offset, left by an interrupted request, are
+    overwritten.
+    """
+    path = temp_path(upload)
+    os.makedirs(settings.UPLOAD_TEMP_DIR, exist_ok=True)
+    head = b''
+    if not upload.format:
+        head = read_head(path, min(upload.offset, HEADER_LIMIT))
+
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o600)
+    with os.fdopen(fd, 'wb') as file:
+        file.seek(upload.offset)
+        file.truncate()
+        file.write(data)
+    upload.offset += len(data)
+    if not upload.format:
+        describe(upload, (head + data)[:HEADER_LIMIT])
+
+
+def finish(upload):
+    """Move a fully received image from its temporary file to storage"""
+    path = temp_path(upload)
+    storage = Blog._meta.get_field('image').storage
+    name = f'blogs/uploads/{upload.pk}.{EXTENSIONS[upload.format]}'
+    with open(path, 'rb') as file:
+        upload.image = storage.save(name, File(file))
+    os.remove(path)
+    upload.status = 'c'
+
+
+def check_chunk(upload, offset, length):
+    """Raise unless length bytes sent for offset can extend the upload"""
+    if upload.status != 'u' or offset != upload.offset:
+        raise OffsetConflict()
+    if offset + length > upload.size:
+        raise ValidationError(
+            {'detail': 'Chunk ends after the size of the upload.'}
+        )
+
+
+def append(pk, offset, data):
+    """Write a buffer sent for offset and commit the new offset"""
+    with transaction.atomic():
+        upload = ImageUpload.objects.select_for_update().get(pk=pk)
+        check_chunk(upload, offset, len(data))
+        write_buffer(upload, data)
+        if upload.offset == upload.size:
+            finish(upload)
+        upload.save()
+    return upload
+
+
+def receive(upload, stream, offset, length):
+    """Append a chunk of length bytes sent for offset to the upload
+
+    The chunk may end early when the client disconnects; the buffers
+    received until then are kept. Invalid images are discarded along
+    with their upload.
+    """
+    check_chunk(upload, offset, length)
+    remaining = length
+    while remaining:
+        data = stream.read(min(BUFFER, remaining))
+        if not data:
+            break
+        try:
+            upload = append(upload.pk, offset, data)
+        except InvalidImage as exc:
+            discard(upload)
+            raise ValidationError({'detail': str(exc)})
+        offset += len(data)
+        remaining -= len(data)
+    return upload
+
+
+def discard(upload):
+    """Delete an upload with its temporary or stored file"""
+    path = temp_path(upload)
+    if os.path.exists(path):
+        os.remove(path)
+    if upload.image:
+        Blog._meta.get_field('image').storage.delete(upload.image)
+    upload.delete()
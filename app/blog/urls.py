@@ -8,17 +8,25 @@ app_name = 'blog'
 urlpatterns = [
     path('', views.ListBlogApiView.as_view(), name='blogs'),
     path('create/', views.CreateBlogApiView.as_view(), name='create'),
+    path('uploads/',
+         views.CreateImageUploadApiView.as_view(),
+         name='upload_create'
+         ),
+    path('uploads/<uuid:pk>/',
+         views.ImageUploadApiView.as_view(),
+         name='upload'
+         ),
     path('<slug:slug>/',
          views.DetailUpdateDeleteBlogApiView.as_view(),
          name='detail'
          ),
     path('category/list/',
-         views.CreateBlogApiView.as_view(),
-         name='category_blog'
-         ),
-    path('category/<slug:slug>/',
          views.ListCategoryApiView.as_view(),
          name='category_list'
          ),
+    path('category/<slug:slug>/',
+         views.CategoryBlogApiView.as_view(),
+         name='category_blog'
+         ),
     path('like/<int:pk>/', views.BlogLikeApiView.as_view(), name='like'),
 ]
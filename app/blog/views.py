@@ -1,5 +1,13 @@
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.utils.http import parse_etags
+
+from django_filters.rest_framework import DjangoFilterBackend
 
+from rest_framework.filters import OrderingFilter
 from rest_framework.generics import (
     ListAPIView,
     CreateAPIView,
@@ -12,27 +20,55 @@ from rest_framework import status
 
 from blog.serializers import (
     ListBlogsSerializer,
+    FastListBlogsSerializer,
     CreateBlogSerializer,
     DetailUpdateDeleteBlogSerializer,
     ListCategorySerializer,
-
+    FastListCategorySerializer,
+    ImageUploadSerializer,
 )
-from blog.pagination import LimitOffsetPaginationBlog
-from core.models import Blog, Category
+from blog.cache import detail_etag, get_detail, get_version, set_detail
+from blog.categories import get_active_tree
+from blog.filters import FullTextSearchFilter
+from blog.likes import toggle_like
+from blog.pagination import FeedPaginationBlog
+from blog.uploads import ChunkTooLarge, receive
+from blog.visits import record_visit
+from core.models import Blog, ImageUpload
+from extensions.async_views import AsyncAPIViewMixin
+from extensions.fast_serializer import FastListMixin
+from extensions.sparse_fields import SparseFieldsMixin
 from permissions import IsSuperUserOrAuthor, IsSuperUserOrAuthorOrReadOnly
+from throttles import LikeThrottle
 
 
-class ListBlogApiView(ListAPIView):
+class ListBlogApiView(SparseFieldsMixin, FastListMixin, ListAPIView):
     """Returns a list of all existing blogs"""
 
     serializer_class = ListBlogsSerializer
-    pagination_class = LimitOffsetPaginationBlog
+    fast_serializer_class = FastListBlogsSerializer
+    pagination_class = FeedPaginationBlog
+    filter_backends = (
+        DjangoFilterBackend,
+        FullTextSearchFilter,
+        OrderingFilter,
+    )
     filterset_fields = ('category', 'special')
     search_fields = ('title', 'summery', 'author__first_name')
     ordering_fields = ('publish', 'special')
 
     def get_queryset(self):
-        return Blog.objects.publish()
+        return Blog.objects.feed()
+
+
+class AsyncListBlogApiView(AsyncAPIViewMixin, ListBlogApiView):
+    """Async variant of ListBlogApiView
+
+    Filtering, the page query and the page lookups run in one thread.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        return await sync_to_async(self.list)(request, *args, **kwargs)
 
 
 class CreateBlogApiView(CreateAPIView):
@@ -47,29 +83,72 @@ class CreateBlogApiView(CreateAPIView):
     def perform_create(self, serializer):
         if not self.request.user.is_superuser:
             return serializer.save(
-                author=self.request.user,
+                author_id=self.request.user.pk,
                 status='d',
                 special=False,
             )
 
-        return serializer.save(author=self.request.user)
+        return serializer.save(author_id=self.request.user.pk)
+
 
+class DetailUpdateDeleteBlogApiView(SparseFieldsMixin,
+                                    RetrieveUpdateDestroyAPIView):
+    """Returns the details of a post, Updates and Delete an existing post
 
-class DetailUpdateDeleteBlogApiView(RetrieveUpdateDestroyAPIView):
-    """Returns the details of a post, Updates and Delete an existing post"""
+    Sparse details are cut from the cached detail when there is one and
+    read with only their columns otherwise, without being cached.
+    """
 
     serializer_class = DetailUpdateDeleteBlogSerializer
     permission_classes = (IsSuperUserOrAuthorOrReadOnly,)
     lookup_field = 'slug'
 
     def get_object(self):
-        blog = get_object_or_404(Blog, slug=self.kwargs.get('slug'))
+        blog = get_object_or_404(
+            self.get_sparse_queryset(Blog.objects.select_related('author')),
+            slug=self.kwargs.get('slug'),
+        )
+        self.check_object_permissions(self.request, blog)
         return blog
 
+    def retrieve(self, request, *args, **kwargs):
+        entry = get_detail(self.kwargs['slug'])
+        selected = self.get_selected_fields()
+        if entry is None and selected is None:
+            pk = Blog.objects.filter(
+                slug=self.kwargs['slug'],
+            ).values_list('pk', flat=True).first()
+            version = None if pk is None else get_version(pk)
+            data = self.get_serializer(self.get_object()).data
+            if data['id'] == pk:
+                entry = set_detail(self.kwargs['slug'], data, version)
+            else:
+                entry = {'data': data, 'etag': detail_etag(data)}
+
+        if entry is None:
+            blog = self.get_object()
+            pk, data = blog.pk, self.get_serializer(blog).data
+            etag = detail_etag(data)
+        else:
+            pk, data, etag = entry['data']['id'], entry['data'], entry['etag']
+            if selected is not None:
+                data = {name: data[name] for name in selected}
+                etag = detail_etag(data)
+
+        record_visit(pk)
+
+        etags = parse_etags(request.headers.get('If-None-Match', ''))
+        if '*' in etags or etag in etags:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        return response
+
     def perform_update(self, serializer):
         if not self.request.user.is_superuser:
             return serializer.save(
-                author=self.request.user,
+                author_id=self.request.user.pk,
                 status='d',
                 special=False,
             )
@@ -77,19 +156,55 @@ class DetailUpdateDeleteBlogApiView(RetrieveUpdateDestroyAPIView):
         return serializer.save()
 
 
-class CategoryBlogApiView(ListAPIView):
-    """Returns the list of blogs on a particular category"""
+class AsyncDetailUpdateDeleteBlogApiView(AsyncAPIViewMixin,
+                                         DetailUpdateDeleteBlogApiView):
+    """Async variant of DetailUpdateDeleteBlogApiView
+
+    Every method runs in a thread, cached details included: the async
+    cache API of this Django version runs the sync one in a thread too.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        return await sync_to_async(self.retrieve)(request, *args, **kwargs)
+
+    async def put(self, request, *args, **kwargs):
+        return await sync_to_async(self.update)(request, *args, **kwargs)
+
+    async def patch(self, request, *args, **kwargs):
+        return await sync_to_async(self.partial_update)(
+            request, *args, **kwargs
+        )
+
+    async def delete(self, request, *args, **kwargs):
+        return await sync_to_async(self.destroy)(request, *args, **kwargs)
+
+
+class CategoryBlogApiView(SparseFieldsMixin, FastListMixin, ListAPIView):
+    """Returns the list of blogs on a particular category
+
+    With `?descendants=true` blogs of its active subcategories are listed
+    as well.
+    """
 
     serializer_class = ListBlogsSerializer
+    fast_serializer_class = FastListBlogsSerializer
+    pagination_class = FeedPaginationBlog
     lookup_field = 'slug'
 
     def get_queryset(self):
-        category = get_object_or_404(
-                Category.objects.active(),
-                slug=self.kwargs.get('slug')
-            )
-        queryset = category.blogs.publish()
-        return queryset
+        tree = get_active_tree()
+        category = tree.get(self.kwargs.get('slug'))
+        if category is None:
+            raise Http404
+
+        category_ids = [category.id]
+        if self.request.query_params.get('descendants') == 'true':
+            category_ids = tree.subtree_ids(category)
+
+        blog_ids = Blog.category.through.objects.filter(
+            category_id__in=category_ids
+        ).values('blog_id')
+        return Blog.objects.feed().filter(pk__in=blog_ids)
 
 
 class ListCategoryApiView(ListAPIView):
@@ -97,26 +212,98 @@ class ListCategoryApiView(ListAPIView):
 
     serializer_class = ListCategorySerializer
     lookup_field = 'slug'
-    queryset = Category.objects.active()
+    filter_backends = ()
+
+    def get_queryset(self):
+        return get_active_tree().categories
+
+    def list(self, request, *args, **kwargs):
+        serializer = FastListCategorySerializer(self.get_serializer_context())
+        return Response(serializer.serialize(self.get_queryset()))
+
+
+class AsyncListCategoryApiView(AsyncAPIViewMixin, ListCategoryApiView):
+    """Async variant of ListCategoryApiView
+
+    The tree is read from the cache, or built, in a thread.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        return await sync_to_async(self.list)(request, *args, **kwargs)
 
 
 class BlogLikeApiView(APIView):
     """Likes the desired blog"""
 
     permission_classes = (IsAuthenticated,)
+    throttle_classes = (LikeThrottle,)
 
     def get(self, request, pk):
-        user = request.user
-        blog = get_object_or_404(Blog, pk=pk, status='p')
+        if not Blog.objects.publish().filter(pk=pk).exists():
+            raise Http404
 
-        if user in blog.likes.all():
-            blog.likes.remove(user)
-        else:
-            blog.likes.add(user)
+        liked = toggle_like(pk, request.user.pk)
 
         return Response(
             {
-                'Ok': 'Your request was successful.'
+                'Ok': 'Your request was successful.',
+                'liked': liked,
             },
             status=status.HTTP_200_OK,
         )
+
+
+class CreateImageUploadApiView(CreateAPIView):
+    """Starts a chunked upload of a blog image
+
+    The image is then sent with PATCH requests to the upload and attached
+    to a blog by sending its id as `upload`.
+    """
+
+    serializer_class = ImageUploadSerializer
+    permission_classes = (IsSuperUserOrAuthor,)
+
+    def perform_create(self, serializer):
+        serializer.save(user_id=self.request.user.pk)
+
+
+class ImageUploadApiView(APIView):
+    """Reports the progress of an upload and receives its chunks
+
+    PATCH bodies are raw image bytes starting at the `Upload-Offset`
+    header, which must equal the bytes received so far.
+    """
+
+    permission_classes = (IsSuperUserOrAuthor,)
+
+    def get_object(self):
+        return get_object_or_404(
+            ImageUpload, pk=self.kwargs['pk'], user_id=self.request.user.pk,
+        )
+
+    def respond(self, upload, **kwargs):
+        response = Response(ImageUploadSerializer(upload).data, **kwargs)
+        response['Upload-Offset'] = upload.offset
+        response['Upload-Length'] = upload.size
+        return response
+
+    def get(self, request, pk):
+        return self.respond(self.get_object())
+
+    def head(self, request, pk):
+        return self.respond(self.get_object())
+
+    def patch(self, request, pk):
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (KeyError, ValueError):
+            return Response(
+                {'detail': 'A numeric Upload-Offset header is required.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if length > settings.UPLOAD_CHUNK_SIZE:
+            raise ChunkTooLarge()
+
+        upload = receive(self.get_object(), request.stream, offset, length)
+        return self.respond(upload)
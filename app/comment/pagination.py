@@ -0,0 +1,8 @@
+from rest_framework.pagination import LimitOffsetPagination
+
+
+class LimitOffsetPaginationComment(LimitOffsetPagination):
+    """Pagination for one level of a comment tree"""
+
+    default_limit = 20
+    max_limit = 100
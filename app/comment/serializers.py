@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from core.models import Comment
+from extensions.fast_serializer import FastSerializer
 
 
 class ListCommentSerializer(serializers.ModelSerializer):
@@ -18,9 +19,71 @@ class ListCommentSerializer(serializers.ModelSerializer):
         }
 
 
+class FastListCommentSerializer(FastSerializer):
+    """Read path of ListCommentSerializer over values_list rows"""
+
+    model = Comment
+    fields = ListCommentSerializer.Meta.fields
+    sources = {'parent': 'parent_id'}
+    method_columns = {'user': ('user__first_name',)}
+
+    def get_user(self, row):
+        return {
+            "name": row.user__first_name,
+        }
+
+
 class CreateUpdateCommentSerializer(serializers.ModelSerializer):
     """Creates and updates comments"""
 
     class Meta:
         model = Comment
         fields = ('object_id', 'name', 'parent', 'body')
+
+
+class CommentTreeQuerySerializer(serializers.Serializer):
+    """Validate query parameters of the comment tree"""
+
+    parent = serializers.IntegerField(required=False, min_value=1)
+    depth = serializers.IntegerField(default=3, min_value=1, max_value=10)
+    children_limit = serializers.IntegerField(
+        default=5, min_value=0, max_value=50,
+    )
+
+
+class CommentTreeSerializer(serializers.ModelSerializer):
+    """Returns a comment with its replies nested up to a depth
+
+    The context holds `children`, the replies of every comment grouped by
+    parent id, so nesting does not query the database.
+    """
+
+    user = serializers.SerializerMethodField()
+    children_count = serializers.SerializerMethodField()
+    children = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Comment
+        fields = ('id', 'user', 'name', 'body', 'create', 'children_count',
+                  'children')
+
+    def get_user(self, obj):
+        return {
+            "name": obj.user.first_name,
+        }
+
+    def get_children_count(self, obj):
+        return len(self.context['children'].get(obj.id, ()))
+
+    def get_children(self, obj):
+        depth = self.context['depth'] - 1
+        if depth < 1:
+            return []
+
+        children = self.context['children'].get(obj.id, ())
+        serializer = CommentTreeSerializer(
+            children[:self.context['children_limit']],
+            many=True,
+            context={**self.context, 'depth': depth},
+        )
+        return serializer.data
@@ -0,0 +1,72 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.managers import CommentManager
+from core.models import Blog, Comment
+
+
+BLOGS_URL = reverse('blog:blogs')
+
+
+def create_blog(author, slug):
+    return Blog.objects.create(
+        author=author,
+        title=slug,
+        slug=slug,
+        body='body',
+        summery='summery',
+        image='blogs/image.jpg',
+        status='p',
+    )
+
+
+class CommentCountTests(TestCase):
+    """Test content type lookups and bulk comment counts"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            phone='989361234567',
+        )
+        self.blogs = [create_blog(self.user, f'blog-{i}') for i in range(3)]
+        content_type = Comment.objects.content_type_for(Blog)
+        for blog, count in zip(self.blogs, (2, 0, 1)):
+            for _ in range(count):
+                Comment.objects.create(
+                    user=self.user,
+                    content_type=content_type,
+                    object_id=blog.id,
+                    body='body',
+                )
+
+    def test_content_type_loaded_once(self):
+        """Test that commentable content types are cached per process"""
+        CommentManager.clear_content_types()
+        ContentType.objects.clear_cache()
+        with self.assertNumQueries(1):
+            Comment.objects.content_type_for(Blog)
+
+        with self.assertNumQueries(0):
+            content_type = Comment.objects.content_type_for(self.blogs[0])
+
+        self.assertEqual(content_type.model_class(), Blog)
+
+    def test_comment_counts_in_one_query(self):
+        """Test that comments of many blogs are counted in one query"""
+        with self.assertNumQueries(1):
+            counts = Comment.objects.comment_counts_for(self.blogs)
+
+        self.assertEqual(counts, {self.blogs[0].id: 2, self.blogs[2].id: 1})
+
+    def test_feed_shows_comment_counts(self):
+        """Test that the blog feed returns the comment count of blogs"""
+        res = APIClient().get(BLOGS_URL)
+
+        comments = {blog['id']: blog['comments'] for blog in res.data['results']}
+        self.assertEqual(
+            comments,
+            {self.blogs[0].id: 2, self.blogs[1].id: 0, self.blogs[2].id: 1},
+        )
@@ -0,0 +1,113 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Blog, Comment
+
+
+def tree_url(pk):
+    return reverse('comment:comment_tree', args=[pk])
+
+
+class CommentTreeApiTests(TestCase):
+    """Test the comment tree of a blog"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            phone='989361234567', first_name='name',
+        )
+        self.blog = Blog.objects.create(
+            author=self.user,
+            title='title',
+            slug='title',
+            body='body',
+            summery='summery',
+            image='blogs/image.jpg',
+            status='p',
+        )
+        self.content_type = ContentType.objects.get_for_model(self.blog)
+
+    def create_comment(self, body, parent=None):
+        return Comment.objects.create(
+            user=self.user,
+            content_type=self.content_type,
+            object_id=self.blog.id,
+            parent=parent,
+            body=body,
+        )
+
+    def test_tree_is_nested(self):
+        """Test that replies are nested under their parents"""
+        root = self.create_comment('root')
+        reply = self.create_comment('reply', parent=root)
+        self.create_comment('nested', parent=reply)
+
+        res = self.client.get(tree_url(self.blog.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['count'], 1)
+        node = res.data['results'][0]
+        self.assertEqual(node['body'], 'root')
+        self.assertEqual(node['user'], {'name': 'name'})
+        self.assertEqual(node['children'][0]['body'], 'reply')
+        self.assertEqual(
+            node['children'][0]['children'][0]['body'], 'nested'
+        )
+
+    def test_tree_queries_do_not_grow(self):
+        """Test that the tree costs two queries whatever its size"""
+        for index in range(5):
+            root = self.create_comment(f'root {index}')
+            for _ in range(3):
+                self.create_comment('reply', parent=root)
+
+        with self.assertNumQueries(2):
+            res = self.client.get(tree_url(self.blog.id))
+
+        self.assertEqual(len(res.data['results']), 5)
+
+    def test_depth_and_children_limit(self):
+        """Test that nesting depth and replies per comment are capped"""
+        root = self.create_comment('root')
+        for _ in range(3):
+            reply = self.create_comment('reply', parent=root)
+        self.create_comment('nested', parent=reply)
+
+        res = self.client.get(
+            tree_url(self.blog.id), {'depth': 2, 'children_limit': 2},
+        )
+
+        node = res.data['results'][0]
+        self.assertEqual(node['children_count'], 3)
+        self.assertEqual(len(node['children']), 2)
+        self.assertEqual(node['children'][0]['children_count'], 1)
+        self.assertEqual(node['children'][0]['children'], [])
+
+    def test_paginate_replies_of_parent(self):
+        """Test that the replies of one comment can be paged"""
+        root = self.create_comment('root')
+        replies = [
+            self.create_comment(f'reply {index}', parent=root)
+            for index in range(3)
+        ]
+
+        res = self.client.get(
+            tree_url(self.blog.id),
+            {'parent': root.id, 'limit': 2, 'offset': 2},
+        )
+
+        self.assertEqual(res.data['count'], 3)
+        self.assertEqual(
+            [node['id'] for node in res.data['results']], [replies[0].id],
+        )
+
+    def test_invalid_depth(self):
+        """Test that an out of range depth is rejected"""
+        res = self.client.get(tree_url(self.blog.id), {'depth': 0})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,63 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from comment.serializers import ListCommentSerializer
+from core.models import Blog, Comment
+
+
+class FastCommentSerializerTests(TestCase):
+    """Test that comments render exactly like the DRF serializer"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            phone='989361234567', first_name='name',
+        )
+        self.blog = Blog.objects.create(
+            author=self.user,
+            title='title',
+            slug='title',
+            body='body',
+            summery='summery',
+            image='blogs/image.jpg',
+            status='p',
+        )
+        content_type = Comment.objects.content_type_for(Blog)
+        parent = Comment.objects.create(
+            user=self.user, content_type=content_type,
+            object_id=self.blog.id, body='body',
+        )
+        Comment.objects.create(
+            user=self.user, content_type=content_type,
+            object_id=self.blog.id, body='reply', name='reply',
+            parent=parent,
+        )
+
+    def get_comments(self, params=None):
+        res = APIClient().get(
+            reverse('comment:comments', args=[self.blog.id]), params,
+        )
+        self.assertTrue(res.streaming)
+        return b''.join(res.streaming_content)
+
+    def test_comment_list_matches_drf(self):
+        """Test comments with and without a parent"""
+        content = self.get_comments()
+
+        drf = ListCommentSerializer(
+            Comment.objects.filter_by_instance(self.blog), many=True,
+        ).data
+        self.assertEqual(len(json.loads(content)), 2)
+        self.assertEqual(content, JSONRenderer().render(drf))
+
+    def test_comment_list_fields(self):
+        """Test that the fields of comments can be selected"""
+        content = self.get_comments({'exclude': 'user,body'})
+
+        self.assertEqual(list(json.loads(content)[0]),
+                         ['name', 'parent', 'create', 'object_id'])
@@ -0,0 +1,13 @@
+from collections import defaultdict
+
+
+def group_by_parent(comments):
+    """Map each parent id to its replies in one pass over comments
+
+    Top level comments are grouped under None and the order of comments
+    is kept within every group.
+    """
+    children = defaultdict(list)
+    for comment in comments:
+        children[comment.parent_id].append(comment)
+    return children
@@ -7,6 +7,9 @@ app_name = 'comment'
 
 urlpatterns = [
     path('<int:pk>/', views.ListCommentApiView.as_view(), name='comments'),
+    path('<int:pk>/tree/',
+         views.CommentTreeApiView.as_view(),
+         name='comment_tree'),
     path('create/', views.CreateCommentApiView.as_view(), name='create'),
     path('update-delete/<int:pk>/',
          views.UpdateDeleteCommentApiView.as_view(),
@@ -1,35 +1,123 @@
-from django.contrib.contenttypes.models import ContentType
+from asgiref.sync import sync_to_async
+
 from django.shortcuts import get_object_or_404
 
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
+from comment.pagination import LimitOffsetPaginationComment
 from comment.serializers import (
-    ListCommentSerializer,
-    CreateUpdateCommentSerializer
+    FastListCommentSerializer,
+    CreateUpdateCommentSerializer,
+    CommentTreeQuerySerializer,
+    CommentTreeSerializer,
 )
+from comment.tree import group_by_parent
 from core.models import Blog, Comment
+from extensions.async_views import AsyncAPIViewMixin
+from extensions.renderers import StreamingJSONResponse, chunks
+from extensions.sparse_fields import requested_fields
+from throttles import CommentThrottle
 
 
 class ListCommentApiView(APIView):
-    """Returns the list of comments on a particular post"""
+    """Returns the list of comments on a particular post
+
+    `?fields=` and `?exclude=` select the fields of each comment. JSON is
+    streamed while comments are read, `chunk_size` at a time.
+    """
+
+    chunk_size = 500
+
+    def get_rows(self, request, pk):
+        """Return the serializer of the selected fields and the rows"""
+        serializer = FastListCommentSerializer({
+            'fields': requested_fields(
+                request, FastListCommentSerializer.fields,
+            ),
+        })
+        blog = get_object_or_404(Blog, id=pk, status="p")
+        rows = Comment.objects.filter_by_instance(blog).values_list(
+            *serializer.columns(), named=True,
+        )
+        return serializer, rows
 
     def get(self, request, pk):
+        serializer, rows = self.get_rows(request, pk)
+        if not isinstance(request.accepted_renderer, JSONRenderer):
+            return Response(
+                serializer.serialize(rows),
+                status=status.HTTP_200_OK,
+            )
+
+        rows = rows.iterator(chunk_size=self.chunk_size)
+        return StreamingJSONResponse(
+            serializer.serialize(chunk)
+            for chunk in chunks(rows, self.chunk_size)
+        )
+
+
+class AsyncListCommentApiView(AsyncAPIViewMixin, ListCommentApiView):
+    """Async variant of ListCommentApiView
+
+    Comments are read and serialized in a thread and sent whole, as the
+    ASGI handler of this Django version iterates streaming responses on
+    the event loop, where the ORM can not run.
+    """
+
+    async def get(self, request, pk):
+        data = await sync_to_async(self.serialize_comments)(request, pk)
+        return Response(data, status=status.HTTP_200_OK)
+
+    def serialize_comments(self, request, pk):
+        serializer, rows = self.get_rows(request, pk)
+        return serializer.serialize(rows)
+
+
+class CommentTreeApiView(APIView):
+    """Returns the comments of a post as a tree of replies
+
+    All comments of the post are read in one query and nested in memory.
+    `parent` selects the level to list, `depth` limits nesting and
+    `children_limit` caps the replies shown per comment; each level is
+    paginated with limit and offset.
+    """
+
+    pagination_class = LimitOffsetPaginationComment
+
+    def get(self, request, pk):
+        params = CommentTreeQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
         blog = get_object_or_404(Blog, id=pk, status="p")
-        query = Comment.objects.filter_by_instance(blog)
-        serializer = ListCommentSerializer(query, many=True)
-        return Response(
-            serializer.data,
-            status=status.HTTP_200_OK,
+        children = group_by_parent(Comment.objects.thread_by_instance(blog))
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(
+            children.get(params.validated_data.get('parent'), []),
+            request,
+            view=self,
+        )
+        serializer = CommentTreeSerializer(
+            page,
+            many=True,
+            context={
+                'children': children,
+                'depth': params.validated_data['depth'],
+                'children_limit': params.validated_data['children_limit'],
+            },
         )
+        return paginator.get_paginated_response(serializer.data)
 
 
 class CreateCommentApiView(APIView):
     """Create a comment instnace and returns created comment data"""
 
     permission_classes = (IsAuthenticated,)
+    throttle_classes = (CommentThrottle,)
 
     def post(self, request):
         serializer = CreateUpdateCommentSerializer(data=request.data)
@@ -38,9 +126,9 @@ class CreateCommentApiView(APIView):
             blog = get_object_or_404(
                 Blog, pk=serializer.data.get('object_id'), status='p'
             )
-            comment_for_model = ContentType.objects.get_for_model(blog)
+            comment_for_model = Comment.objects.content_type_for(blog)
             Comment.objects.create(
-                user=request.user,
+                user_id=request.user.pk,
                 name=serializer.data.get('name'),
                 content_type=comment_for_model,
                 object_id=blog.id,
@@ -64,7 +152,7 @@ class UpdateDeleteCommentApiView(APIView):
     permission_classes = (IsAuthenticated,)
 
     def put(self, request, pk):
-        comment = get_object_or_404(Comment, pk=pk, user=request.user)
+        comment = get_object_or_404(Comment, pk=pk, user_id=request.user.pk)
         serializer = CreateUpdateCommentSerializer(comment, data=request.data)
         if serializer.is_valid():
             serializer.save()
@@ -79,6 +167,6 @@ class UpdateDeleteCommentApiView(APIView):
             )
 
     def delete(self, request, pk):
-        comment = get_object_or_404(Comment, pk=pk, user=request.user)
+        comment = get_object_or_404(Comment, pk=pk, user_id=request.user.pk)
         comment.delete()
         return Response(status.HTTP_204_NO_CONTENT,)
@@ -3,6 +3,10 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The ASGI application serves the URLs of ``config.asgi_urls``: the hot read
+endpoints are async views there. Their queries and cache reads still run
+in a thread per request, as Django 4.0 has no async ORM.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
 """
@@ -12,5 +16,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('ROOT_URLCONF', 'config.asgi_urls')
 
 application = get_asgi_application()
@@ -0,0 +1,19 @@
+"""
+URL configuration of the ASGI application.
+
+The URLs of config.urls, with the hot read endpoints served by their
+async variants.
+"""
+from blog import views as blog_views
+from comment import views as comment_views
+from config.urls import urlpatterns as sync_urlpatterns
+from extensions.async_views import async_urlpatterns
+
+
+urlpatterns = async_urlpatterns(sync_urlpatterns, {
+    blog_views.ListBlogApiView: blog_views.AsyncListBlogApiView,
+    blog_views.DetailUpdateDeleteBlogApiView:
+        blog_views.AsyncDetailUpdateDeleteBlogApiView,
+    blog_views.ListCategoryApiView: blog_views.AsyncListCategoryApiView,
+    comment_views.ListCommentApiView: comment_views.AsyncListCommentApiView,
+})
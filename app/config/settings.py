@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.0/ref/settings/
 """
 import os
 from pathlib import Path
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -57,6 +58,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -66,7 +68,8 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'config.urls'
+# config.asgi serves config.asgi_urls, with async read endpoints
+ROOT_URLCONF = os.environ.get('ROOT_URLCONF', 'config.urls')
 
 TEMPLATES = [
     {
@@ -153,7 +156,7 @@ AUTH_USER_MODEL = 'core.User'
 # Rest Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'user.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'permissions.IsSuperUserOrReadOnly',
@@ -164,9 +167,30 @@ REST_FRAMEWORK = {
         'rest_framework.filters.OrderingFilter',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # orjson when installed, DRF's json module otherwise
+    'DEFAULT_RENDERER_CLASSES': (
+        'extensions.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'extensions.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    'DEFAULT_THROTTLE_RATES': {
+        'otp_phone': os.environ.get('THROTTLE_OTP_PHONE', '5/hour'),
+        'otp_ip': os.environ.get('THROTTLE_OTP_IP', '30/hour'),
+        'otp_verify': os.environ.get('THROTTLE_OTP_VERIFY', '10/hour'),
+        'comment': os.environ.get('THROTTLE_COMMENT', '20/min'),
+        'like': os.environ.get('THROTTLE_LIKE', '60/min'),
+    },
 }
 
 
+SIMPLE_JWT = {
+    'TOKEN_REFRESH_SERIALIZER': 'user.serializers.ClaimsTokenRefreshSerializer',
+}
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Blog App Api',
     'DESCRIPTION': 'Simple Blog API',
@@ -175,3 +199,103 @@ SPECTACULAR_SETTINGS = {
     'SWAGGER_UI_FAVICON_HREF': 'SIDECAR',
     'REDOC_DIST': 'SIDECAR',
 }
+
+# Seconds between writes of buffered blog visits to the database
+VISITS_FLUSH_INTERVAL = int(os.environ.get('VISITS_FLUSH_INTERVAL', 10))
+
+# Seconds a serialized blog detail is kept in the cache
+BLOG_DETAIL_CACHE_TIMEOUT = int(
+    os.environ.get('BLOG_DETAIL_CACHE_TIMEOUT', 300)
+)
+
+# Seconds the tree of active categories is kept in the cache, bounding
+# how long a tree built during a category change can be served
+CATEGORY_TREE_CACHE_TIMEOUT = int(
+    os.environ.get('CATEGORY_TREE_CACHE_TIMEOUT', 300)
+)
+
+# Fraction of requests measured by the instrumentation middleware
+METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', 0.1))
+
+# Seconds a sent OTP code stays valid
+OTP_TIMEOUT = int(os.environ.get('OTP_TIMEOUT', 300))
+
+# Gateway the deliver_otps worker sends codes through, and how often and
+# how far apart (base seconds, doubled per attempt) it tries
+OTP_GATEWAY = os.environ.get('OTP_GATEWAY', 'user.gateways.ConsoleGateway')
+OTP_DELIVERY_MAX_ATTEMPTS = int(
+    os.environ.get('OTP_DELIVERY_MAX_ATTEMPTS', 5)
+)
+OTP_DELIVERY_BACKOFF = float(os.environ.get('OTP_DELIVERY_BACKOFF', 2))
+
+# Cache shared by all processes: Redis when CACHE_URL is set, otherwise
+# files under CACHE_DIR, which needs no network but is limited to one
+# host. Every subsystem gets its own alias and key prefix.
+CACHE_URL = os.environ.get('CACHE_URL')
+CACHE_DIR = os.environ.get(
+    'CACHE_DIR', os.path.join(tempfile.gettempdir(), 'blog-app-cache'),
+)
+
+
+def shared_cache(namespace):
+    if CACHE_URL:
+        return {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': namespace,
+        }
+    return {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_DIR, namespace),
+        'KEY_PREFIX': namespace,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+
+
+CACHES = {
+    # Per-process LRU in front of the shared cache
+    'default': {
+        'BACKEND': 'extensions.cache.TieredCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {
+            'LOCAL_TIMEOUT': int(os.environ.get('CACHE_LOCAL_TIMEOUT', 5)),
+            'MAX_ENTRIES': 1000,
+        },
+    },
+    'shared': shared_cache('app'),
+    # OTP codes must never be read from a stale local copy
+    'otp': shared_cache('otp'),
+    # Rate limit counters; keys are per window, so a long default timeout
+    # only delays their cleanup
+    'throttle': {**shared_cache('throttle'), 'TIMEOUT': 2 * 24 * 3600},
+    # Copies of the token revocation times saved on users
+    'auth': shared_cache('auth'),
+}
+
+# Tests keep every cache in process memory
+TEST_RUNNER = 'config.test_runner.TestRunner'
+
+# Seconds a process trusts its copy of a user's token revocation time
+AUTH_STATE_CACHE_TIMEOUT = int(os.environ.get('AUTH_STATE_CACHE_TIMEOUT', 10))
+
+# Widths in pixels of the resized copies made of blog images
+BLOG_IMAGE_WIDTHS = [
+    int(width) for width in
+    os.environ.get('BLOG_IMAGE_WIDTHS', '320,640,1280').split(',')
+]
+# Formats of the resized copies, webp is skipped when Pillow lacks it
+BLOG_IMAGE_FORMATS = ('webp', 'jpeg')
+BLOG_IMAGE_QUALITY = int(os.environ.get('BLOG_IMAGE_QUALITY', 80))
+# Threads per process resizing images, 0 resizes them on commit instead
+BLOG_IMAGE_WORKERS = int(os.environ.get('BLOG_IMAGE_WORKERS', 2))
+
+# Chunked blog image uploads are assembled in UPLOAD_TEMP_DIR
+UPLOAD_TEMP_DIR = os.environ.get(
+    'UPLOAD_TEMP_DIR', os.path.join(tempfile.gettempdir(), 'blog-uploads'),
+)
+UPLOAD_MAX_SIZE = int(os.environ.get('UPLOAD_MAX_SIZE', 10 * 1024 * 1024))
+# Largest chunk accepted per request, matches the proxy body limit
+UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 1024 * 1024))
+UPLOAD_MAX_PIXELS = int(os.environ.get('UPLOAD_MAX_PIXELS', 40_000_000))
+# Seconds an unfinished or unattached upload is kept
+UPLOAD_EXPIRY = int(os.environ.get('UPLOAD_EXPIRY', 24 * 3600))
@@ -0,0 +1,23 @@
+"""
+Test runner of the project.
+"""
+from django.test.runner import DiscoverRunner
+
+from extensions.cache import isolated_caches
+
+
+class TestRunner(DiscoverRunner):
+    """Runs tests with every cache in process memory
+
+    Tests clear caches, which must never reach the Redis or file cache
+    shared with running processes.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.caches = isolated_caches()
+        self.caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.caches.disable()
+        super().teardown_test_environment(**kwargs)
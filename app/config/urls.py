@@ -8,6 +8,8 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView
 )
 
+from core.views import MetricsApiView
+
 from drf_spectacular.views import (
     SpectacularAPIView,
     SpectacularRedocView,
@@ -19,6 +21,7 @@ urlpatterns = [
     path('api/user/', include('user.urls', namespace='user')),
     path('api/blog/', include('blog.urls', namespace='blog')),
     path('api/comment/', include('comment.urls', namespace='comment')),
+    path('api/metrics/', MetricsApiView.as_view(), name='metrics'),
 
     path(
         'api/token/refresh/',
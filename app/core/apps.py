@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from core.managers import CommentManager
+        from core.metrics import install_query_tracking, instrument_serializers
+
+        instrument_serializers()
+        connection_created.connect(install_query_tracking)
+
+        # Content type ids may change when the database is flushed.
+        post_migrate.connect(CommentManager.clear_content_types)
@@ -0,0 +1,201 @@
+"""
+Django command to benchmark the public API.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from benchmarks import concurrency, data, otp, runner, serializers
+from blog.visits import flusher
+from extensions.cache import isolated_caches
+
+
+class Command(BaseCommand):
+    """Django command to run request benchmarks on generated data.
+
+    The benchmarks run against a throwaway test database and with every
+    cache in process memory, so neither the configured database nor the
+    shared cache is modified.
+    """
+
+    help = 'Benchmark API endpoints and compare them with a baseline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--blogs', type=int, default=200)
+        parser.add_argument('--comments', type=int, default=5)
+        parser.add_argument('--replies', type=int, default=2)
+        parser.add_argument('--likes', type=int, default=10)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--endpoint', action='append', dest='endpoints',
+            help='Only run the named benchmark; may be repeated.',
+        )
+        parser.add_argument(
+            '--otp-rows', type=int, action='append',
+            help='Also time OTP verification with this many PhoneOtp rows; '
+                 'may be repeated.',
+        )
+        parser.add_argument(
+            '--serializers', type=int, metavar='ROWS',
+            help='Also time the list serializers on this many rows.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, metavar='REQUESTS',
+            help='Also compare WSGI and ASGI throughput with this many '
+                 'requests in flight and slow queries.',
+        )
+        parser.add_argument(
+            '--query-delay', type=float, default=0.05,
+            help='Seconds added to every query by --concurrency.',
+        )
+        parser.add_argument(
+            '--baseline', default='benchmarks/baseline.json',
+            help='Path of the baseline JSON file.',
+        )
+        parser.add_argument(
+            '--save', action='store_true',
+            help='Write the results as the new baseline.',
+        )
+        parser.add_argument(
+            '--compare', action='store_true',
+            help='Fail if results regressed against the baseline.',
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=0.25,
+            help='Allowed p95 latency growth as a fraction of the baseline.',
+        )
+        parser.add_argument(
+            '--min-delta', type=float, default=1.0,
+            help='Ignore p95 latency growth below this many milliseconds.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        with isolated_caches():
+            self.benchmark(options)
+
+    def benchmark(self, options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            self.stdout.write('Generating data...')
+            sample = data.generate(
+                users=options['users'],
+                categories=options['categories'],
+                blogs=options['blogs'],
+                comments=options['comments'],
+                replies=options['replies'],
+                likes=options['likes'],
+            )
+            results = runner.run(
+                sample,
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                names=options['endpoints'],
+            )
+            otp_results = None
+            if options['otp_rows']:
+                self.stdout.write('Timing OTP verification...')
+                otp_results = otp.run(
+                    options['otp_rows'],
+                    iterations=options['iterations'],
+                    warmup=options['warmup'],
+                )
+            serializer_results = None
+            if options['serializers']:
+                self.stdout.write('Timing serializers...')
+                serializer_results = serializers.run(
+                    options['serializers'],
+                    iterations=options['iterations'],
+                    warmup=options['warmup'],
+                )
+            concurrency_results = None
+            if options['concurrency']:
+                self.stdout.write('Comparing WSGI and ASGI throughput...')
+                concurrency_results = concurrency.run(
+                    sample,
+                    requests=options['iterations'] * 4,
+                    concurrency=options['concurrency'],
+                    delay=options['query_delay'],
+                )
+        finally:
+            flusher.stop()
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        self.write_results(results)
+        if otp_results:
+            self.write_otp_results(otp_results)
+        if serializer_results:
+            self.write_serializer_results(serializer_results)
+        if concurrency_results:
+            self.write_concurrency_results(concurrency_results)
+
+        if options['save']:
+            runner.save_baseline(options['baseline'], results)
+            self.stdout.write(f'Baseline written to {options["baseline"]}')
+
+        if options['compare']:
+            baseline = runner.load_baseline(options['baseline'])
+            regressions = runner.compare(
+                results, baseline, options['threshold'],
+                options['min_delta'],
+            )
+            if regressions:
+                raise CommandError(
+                    'Regressions found:\n' + '\n'.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS('No regressions found!'))
+
+    def write_results(self, results):
+        self.stdout.write(
+            f'{"endpoint":<32}{"p50":>10}{"p95":>10}{"p99":>10}'
+            f'{"queries":>10}'
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<32}{result["p50"]:>10}{result["p95"]:>10}'
+                f'{result["p99"]:>10}{result["queries"]:>10}'
+            )
+
+    def write_otp_results(self, results):
+        self.stdout.write(
+            f'{"PhoneOtp rows":<32}{"p50":>10}{"p95":>10}{"p99":>10}'
+            f'{"queries":>10}'
+        )
+        for rows, result in results.items():
+            self.stdout.write(
+                f'{rows:<32}{result["p50"]:>10}{result["p95"]:>10}'
+                f'{result["p99"]:>10}{result["queries"]:>10}'
+            )
+
+    def write_serializer_results(self, results):
+        self.stdout.write(
+            f'{"serializer":<32}{"drf":>10}{"fast":>10}{"speedup":>10}'
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<32}{result["drf"]:>10}{result["fast"]:>10}'
+                f'{result["speedup"]:>10}'
+            )
+
+    def write_concurrency_results(self, results):
+        self.stdout.write(
+            f'{"application":<32}{"requests":>10}{"seconds":>10}{"rps":>10}'
+        )
+        for name in ('wsgi', 'asgi'):
+            result = results[name]
+            self.stdout.write(
+                f'{name:<32}{result["requests"]:>10}{result["seconds"]:>10}'
+                f'{result["rps"]:>10}'
+            )
+        self.stdout.write(
+            f'ASGI throughput relative to WSGI: {results["speedup"]}x'
+        )
@@ -0,0 +1,22 @@
+"""
+Django command to delete finished OTP deliveries.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.models import OtpDelivery
+
+
+class Command(BaseCommand):
+    """Django command to delete expired OTP deliveries.
+
+    Codes older than OTP_TIMEOUT can no longer be verified, so their
+    deliveries are deleted whatever their status.
+    """
+
+    help = 'Delete OTP deliveries of expired codes.'
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        count, _ = OtpDelivery.objects.expired(settings.OTP_TIMEOUT).delete()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {count} deliveries.'))
@@ -0,0 +1,27 @@
+"""
+Django command to delete abandoned image uploads.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.uploads import discard
+from core.models import ImageUpload
+
+
+class Command(BaseCommand):
+    """Django command to delete expired image uploads.
+
+    Uploads that were not finished, or finished but never attached to a
+    blog, within UPLOAD_EXPIRY seconds are deleted with their files.
+    """
+
+    help = 'Delete image uploads that were abandoned.'
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        uploads = ImageUpload.objects.expired(settings.UPLOAD_EXPIRY)
+        count = 0
+        for upload in uploads.iterator():
+            discard(upload)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Deleted {count} uploads.'))
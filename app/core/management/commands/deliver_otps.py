@@ -0,0 +1,59 @@
+"""
+Django command to send queued OTP codes.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from django.core.management.base import BaseCommand
+
+from user.delivery import deliver_batch
+from user.gateways import get_gateway
+
+
+class Command(BaseCommand):
+    """Django command to drain the OTP delivery queue.
+
+    Due deliveries are claimed in batches and sent concurrently by a
+    thread pool. Several workers can run side by side.
+    """
+
+    help = 'Send queued OTP codes through the configured gateway.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--workers', type=int, default=8,
+            help='Number of concurrent sends.',
+        )
+        parser.add_argument(
+            '--lease', type=int, default=60,
+            help='Seconds a claimed delivery is hidden from other workers.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Seconds to sleep when the queue is drained.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit when no delivery is due.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        gateway = get_gateway()
+        self.stdout.write('Delivering OTP codes...')
+        with ThreadPoolExecutor(options['workers']) as executor:
+            while True:
+                counts = deliver_batch(
+                    gateway, executor,
+                    batch_size=options['batch_size'],
+                    lease=options['lease'],
+                )
+                if any(counts.values()):
+                    self.stdout.write(
+                        ', '.join(f'{n} {key}' for key, n in counts.items())
+                    )
+                if sum(counts.values()) < options['batch_size']:
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
@@ -0,0 +1,54 @@
+"""
+Django command to process blog images.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from blog.images import process_blog_image
+from core.models import Blog
+
+
+class Command(BaseCommand):
+    """Django command to resize blog images that have no variants.
+
+    Catches up on images whose background job was lost and on images
+    uploaded before the pipeline existed.
+    """
+
+    help = 'Strip and resize blog images without variants.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Process every image again, e.g. after changing widths.',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Number of images processed concurrently.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        blogs = Blog.objects.exclude(image='')
+        if not options['all']:
+            blogs = blogs.filter(image_variants={})
+        pending = list(blogs.order_by('pk').values_list('pk', 'image'))
+
+        self.stdout.write(f'Processing {len(pending)} images...')
+        if options['workers'] <= 1:
+            for blog_id, name in pending:
+                process_blog_image(blog_id, name)
+        else:
+            with ThreadPoolExecutor(options['workers']) as executor:
+                for _ in executor.map(self.process, pending):
+                    pass
+        self.stdout.write(self.style.SUCCESS('Images processed!'))
+
+    @staticmethod
+    def process(item):
+        try:
+            process_blog_image(*item)
+        finally:
+            connection.close()
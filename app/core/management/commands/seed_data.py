@@ -0,0 +1,74 @@
+"""
+Django command to fill the database with generated data.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.seed import Seeder, load, reset_sequences
+
+
+class Command(BaseCommand):
+    """Django command to seed users, categories, blogs, likes and comments.
+
+    Rows are streamed into PostgreSQL with COPY, or inserted with batched
+    bulk_create on other databases, so memory use does not grow with the
+    number of rows. Everything is loaded in one transaction.
+    """
+
+    help = 'Generate seed data for staging and benchmarking.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--blogs', type=int, default=10000)
+        parser.add_argument(
+            '--comments', type=int, default=3,
+            help='Top level comments per blog.',
+        )
+        parser.add_argument(
+            '--replies', type=int, default=1,
+            help='Replies per top level comment.',
+        )
+        parser.add_argument(
+            '--likes', type=int, default=10,
+            help='Maximum likes per blog.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Use bulk_create even on PostgreSQL.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        use_copy = (
+            connection.vendor == 'postgresql' and not options['no_copy']
+        )
+        self.stdout.write(
+            'Seeding with ' + ('COPY...' if use_copy else 'bulk_create...')
+        )
+
+        with transaction.atomic():
+            try:
+                seeder = Seeder(
+                    users=max(options['users'], 1),
+                    categories=options['categories'],
+                    blogs=options['blogs'],
+                    comments=options['comments'],
+                    replies=options['replies'],
+                    likes=options['likes'],
+                )
+            except ValueError as error:
+                raise CommandError(error)
+            for model, columns, rows in seeder.tables():
+                start = time.monotonic()
+                load(model, columns, rows, options['batch_size'], use_copy)
+                self.stdout.write(
+                    f'{model._meta.db_table}: '
+                    f'{time.monotonic() - start:.2f}s'
+                )
+            reset_sequences()
+
+        self.stdout.write(self.style.SUCCESS('Seed data created!'))
@@ -1,6 +1,11 @@
+from collections import defaultdict
+from datetime import timedelta
+
 from django.contrib.auth.models import BaseUserManager
-from django.db.models import Manager
-from django.db import models
+from django.apps import apps
+from django.db.models import F, Manager, Prefetch, Count
+from django.db import models, transaction
+from django.utils import timezone
 from django.contrib.contenttypes.models import ContentType
 
 
@@ -34,6 +39,41 @@ class BlogManager(Manager):
         """Return all published blogs"""
         return self.filter(status='p')
 
+    def feed(self):
+        """Return published blogs prepared for list pages
+
+        The author is joined and categories are prefetched with their titles
+        only, so a page of blogs costs the same number of queries whatever
+        its size.
+        """
+        category_model = self.model.category.field.related_model
+
+        return self.publish().select_related('author').prefetch_related(
+            Prefetch(
+                'category',
+                queryset=category_model.objects.only(
+                    'id', 'title',
+                ).order_by('id'),
+            )
+        ).only(
+            'id', 'create', 'body', 'status', 'updated', 'publish', 'visits',
+            'special', 'like_count', 'image_variants', 'author__first_name',
+            'author__last_name',
+        )
+
+    def category_titles(self, pks):
+        """Return the category titles of every blog in pks in one query
+
+        Titles are in category id order like the prefetch of `feed`.
+        """
+        titles = defaultdict(list)
+        rows = self.model.category.through.objects.filter(
+            blog_id__in=pks,
+        ).order_by('category_id').values_list('blog_id', 'category__title')
+        for blog_id, title in rows:
+            titles[blog_id].append(title)
+        return titles
+
 
 class CategoryManager(Manager):
 
@@ -44,8 +84,104 @@ class CategoryManager(Manager):
 
 class CommentManager(models.Manager):
 
+    commentable_models = ('core.Blog',)
+    _content_types = {}
+
+    def content_type_for(self, model):
+        """Return the content type of a model or instance
+
+        Content types of all commentable models are loaded together in one
+        query on first use and kept for the life of the process.
+        """
+        model = model._meta.concrete_model
+        if not self._content_types:
+            CommentManager._content_types = ContentType.objects.get_for_models(
+                *(apps.get_model(label) for label in self.commentable_models)
+            )
+        if model in self._content_types:
+            return self._content_types[model]
+        return ContentType.objects.get_for_model(model)
+
+    @classmethod
+    def clear_content_types(cls, **kwargs):
+        cls._content_types = {}
+
     def filter_by_instance(self, instance):
-        comment = ContentType.objects.get_for_model(instance)
+        comment = self.content_type_for(instance)
         object_id = instance.id
         query = self.filter(content_type=comment, object_id=object_id)
         return query
+
+    def comment_counts_for(self, instances):
+        """Return the number of comments per pk of instances in one query
+
+        instances must all be of the same model.
+        """
+        instances = list(instances)
+        if not instances:
+            return {}
+        return self.comment_counts(
+            instances[0], [instance.pk for instance in instances],
+        )
+
+    def comment_counts(self, model, pks):
+        """Return the number of comments per pk of objects of model"""
+        if not pks:
+            return {}
+
+        counts = self.filter(
+            content_type=self.content_type_for(model),
+            object_id__in=pks,
+        ).order_by().values('object_id').annotate(count=Count('id'))
+        return {row['object_id']: row['count'] for row in counts}
+
+    def thread_by_instance(self, instance):
+        """Return comments of instance with their users for a comment tree"""
+        return self.filter_by_instance(instance).select_related('user').only(
+            'id', 'parent_id', 'name', 'body', 'create', 'user__first_name',
+        )
+
+
+class OtpDeliveryManager(Manager):
+
+    def enqueue(self, phone, otp):
+        """Queue otp to be sent to phone by the delivery worker"""
+        return self.create(phone=phone, otp=otp)
+
+    def claim(self, batch_size, lease):
+        """Lease up to batch_size due deliveries to the calling worker
+
+        Claimed rows are skipped by other workers while locked, and are
+        not due again until the lease ends, so a crashed worker's rows
+        are retried later. Every claim counts as an attempt.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            deliveries = list(
+                self.filter(status='q', next_attempt__lte=now)
+                .order_by('next_attempt')
+                .select_for_update(skip_locked=True)[:batch_size]
+            )
+            self.filter(pk__in=[delivery.pk for delivery in deliveries]).update(
+                next_attempt=now + lease, attempts=F('attempts') + 1,
+            )
+        for delivery in deliveries:
+            delivery.attempts += 1
+        return deliveries
+
+    def expired(self, timeout):
+        """Return deliveries of codes older than timeout seconds"""
+        before = timezone.now() - timedelta(seconds=timeout)
+        return self.filter(create__lt=before)
+
+
+class ImageUploadManager(Manager):
+
+    def complete(self):
+        """Return uploads that are received and ready to attach"""
+        return self.filter(status='c')
+
+    def expired(self, timeout):
+        """Return uploads not touched for timeout seconds"""
+        before = timezone.now() - timedelta(seconds=timeout)
+        return self.filter(updated__lt=before)
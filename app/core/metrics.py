@@ -0,0 +1,174 @@
+"""
+In-process request metrics.
+
+Sampled requests are timed per resolved URL name and recorded in
+fixed-bucket histograms: wall time, database queries, database time and
+serializer time. Every worker process keeps its own histograms, so a
+scrape of /api/metrics/ reports the worker that served it.
+"""
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+import threading
+from time import perf_counter
+
+from rest_framework.serializers import ListSerializer, Serializer
+
+from extensions.fast_serializer import FastSerializer
+
+
+SECONDS_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+QUERIES_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+METRICS = (
+    ('request_seconds', 'Wall time of sampled requests.', SECONDS_BUCKETS),
+    ('db_queries', 'Database queries of sampled requests.', QUERIES_BUCKETS),
+    ('db_seconds', 'Database time of sampled requests.', SECONDS_BUCKETS),
+    ('serializer_seconds', 'Serializer time of sampled requests.',
+     SECONDS_BUCKETS),
+)
+
+current_tracker = ContextVar('current_tracker', default=None)
+
+
+class Histogram:
+    """Cumulative-on-export histogram with fixed upper bounds"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+class MetricsRegistry:
+    """Histograms of every metric per view name"""
+
+    prefix = 'blog_api'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.views = {}
+
+    def observe(self, view, **values):
+        with self._lock:
+            histograms = self.views.get(view)
+            if histograms is None:
+                histograms = self.views[view] = {
+                    name: Histogram(buckets) for name, _, buckets in METRICS
+                }
+            for name, value in values.items():
+                histograms[name].observe(value)
+
+    def render(self):
+        """Return all histograms in the Prometheus text format"""
+        lines = []
+        with self._lock:
+            for name, description, _ in METRICS:
+                metric = f'{self.prefix}_{name}'
+                lines.append(f'# HELP {metric} {description}')
+                lines.append(f'# TYPE {metric} histogram')
+                for view, histograms in sorted(self.views.items()):
+                    histogram = histograms[name]
+                    label = f'view="{view}"'
+                    for bound, total in histogram.cumulative():
+                        lines.append(
+                            f'{metric}_bucket{{{label},le="{bound}"}} {total}'
+                        )
+                    lines.append(f'{metric}_sum{{{label}}} {histogram.sum}')
+                    lines.append(
+                        f'{metric}_count{{{label}}} {histogram.count}'
+                    )
+        return '\n'.join(lines) + '\n'
+
+
+class RequestTracker:
+    """Counts database and serializer time of one request
+
+    Queries reach the tracker of the current context through
+    `track_queries`, in whatever thread they run.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_seconds += perf_counter() - start
+
+
+def track_queries(execute, sql, params, many, context):
+    """Database execute wrapper passing queries to the current tracker"""
+    tracker = current_tracker.get()
+    if tracker is None:
+        return execute(sql, params, many, context)
+    return tracker(execute, sql, params, many, context)
+
+
+def install_query_tracking(sender, connection, **kwargs):
+    """Install `track_queries` on a new database connection"""
+    if track_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(track_queries)
+
+
+def timed_serialization(function):
+    """Wrap a serializer method to add its time to the tracker"""
+
+    @wraps(function)
+    def timed(*args, **kwargs):
+        tracker = current_tracker.get()
+        if tracker is None or tracker.serializing:
+            return function(*args, **kwargs)
+
+        tracker.serializing = True
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            tracker.serializing = False
+            tracker.serializer_seconds += perf_counter() - start
+
+    timed.timed = True
+    return timed
+
+
+def instrument_serializers():
+    """Time the outermost serialization call of tracked requests
+
+    That is the `.data` of DRF serializers and `serialize` of fast ones.
+    """
+    for serializer_class in (Serializer, ListSerializer):
+        data = serializer_class.__dict__['data']
+        if not getattr(data.fget, 'timed', False):
+            serializer_class.data = property(timed_serialization(data.fget))
+    if not getattr(FastSerializer.serialize, 'timed', False):
+        FastSerializer.serialize = timed_serialization(
+            FastSerializer.serialize
+        )
+
+
+registry = MetricsRegistry()
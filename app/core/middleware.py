@@ -0,0 +1,66 @@
+from random import random
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.conf import settings
+
+from core.metrics import RequestTracker, current_tracker, registry
+
+
+class InstrumentationMiddleware:
+    """Records metrics of a sample of requests per resolved URL name
+
+    `METRICS_SAMPLE_RATE` is the fraction of requests measured; requests
+    that are not sampled only pay for one random number. Under ASGI the
+    middleware is async, so async views are not moved to a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if random() >= settings.METRICS_SAMPLE_RATE:
+            return self.get_response(request)
+
+        tracker = RequestTracker()
+        token = current_tracker.set(tracker)
+        start = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_tracker.reset(token)
+        self.record(request, tracker, start)
+        return response
+
+    async def __acall__(self, request):
+        if random() >= settings.METRICS_SAMPLE_RATE:
+            return await self.get_response(request)
+
+        tracker = RequestTracker()
+        token = current_tracker.set(tracker)
+        start = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_tracker.reset(token)
+        self.record(request, tracker, start)
+        return response
+
+    def record(self, request, tracker, start):
+        match = request.resolver_match
+        registry.observe(
+            match.view_name if match else 'unresolved',
+            request_seconds=perf_counter() - start,
+            db_queries=tracker.queries,
+            db_seconds=tracker.db_seconds,
+            serializer_seconds=tracker.serializer_seconds,
+        )
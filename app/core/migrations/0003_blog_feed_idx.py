@@ -0,0 +1,17 @@
+# Generated by Django 4.0.10 on 2026-10-18 16:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_comment'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(condition=models.Q(('status', 'p')), fields=['-publish', '-updated', '-id'], name='blog_feed_idx'),
+        ),
+    ]
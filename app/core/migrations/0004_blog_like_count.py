@@ -0,0 +1,29 @@
+# Generated by Django 4.0.10 on 2026-10-18 16:39
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_likes(apps, schema_editor):
+    Blog = apps.get_model('core', 'Blog')
+    likes = Blog.likes.through.objects.filter(
+        blog=OuterRef('pk')
+    ).order_by().values('blog').annotate(count=Count('*')).values('count')
+    Blog.objects.update(like_count=Coalesce(Subquery(likes), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_blog_feed_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Like count'),
+        ),
+        migrations.RunPython(count_likes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.0.10 on 2026-10-18 16:42
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Title, summery and body are weighted A, B and C so title matches rank
+# first. The trigger only fires when one of them is written, which keeps
+# visit and like counter updates cheap.
+CREATE_SEARCH_VECTOR = """
+CREATE FUNCTION core_blog_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.summery, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(NEW.body, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_blog_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, summery, body ON core_blog
+    FOR EACH ROW EXECUTE FUNCTION core_blog_search_vector_update();
+
+UPDATE core_blog SET title = title;
+
+CREATE INDEX core_blog_search_vector_idx
+    ON core_blog USING gin (search_vector);
+"""
+
+DROP_SEARCH_VECTOR = """
+DROP INDEX IF EXISTS core_blog_search_vector_idx;
+DROP TRIGGER IF EXISTS core_blog_search_vector_trigger ON core_blog;
+DROP FUNCTION IF EXISTS core_blog_search_vector_update();
+"""
+
+
+def create_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SEARCH_VECTOR)
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SEARCH_VECTOR)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_blog_like_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Search vector'),
+        ),
+        migrations.RunPython(create_search_vector, drop_search_vector),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.0.10 on 2026-10-18 16:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_blog_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['content_type', 'object_id', '-create'], name='comment_object_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.0.10 on 2026-10-18 16:45
+
+from django.db import migrations, models
+
+
+def fill_paths(apps, schema_editor):
+    Category = apps.get_model('core', 'Category')
+    parents = dict(Category.objects.values_list('id', 'parent_id'))
+    paths = {}
+
+    def get_path(pk):
+        if pk not in paths:
+            parent_id = parents[pk]
+            parent_path = get_path(parent_id) if parent_id else ''
+            paths[pk] = f'{parent_path}{pk}/'
+        return paths[pk]
+
+    categories = list(Category.objects.only('id'))
+    for category in categories:
+        category.path = get_path(category.id)
+    Category.objects.bulk_update(categories, ['path'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_comment_object_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Ids of the category and its ancestors from the root', max_length=255, verbose_name='Path'),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.0.10 on 2026-10-18 17:03
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_category_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OtpDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone', models.CharField(max_length=12, verbose_name='phone')),
+                ('otp', models.CharField(max_length=6)),
+                ('status', models.CharField(choices=[('q', 'queued'), ('s', 'sent'), ('f', 'failed')], default='q', max_length=1, verbose_name='Status')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Attempts')),
+                ('next_attempt', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Next attempt')),
+                ('last_error', models.CharField(blank=True, max_length=255, verbose_name='Last error')),
+                ('create', models.DateTimeField(auto_now_add=True, verbose_name='Create Time')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='otpdelivery',
+            index=models.Index(condition=models.Q(('status', 'q')), fields=['next_attempt'], name='otp_delivery_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.10 on 2026-10-18 17:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_otpdelivery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Image variants'),
+        ),
+    ]
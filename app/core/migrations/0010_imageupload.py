@@ -0,0 +1,37 @@
+# Generated by Django 4.0.10 on 2026-10-18 17:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_blog_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100, verbose_name='File name')),
+                ('size', models.PositiveIntegerField(verbose_name='Size')),
+                ('offset', models.PositiveIntegerField(default=0, verbose_name='Received bytes')),
+                ('format', models.CharField(blank=True, max_length=10, verbose_name='Image format')),
+                ('width', models.PositiveIntegerField(null=True, verbose_name='Width')),
+                ('height', models.PositiveIntegerField(null=True, verbose_name='Height')),
+                ('image', models.CharField(blank=True, max_length=100, verbose_name='Stored image')),
+                ('status', models.CharField(choices=[('u', 'uploading'), ('c', 'complete')], default='u', max_length=1, verbose_name='Status')),
+                ('create', models.DateTimeField(auto_now_add=True, verbose_name='Create Time')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Update Time')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='image_uploads', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Image upload',
+                'verbose_name_plural': 'Image uploads',
+            },
+        ),
+    ]
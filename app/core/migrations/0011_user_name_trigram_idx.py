@@ -0,0 +1,51 @@
+from django.db import migrations
+
+
+# Name search runs UPPER(name::text) LIKE UPPER('%term%'), the SQL of
+# icontains, so the indexes are built on that expression. Phone prefix
+# search is served by the varchar_pattern_ops index Django creates for
+# the unique phone column.
+CREATE_TRIGRAM_INDEXES = """
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS core_user_first_name_trgm_idx
+    ON core_user USING gin ((UPPER(first_name::text)) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS core_user_last_name_trgm_idx
+    ON core_user USING gin ((UPPER(last_name::text)) gin_trgm_ops);
+"""
+
+DROP_TRIGRAM_INDEXES = """
+DROP INDEX IF EXISTS core_user_first_name_trgm_idx;
+DROP INDEX IF EXISTS core_user_last_name_trgm_idx;
+"""
+
+
+def trigram_available(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )
+        return cursor.fetchone() is not None
+
+
+def create_trigram_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql' and trigram_available(connection):
+        schema_editor.execute(CREATE_TRIGRAM_INDEXES)
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_TRIGRAM_INDEXES)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_imageupload'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
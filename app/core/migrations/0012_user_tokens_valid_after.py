@@ -0,0 +1,18 @@
+# Generated by Django 4.0.10 on 2026-10-18 17:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_user_name_trigram_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='tokens_valid_after',
+            field=models.DateTimeField(blank=True, editable=False, help_text='tokens issued before are revoked', null=True, verbose_name='tokens valid after'),
+        ),
+    ]
@@ -1,18 +1,25 @@
-from django.db import models
+from uuid import uuid4
+
+from django.db import models, transaction
+from django.db.models.functions import Concat, Substr
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
+from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
 from django.utils.translation import gettext_lazy as _
 from django.contrib.admin import display
 from django.utils import timezone
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchVectorField
 
 from core.managers import (
     UserManager,
     BlogManager,
     CategoryManager,
-    CommentManager
+    CommentManager,
+    OtpDeliveryManager,
+    ImageUploadManager,
 )
 from extensions.upload_file_path import upload_file_path
 
@@ -50,6 +57,11 @@ class User(AbstractBaseUser, PermissionsMixin):
         default=False, verbose_name=_('two step password'),
         help_text=_("is active two step password?"),
     )
+    tokens_valid_after = models.DateTimeField(
+        null=True, blank=True, editable=False,
+        verbose_name=_('tokens valid after'),
+        help_text=_("tokens issued before are revoked"),
+    )
 
     objects = UserManager()
 
@@ -97,6 +109,55 @@ class PhoneOtp(models.Model):
         return self.phone
 
 
+class OtpDelivery(models.Model):
+    """Otp code queued for sending by the delivery worker"""
+
+    STATUS_CHOICES = (
+        ('q', 'queued'),
+        ('s', 'sent'),
+        ('f', 'failed'),
+    )
+    phone = models.CharField(max_length=12, verbose_name=_("phone"))
+    otp = models.CharField(max_length=6)
+    status = models.CharField(
+        max_length=1,
+        choices=STATUS_CHOICES,
+        default='q',
+        verbose_name=_('Status')
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name=_('Attempts')
+    )
+    next_attempt = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_('Next attempt')
+    )
+    last_error = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name=_('Last error')
+    )
+    create = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('Create Time')
+    )
+
+    objects = OtpDeliveryManager()
+
+    def __str__(self):
+        return self.phone
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('next_attempt',),
+                condition=models.Q(status='q'),
+                name='otp_delivery_queue_idx',
+            ),
+        )
+
+
 class Blog(models.Model):
     """Model for create new blog"""
 
@@ -131,6 +192,12 @@ class Blog(models.Model):
         upload_to=upload_file_path,
         verbose_name=_('Image')
     )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name=_('Image variants')
+    )
     summery = models.TextField(max_length=400, verbose_name=_('Summery'))
     likes = models.ManyToManyField(
         get_user_model(),
@@ -138,6 +205,11 @@ class Blog(models.Model):
         blank=True,
         verbose_name=_('Likes')
     )
+    like_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_('Like count')
+    )
     publish = models.DateTimeField(
         default=timezone.now,
         verbose_name=_('Publish Time')
@@ -163,6 +235,11 @@ class Blog(models.Model):
         default=0,
         verbose_name=_('Visits')
     )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name=_('Search vector')
+    )
 
     objects = BlogManager()
 
@@ -171,10 +248,74 @@ class Blog(models.Model):
 
     class Meta:
         ordering = ('-publish', '-updated')
+        indexes = (
+            models.Index(
+                fields=('-publish', '-updated', '-id'),
+                condition=models.Q(status='p'),
+                name='blog_feed_idx',
+            ),
+        )
         verbose_name = _('Blog')
         verbose_name_plural = _('Blogs')
 
 
+class ImageUpload(models.Model):
+    """Blog image received in chunks before it is attached to a blog"""
+
+    STATUS_CHOICES = (
+        ('u', 'uploading'),
+        ('c', 'complete'),
+    )
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    user = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.CASCADE,
+        related_name='image_uploads',
+        verbose_name=_('User')
+    )
+    name = models.CharField(max_length=100, verbose_name=_('File name'))
+    size = models.PositiveIntegerField(verbose_name=_('Size'))
+    offset = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Received bytes')
+    )
+    format = models.CharField(
+        max_length=10,
+        blank=True,
+        verbose_name=_('Image format')
+    )
+    width = models.PositiveIntegerField(null=True, verbose_name=_('Width'))
+    height = models.PositiveIntegerField(null=True, verbose_name=_('Height'))
+    image = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name=_('Stored image')
+    )
+    status = models.CharField(
+        max_length=1,
+        choices=STATUS_CHOICES,
+        default='u',
+        verbose_name=_('Status')
+    )
+    create = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('Create Time')
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_('Update Time')
+    )
+
+    objects = ImageUploadManager()
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = _('Image upload')
+        verbose_name_plural = _('Image uploads')
+
+
 class Category(models.Model):
     """Model for create new category"""
 
@@ -194,12 +335,62 @@ class Category(models.Model):
         verbose_name=_('Slug')
     )
     status = models.BooleanField(default=False, verbose_name=_('Status'))
+    path = models.CharField(
+        max_length=255,
+        db_index=True,
+        blank=True,
+        editable=False,
+        help_text=_('Ids of the category and its ancestors from the root'),
+        verbose_name=_('Path')
+    )
 
     objects = CategoryManager()
 
     def __str__(self):
         return self.title
 
+    def clean(self):
+        if self.is_own_descendant(self.parent_id):
+            raise ValidationError(
+                {'parent': _('A category cannot be nested under itself.')}
+            )
+
+    def is_own_descendant(self, category_id):
+        """Check if category_id is this category or one of its descendants"""
+        if category_id is None or not self.path:
+            return False
+        return Category.objects.filter(
+            pk=category_id, path__startswith=self.path
+        ).exists()
+
+    def save(self, *args, **kwargs):
+        """Save the category and keep the paths of its subtree up to date"""
+        if self.is_own_descendant(self.parent_id):
+            raise ValueError('A category cannot be nested under itself.')
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            parent_path = Category.objects.filter(
+                pk=self.parent_id
+            ).values_list('path', flat=True).first() or ''
+            path = f'{parent_path}{self.pk}/'
+            if path == self.path:
+                return
+
+            old_path, self.path = self.path, path
+            Category.objects.filter(pk=self.pk).update(path=path)
+            if old_path:
+                Category.objects.filter(
+                    path__startswith=old_path
+                ).exclude(pk=self.pk).update(
+                    path=Concat(
+                        models.Value(path),
+                        Substr('path', len(old_path) + 1),
+                        output_field=models.CharField(),
+                    )
+                )
+
     class Meta:
         ordering = ('id',)
         verbose_name = _('Category')
@@ -250,5 +441,11 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('-create', '-id')
+        indexes = (
+            models.Index(
+                fields=('content_type', 'object_id', '-create'),
+                name='comment_object_idx',
+            ),
+        )
         verbose_name = _('Comment')
         verbose_name_plural = _('Comments')
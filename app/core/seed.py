@@ -0,0 +1,239 @@
+"""
+Streaming generation and loading of seed data.
+
+Rows are produced by generators with explicit ids computed from the
+current maximum id of each table, so related rows can reference each
+other without keeping anything in memory. On PostgreSQL they are loaded
+with COPY; other databases use bulk_create in batches.
+"""
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+from core.models import Blog, Category, Comment
+
+
+# Seeded phones are 989 followed by the user id in nine digits
+MAX_USER_ID = 10 ** 9 - 1
+
+WORDS = (
+    'lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipiscing',
+    'elit', 'sed', 'do', 'eiusmod', 'tempor', 'incididunt', 'labore',
+)
+
+
+def text(index, words):
+    return ' '.join(WORDS[(index + offset) % len(WORDS)]
+                    for offset in range(words))
+
+
+def next_id(model):
+    return (model.objects.aggregate(max_id=Max('id'))['max_id'] or 0) + 1
+
+
+def format_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+class RowStream:
+    """File-like object reading rows as CSV lines for COPY FROM STDIN"""
+
+    def __init__(self, rows):
+        self.lines = (
+            ','.join(format_value(value) for value in row) + '\n'
+            for row in rows
+        )
+        self.buffer = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            line = next(self.lines, None)
+            if line is None:
+                break
+            self.buffer += line
+
+        if size < 0:
+            size = len(self.buffer)
+        chunk, self.buffer = self.buffer[:size], self.buffer[size:]
+        return chunk
+
+    readline = read
+
+
+def copy_rows(model, columns, rows):
+    """Load rows with PostgreSQL COPY, streaming them from the generator"""
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    column_list = ', '.join(quote(column) for column in columns)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table} ({column_list}) FROM STDIN "
+            f"WITH (FORMAT csv, NULL '\\N')",
+            RowStream(rows),
+        )
+
+
+def bulk_create_rows(model, columns, rows, batch_size):
+    """Load rows with bulk_create, one batch in memory at a time"""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        model.objects.bulk_create(
+            [model(**dict(zip(columns, row))) for row in batch]
+        )
+
+
+def load(model, columns, rows, batch_size, use_copy):
+    if use_copy:
+        copy_rows(model, columns, rows)
+    else:
+        bulk_create_rows(model, columns, rows, batch_size)
+
+
+class Seeder:
+    """Generates related rows for every seeded table
+
+    Blog `i` is written by user `i * 7`, belongs to one or two categories
+    and is liked by `i % (likes + 1)` consecutive users, so like_count
+    is known when the blog row is generated.
+    """
+
+    def __init__(self, users, categories, blogs, comments, replies, likes):
+        self.users = users
+        self.categories = categories
+        self.blogs = blogs
+        self.comments = comments
+        self.replies = replies
+        self.likes = min(likes, users)
+        self.now = timezone.now()
+        self.user_id = next_id(get_user_model())
+        if self.user_id + users - 1 > MAX_USER_ID:
+            raise ValueError(
+                f'Seeded user ids would exceed {MAX_USER_ID}, '
+                f'which does not fit in a phone number.'
+            )
+        self.category_id = next_id(Category)
+        self.blog_id = next_id(Blog)
+        self.comment_id = next_id(Comment)
+        # Looked up before loading, no query can run while COPY is streaming
+        self.content_type_id = Comment.objects.content_type_for(Blog).id
+
+    def author_of(self, index):
+        return self.user_id + index * 7 % self.users
+
+    def like_count_of(self, index):
+        return index % (self.likes + 1)
+
+    def user_rows(self):
+        password = make_password('seed')
+        for index in range(self.users):
+            pk = self.user_id + index
+            yield (
+                pk, password, False, f'989{pk:09d}', f'user {pk}', '',
+                index % 10 == 0, self.now, False, False, True, self.now,
+                False,
+            )
+
+    def category_rows(self):
+        paths = {}
+        for index in range(self.categories):
+            pk = self.category_id + index
+            parent_id = None
+            if index and index % 3:
+                parent_id = self.category_id + (index - 1) // 2
+            paths[pk] = f'{paths.get(parent_id, "")}{pk}/'
+            yield pk, parent_id, f'category {pk}', f'seed-{pk}', True, paths[pk]
+
+    def blog_rows(self):
+        body = text(0, 80)
+        for index in range(self.blogs):
+            pk = self.blog_id + index
+            publish = self.now - timedelta(minutes=index)
+            yield (
+                pk, self.author_of(index), text(index, 6), f'seed-{pk}', body,
+                'blogs/image.jpg', {}, text(index, 30), publish, publish,
+                publish, index % 20 == 0, 'p', 0, self.like_count_of(index),
+            )
+
+    def blog_category_rows(self):
+        if not self.categories:
+            return
+        for index in range(self.blogs):
+            first = index % self.categories
+            second = (index * 3 + 1) % self.categories
+            yield self.blog_id + index, self.category_id + first
+            if second != first:
+                yield self.blog_id + index, self.category_id + second
+
+    def like_rows(self):
+        for index in range(self.blogs):
+            for offset in range(self.like_count_of(index)):
+                user = self.user_id + (index + offset) % self.users
+                yield self.blog_id + index, user
+
+    def comment_rows(self):
+        content_type_id = self.content_type_id
+        pk = self.comment_id
+        for index in range(self.blogs):
+            blog_id = self.blog_id + index
+            for root in range(self.comments):
+                root_id = pk
+                user = self.user_id + (index + root) % self.users
+                yield (
+                    root_id, user, None, content_type_id, blog_id, None,
+                    text(root, 12), self.now, self.now,
+                )
+                pk += 1
+                for reply in range(self.replies):
+                    user = self.user_id + (index + root + reply) % self.users
+                    yield (
+                        pk, user, None, content_type_id, blog_id, root_id,
+                        text(reply, 8), self.now, self.now,
+                    )
+                    pk += 1
+
+    def tables(self):
+        """Yield model, columns and rows of every table in load order"""
+        yield get_user_model(), (
+            'id', 'password', 'is_superuser', 'phone', 'first_name',
+            'last_name', 'author', 'special_user', 'is_staff', 'is_admin',
+            'is_active', 'date_joined', 'two_step_password',
+        ), self.user_rows()
+        yield Category, (
+            'id', 'parent_id', 'title', 'slug', 'status', 'path',
+        ), self.category_rows()
+        yield Blog, (
+            'id', 'author_id', 'title', 'slug', 'body', 'image',
+            'image_variants', 'summery', 'publish', 'create', 'updated',
+            'special', 'status', 'visits', 'like_count',
+        ), self.blog_rows()
+        yield Blog.category.through, (
+            'blog_id', 'category_id',
+        ), self.blog_category_rows()
+        yield Blog.likes.through, ('blog_id', 'user_id'), self.like_rows()
+        yield Comment, (
+            'id', 'user_id', 'name', 'content_type_id', 'object_id',
+            'parent_id', 'body', 'create', 'updated',
+        ), self.comment_rows()
+
+
+def reset_sequences():
+    """Move id sequences past the explicitly inserted ids"""
+    models = (get_user_model(), Category, Blog, Comment)
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
@@ -0,0 +1,117 @@
+from unittest.mock import patch
+
+from django.test import TestCase, TransactionTestCase
+from django.core.cache import cache
+
+from benchmarks import concurrency, data, otp, runner, serializers
+from blog import visits
+from core.models import PhoneOtp
+
+
+class BenchmarkRunnerTests(TestCase):
+
+    def tearDown(self):
+        cache.clear()
+        visits.counter.drain()
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        values = list(range(1, 101))
+
+        self.assertEqual(runner.percentile(values, 50), 50)
+        self.assertEqual(runner.percentile(values, 99), 99)
+        self.assertEqual(runner.percentile([3], 95), 3)
+
+    def test_compare_reports_regressions(self):
+        """Test that slower or chattier endpoints are reported"""
+        baseline = {
+            'fast': {'p95': 10, 'queries': 2},
+            'slow': {'p95': 10, 'queries': 2},
+            'chatty': {'p95': 10, 'queries': 2},
+        }
+        results = {
+            'fast': {'p95': 12, 'queries': 2},
+            'slow': {'p95': 13, 'queries': 2},
+            'chatty': {'p95': 10, 'queries': 3},
+            'new': {'p95': 100, 'queries': 100},
+        }
+
+        regressions = runner.compare(
+            results, baseline, threshold=0.25, min_delta=1,
+        )
+
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith('chatty'))
+        self.assertTrue(regressions[1].startswith('slow'))
+
+    def test_compare_ignores_small_latency_changes(self):
+        """Test that sub-millisecond noise is not a regression"""
+        regressions = runner.compare(
+            {'fast': {'p95': 0.9, 'queries': 0}},
+            {'fast': {'p95': 0.4, 'queries': 0}},
+            threshold=0.25,
+            min_delta=1,
+        )
+
+        self.assertEqual(regressions, [])
+
+    @patch('blog.visits.flusher.ensure_started')
+    def test_run_on_generated_data(self, ensure_started):
+        """Test that every benchmark runs against generated data"""
+        sample = data.generate(
+            users=5, categories=3, blogs=5, comments=2, replies=1, likes=2,
+        )
+
+        results = runner.run(sample, iterations=2, warmup=0)
+
+        self.assertIn('blog:blogs', results)
+        self.assertIn('user:otp', results)
+        for result in results.values():
+            self.assertLessEqual(result['p50'], result['p99'])
+
+    def test_otp_verification_on_growing_table(self):
+        """Test that OTP verification is timed for every table size"""
+        results = otp.run([10, 50], iterations=3, warmup=1)
+
+        self.assertEqual(list(results), [10, 50])
+        self.assertEqual(PhoneOtp.objects.count(), 50)
+        for result in results.values():
+            # user lookup, savepoint, insert, release and PhoneOtp update
+            self.assertLessEqual(result['queries'], 5)
+
+    def test_serializers_on_generated_data(self):
+        """Test that each fast list serializer is at least twice as fast"""
+        data.generate(
+            users=5, categories=3, blogs=20, comments=2, replies=1, likes=2,
+        )
+
+        results = serializers.run(rows=20, iterations=20, warmup=2)
+
+        self.assertEqual(list(results), ['blogs', 'comments', 'categories'])
+        for name, result in results.items():
+            # Below the speedups measured on 100 rows, so noisy runs pass
+            with self.subTest(name):
+                self.assertGreaterEqual(result['speedup'], 2)
+
+
+class ConcurrencyBenchmarkTests(TransactionTestCase):
+    """Requests are served from other threads, so data must be committed"""
+
+    def tearDown(self):
+        cache.clear()
+        visits.counter.drain()
+
+    @patch('blog.visits.flusher.ensure_started')
+    def test_run_on_generated_data(self, ensure_started):
+        """Test that both applications serve every request"""
+        sample = data.generate(
+            users=5, categories=3, blogs=5, comments=2, replies=1, likes=2,
+        )
+
+        results = concurrency.run(
+            sample, requests=8, workers=2, concurrency=4, delay=0,
+        )
+
+        self.assertEqual(results['wsgi']['requests'], 8)
+        self.assertEqual(results['asgi']['requests'], 8)
+        self.assertGreater(results['speedup'], 0)
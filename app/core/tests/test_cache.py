@@ -0,0 +1,102 @@
+from threading import Thread, Timer
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+
+from extensions.cache import TieredCache
+from user.otp import get_code, save_code
+
+
+class TieredCacheTests(SimpleTestCase):
+    """Test the two level cache backend"""
+
+    def setUp(self):
+        cache.clear()
+        caches['otp'].clear()
+        self.shared = caches['shared']
+
+    def test_get_reads_local_level_first(self):
+        """Test that local entries hide shared changes until they expire"""
+        local = TieredCache('shared', {'OPTIONS': {'LOCAL_TIMEOUT': 0.05}})
+        local.set('key', 'first')
+        self.shared.set('key', 'second')
+
+        self.assertEqual(local.get('key'), 'first')
+        time.sleep(0.06)
+        self.assertEqual(local.get('key'), 'second')
+
+    def test_get_fills_local_level(self):
+        """Test that a shared hit is kept locally"""
+        self.shared.set('key', 'value')
+
+        self.assertEqual(cache.get('key'), 'value')
+        self.shared.delete('key')
+        self.assertEqual(cache.get('key'), 'value')
+
+    def test_delete_removes_both_levels(self):
+        """Test that deleted keys are gone locally and in the shared cache"""
+        cache.set('key', 'value')
+        cache.delete('key')
+
+        self.assertIsNone(cache.get('key'))
+        self.assertIsNone(self.shared.get('key'))
+
+    def test_get_many_and_set_many(self):
+        """Test that many keys are written and read through both levels"""
+        cache.set_many({'a': 1, 'b': 2})
+        self.shared.set('c', 3)
+
+        self.assertEqual(cache.get_many(['a', 'b', 'c', 'd']),
+                         {'a': 1, 'b': 2, 'c': 3})
+
+    def test_get_or_set_computes_once(self):
+        """Test that concurrent misses of one key compute it once"""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return 'value'
+
+        results = []
+        threads = [
+            Thread(target=lambda: results.append(
+                cache.get_or_set('key', compute, 60)
+            ))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['value'] * 8)
+
+    def test_get_or_set_waits_for_other_process(self):
+        """Test that a locked key is awaited instead of recomputed"""
+        self.shared.add('key:lock', 'other process', 10)
+        timer = Timer(0.1, self.shared.set, ('key', 'computed elsewhere'))
+        timer.start()
+
+        value = cache.get_or_set('key', lambda: 'computed here', 60)
+
+        timer.join()
+        self.assertEqual(value, 'computed elsewhere')
+
+    def test_otp_codes_are_namespaced(self):
+        """Test that OTP codes live apart from the default cache"""
+        save_code('09123456789', '123456')
+
+        self.assertEqual(get_code('09123456789'), '123456')
+        self.assertIsNone(cache.get('09123456789'))
+
+    def test_tests_keep_caches_in_memory(self):
+        """Test that clearing caches in tests never reaches shared stores"""
+        for alias in settings.CACHES:
+            if alias != 'default':
+                self.assertIsInstance(caches[alias], LocMemCache)
+        self.assertIsInstance(caches['default'].shared, LocMemCache)
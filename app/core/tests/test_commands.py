@@ -1,9 +1,14 @@
+from io import StringIO
 from unittest.mock import patch
 
-from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db.models import Count, Max
 from django.db.utils import OperationalError
 from django.test import TestCase
 
+from core.models import Blog, Category, Comment
+
 
 class CommandTests(TestCase):
 
@@ -21,3 +26,68 @@ class CommandTests(TestCase):
             gi.side_effect = [OperationalError] * 5 + [True]
             call_command('wait_for_db')
             self.assertEqual(gi.call_count, 6)
+
+
+class SeedDataCommandTests(TestCase):
+
+    def seed(self, **options):
+        call_command(
+            'seed_data', users=10, categories=5, blogs=30, comments=2,
+            replies=1, likes=4, stdout=StringIO(), **options,
+        )
+
+    def assert_seeded(self):
+        self.assertEqual(get_user_model().objects.count(), 10)
+        self.assertEqual(Category.objects.count(), 5)
+        self.assertEqual(Blog.objects.count(), 30)
+        self.assertEqual(Comment.objects.count(), 30 * 2 * 2)
+        self.assertEqual(
+            Comment.objects.filter(parent__isnull=False).count(), 30 * 2,
+        )
+        for blog in Blog.objects.annotate(total=Count('likes')):
+            self.assertEqual(blog.like_count, blog.total)
+        for category in Category.objects.all():
+            expected = category.path
+            category.path = ''
+            category.save()
+            self.assertEqual(category.path, expected)
+
+    def test_seed_data_with_copy(self):
+        """Test seeding with COPY creates consistent rows"""
+        self.seed()
+
+        self.assert_seeded()
+        self.assertTrue(Blog.objects.feed().exists())
+
+    def test_seed_data_with_bulk_create(self):
+        """Test seeding with bulk_create creates consistent rows"""
+        self.seed(no_copy=True, batch_size=7)
+
+        self.assert_seeded()
+
+    def test_seed_data_phones_fit_large_ids(self):
+        """Test seeded phones stay valid above ten million users"""
+        get_user_model().objects.create_user(phone='989120000000', id=10 ** 7)
+
+        self.seed()
+
+        for user in get_user_model().objects.exclude(pk=10 ** 7):
+            user.full_clean()
+
+    def test_seed_data_rejects_ids_beyond_phones(self):
+        """Test seeding fails when user ids would not fit in phones"""
+        get_user_model().objects.create_user(phone='989120000000', id=10 ** 9 - 5)
+
+        with self.assertRaises(CommandError):
+            self.seed()
+
+    def test_seed_data_resets_sequences(self):
+        """Test rows can be created normally after seeding"""
+        self.seed()
+
+        category = Category.objects.create(title='new', slug='new')
+
+        self.assertGreater(
+            category.pk, Category.objects.exclude(pk=category.pk)
+            .aggregate(max_id=Max('id'))['max_id'],
+        )
@@ -0,0 +1,82 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.metrics import Histogram, registry
+
+
+METRICS_URL = reverse('metrics')
+BLOGS_URL = reverse('blog:blogs')
+
+
+class HistogramTests(TestCase):
+
+    def test_cumulative_buckets(self):
+        """Test that bucket counts are cumulative with a +Inf bucket"""
+        histogram = Histogram((1, 5))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value)
+
+        self.assertEqual(
+            list(histogram.cumulative()), [(1, 2), (5, 3), ('+Inf', 4)],
+        )
+        self.assertEqual(histogram.sum, 14.5)
+
+
+class InstrumentationMiddlewareTests(TestCase):
+    """Test request metrics and the metrics endpoint"""
+
+    def setUp(self):
+        registry.reset()
+        self.client = APIClient()
+
+    def tearDown(self):
+        registry.reset()
+
+    @override_settings(METRICS_SAMPLE_RATE=1.0)
+    def test_request_recorded_by_view_name(self):
+        """Test that a sampled request is recorded under its URL name"""
+        self.client.get(BLOGS_URL)
+
+        histograms = registry.views['blog:blogs']
+        self.assertEqual(histograms['request_seconds'].count, 1)
+        self.assertEqual(histograms['db_queries'].sum, 1)
+        self.assertGreater(histograms['serializer_seconds'].sum, 0)
+
+    @override_settings(METRICS_SAMPLE_RATE=0.0)
+    def test_unsampled_request_not_recorded(self):
+        """Test that requests outside the sample are not measured"""
+        self.client.get(BLOGS_URL)
+
+        self.assertEqual(registry.views, {})
+
+    @override_settings(METRICS_SAMPLE_RATE=1.0)
+    def test_metrics_in_prometheus_format(self):
+        """Test that staff users can read the metrics"""
+        user = get_user_model().objects.create_superuser(
+            phone='989361234567', password='testpass',
+        )
+        self.client.force_authenticate(user=user)
+        self.client.get(BLOGS_URL)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        content = res.content.decode()
+        self.assertIn('# TYPE blog_api_request_seconds histogram', content)
+        self.assertIn(
+            'blog_api_db_queries_count{view="blog:blogs"} 1', content,
+        )
+
+    def test_metrics_require_staff(self):
+        """Test that other users cannot read the metrics"""
+        user = get_user_model().objects.create_user(phone='989361234567')
+        self.client.force_authenticate(user=user)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
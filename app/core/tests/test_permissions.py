@@ -0,0 +1,126 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework import status
+from rest_framework.views import APIView
+
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import Blog
+from permissions import IsSuperUserOrAuthorOrReadOnly
+from user.authentication import ClaimsUser
+
+
+def api_views(patterns=None):
+    """Yield every DRF view class routed in the URLconf"""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from api_views(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            view_class = getattr(pattern.callback, 'cls', None)
+            if view_class is not None and issubclass(view_class, APIView):
+                yield view_class
+
+
+def claims_user(pk, **claims):
+    token = AccessToken()
+    token['user_id'] = pk
+    token['special_user'] = 0
+    for claim, value in claims.items():
+        token[claim] = value
+    return ClaimsUser(token)
+
+
+class PermissionQueryTests(TestCase):
+    """Test that permissions are evaluated without database queries"""
+
+    def setUp(self):
+        self.users = (
+            AnonymousUser(),
+            claims_user(1),
+            claims_user(2, author=True),
+            claims_user(3, is_superuser=True, is_staff=True),
+        )
+        # The author is not loaded, any access to it would query
+        self.blog = Blog(pk=1, author_id=2, slug='blog', status='p')
+
+    def test_permissions_of_every_view_run_without_queries(self):
+        """Test every permission of every view with every kind of user"""
+        factory = APIRequestFactory()
+        views = set(api_views())
+        self.assertIn('BlogLikeApiView', {view.__name__ for view in views})
+
+        for view_class in views:
+            for method in ('get', 'post', 'put', 'delete'):
+                for user in self.users:
+                    request = view_class().initialize_request(
+                        getattr(factory, method)('/')
+                    )
+                    request.user = user
+                    view = view_class(request=request, kwargs={})
+                    with self.subTest(view=view_class.__name__,
+                                      method=method, user=user):
+                        with self.assertNumQueries(0):
+                            for permission in view.get_permissions():
+                                permission.has_permission(request, view)
+                                permission.has_object_permission(
+                                    request, view, self.blog,
+                                )
+
+    def test_author_may_only_change_own_blog(self):
+        """Test the author check against the blog's author id"""
+        permission = IsSuperUserOrAuthorOrReadOnly()
+        factory = APIRequestFactory()
+
+        def allowed(user):
+            request = APIView().initialize_request(factory.put('/'))
+            request.user = user
+            return permission.has_object_permission(request, None, self.blog)
+
+        self.assertTrue(allowed(claims_user(2, author=True)))
+        self.assertTrue(allowed(claims_user(3, is_superuser=True)))
+        self.assertFalse(allowed(claims_user(1, author=True)))
+        self.assertFalse(allowed(AnonymousUser()))
+
+
+class BlogObjectPermissionApiTests(TestCase):
+    """Test that blog detail writes check the object permission"""
+
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.author = User.objects.create_user(
+            phone='989361234567', author=True,
+        )
+        self.other = User.objects.create_user(
+            phone='989361234568', author=True,
+        )
+        self.blog = Blog.objects.create(
+            author=self.author, title='blog', slug='blog', body='body',
+            summery='summery', status='p',
+        )
+        self.url = reverse('blog:detail', args=[self.blog.slug])
+        self.client = APIClient()
+
+    def test_other_author_can_not_delete(self):
+        """Test that authors can not delete blogs of others"""
+        self.client.force_authenticate(user=self.other)
+
+        res = self.client.delete(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(Blog.objects.filter(pk=self.blog.pk).exists())
+
+    def test_author_can_delete_own_blog(self):
+        """Test that authors can delete their own blogs"""
+        self.client.force_authenticate(user=self.author)
+
+        res = self.client.delete(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
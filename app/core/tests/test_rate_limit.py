@@ -0,0 +1,43 @@
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from extensions.rate_limit import SlidingWindowLimiter
+
+
+class SlidingWindowLimiterTests(SimpleTestCase):
+    """Test the sliding window rate limiter"""
+
+    def setUp(self):
+        caches['throttle'].clear()
+        self.limiter = SlidingWindowLimiter(limit=3, window=60)
+
+    def test_allows_hits_up_to_the_limit(self):
+        """Test that hits within the limit pass and the next is rejected"""
+        waits = [self.limiter.hit('key', now=600 + n) for n in range(4)]
+
+        self.assertEqual(waits[:3], [0, 0, 0])
+        self.assertGreater(waits[3], 0)
+
+    def test_keys_are_limited_separately(self):
+        """Test that hits of one key do not limit another"""
+        for n in range(4):
+            self.limiter.hit('key', now=600 + n)
+
+        self.assertEqual(self.limiter.hit('other', now=604), 0)
+
+    def test_previous_window_is_weighted(self):
+        """Test that a burst at the end of a window limits the next one"""
+        for n in range(3):
+            self.limiter.hit('key', now=650 + n)
+
+        self.assertGreater(self.limiter.hit('key', now=661), 0)
+        self.assertEqual(self.limiter.hit('key', now=710), 0)
+
+    def test_wait_until_window_slides(self):
+        """Test that the wait lets enough of the previous window expire"""
+        for n in range(3):
+            self.limiter.hit('key', now=650 + n)
+
+        wait = self.limiter.hit('key', now=665)
+
+        self.assertAlmostEqual(wait, 15)
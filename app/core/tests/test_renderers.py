@@ -0,0 +1,85 @@
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+import json
+from unittest.mock import patch
+from uuid import uuid4
+from zoneinfo import ZoneInfo
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from extensions import renderers
+from extensions.renderers import (
+    FastJSONParser,
+    FastJSONRenderer,
+    StreamingJSONResponse,
+    chunks,
+)
+
+
+DATA = {
+    'id': 1,
+    'title': 'سلام \u2028',
+    'create': datetime(2024, 1, 1, 12, 30, 5, 123456, dt_timezone.utc),
+    'publish': datetime(2024, 1, 1, 16, tzinfo=ZoneInfo('Asia/Tehran')),
+    'day': date(2024, 1, 1),
+    'uuid': uuid4(),
+    'price': Decimal('1.50'),
+    'label': gettext_lazy('Title'),
+    'variants': {320: 'a.jpg'},
+    'items': [None, True, 1.5, ('a', 'b')],
+}
+
+
+class FastJSONTests(SimpleTestCase):
+    """Test rendering and parsing JSON with orjson"""
+
+    def test_renders_like_drf(self):
+        """Test that output is byte for byte DRF's JSON"""
+        self.assertEqual(FastJSONRenderer().render(DATA),
+                         JSONRenderer().render(DATA))
+
+    def test_renders_without_orjson(self):
+        """Test that DRF's renderer is used when orjson is missing"""
+        with patch.object(renderers, 'orjson', None):
+            content = FastJSONRenderer().render(DATA)
+
+        self.assertEqual(content, JSONRenderer().render(DATA))
+
+    def test_indented_output(self):
+        """Test that indentation requested by the client is kept"""
+        content = FastJSONRenderer().render(
+            {'id': 1}, 'application/json; indent=2',
+        )
+
+        self.assertEqual(content, b'{\n  "id": 1\n}')
+
+    def test_parse(self):
+        """Test that request bodies are parsed and errors reported"""
+        parser = FastJSONParser()
+
+        self.assertEqual(parser.parse(BytesIO(b'{"a": [1, "b"]}')),
+                         {'a': [1, 'b']})
+        with self.assertRaises(ParseError):
+            parser.parse(BytesIO(b'{"a": NaN}'))
+
+    def test_streaming_response(self):
+        """Test that chunks are sent as one JSON array"""
+        items = [{'id': number} for number in range(5)]
+
+        response = StreamingJSONResponse(chunks(items, 2))
+        parts = list(response.streaming_content)
+
+        self.assertEqual(len(parts), 4)
+        self.assertEqual(json.loads(b''.join(parts)), items)
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+    def test_streaming_empty_response(self):
+        """Test that no items give an empty array"""
+        response = StreamingJSONResponse(chunks([], 2))
+
+        self.assertEqual(b''.join(response.streaming_content), b'[]')
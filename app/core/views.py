@@ -0,0 +1,18 @@
+from django.http import HttpResponse
+
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+from core.metrics import registry
+
+
+class MetricsApiView(APIView):
+    """Returns request metrics of this worker in Prometheus text format"""
+
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return HttpResponse(
+            registry.render(),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
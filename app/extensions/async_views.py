@@ -0,0 +1,91 @@
+"""
+Async DRF views.
+
+DRF dispatches requests synchronously and this Django version has no
+async ORM, so `AsyncAPIViewMixin` gives a DRF view an async dispatch of
+its own. Authentication, permissions and throttles run in a thread, and
+handlers pass their work to `sync_to_async` in one call, since the ORM
+and even the async cache API run in a thread here. The event loop only
+serves other requests while those threads wait; every switch to and
+from a thread costs time, so with fast queries the async views are
+slower than sync ones.
+
+The async variants are served by the ASGI application only, through
+URL patterns made by `async_urlpatterns`.
+"""
+from asyncio import iscoroutine
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+
+from django.urls import URLPattern, URLResolver
+
+
+class AsyncAPIViewMixin:
+    """Dispatches requests of a DRF view to async handlers"""
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        markcoroutinefunction(view)
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(),
+                                  self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    async def options(self, request, *args, **kwargs):
+        # The metadata of writable views may load the object.
+        return await sync_to_async(super().options)(request, *args, **kwargs)
+
+
+def async_urlpatterns(patterns, variants):
+    """Return a copy of URL patterns serving async variants of views
+
+    variants maps view classes to their async variants; names and
+    namespaces are kept, so reversing URLs is unchanged.
+    """
+    result = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            pattern = URLResolver(
+                pattern.pattern,
+                async_urlpatterns(pattern.url_patterns, variants),
+                pattern.default_kwargs,
+                pattern.app_name,
+                pattern.namespace,
+            )
+        else:
+            callback = pattern.callback
+            view_class = getattr(callback, 'view_class', None)
+            if view_class in variants:
+                pattern = URLPattern(
+                    pattern.pattern,
+                    variants[view_class].as_view(**callback.view_initkwargs),
+                    pattern.default_args,
+                    pattern.name,
+                )
+        result.append(pattern)
+    return result
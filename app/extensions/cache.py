@@ -0,0 +1,247 @@
+"""
+Two level cache backend.
+
+`TieredCache` keeps recently used entries in a per-process LRU in front
+of a shared cache alias such as Redis or the file based cache, so hot
+keys are read without a round trip. Local entries live at most
+`LOCAL_TIMEOUT` seconds: writes of other processes are seen after that
+delay, writes of this process immediately.
+
+`get_or_set` protects the shared level from stampedes. Threads of one
+process computing the same key are serialized, and processes take a
+lock key in the shared cache, so only one caller recomputes a missing
+value while the others wait for it.
+
+Tests and benchmarks clear caches freely, so they run under
+`isolated_caches()`, which keeps every alias in process memory instead
+of the store shared with running processes.
+"""
+from collections import OrderedDict
+import pickle
+import threading
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+MISSING = object()
+
+# Local stores by LOCATION, shared by the cache instances of all threads
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class LocalStore:
+    """Thread safe LRU of pickled values with expiry times"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.key_locks = [threading.Lock() for _ in range(64)]
+
+    def get(self, key):
+        with self.lock:
+            item = self.data.get(key)
+            if item is None:
+                return MISSING
+            expires, pickled = item
+            if expires <= time.monotonic():
+                del self.data[key]
+                return MISSING
+            self.data.move_to_end(key)
+        return pickle.loads(pickled)
+
+    def set(self, key, value, timeout):
+        if timeout <= 0:
+            self.delete(key)
+            return
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.data[key] = (time.monotonic() + timeout, pickled)
+            self.data.move_to_end(key)
+            while len(self.data) > self.max_entries:
+                self.data.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    def key_lock(self, key):
+        return self.key_locks[hash(key) % len(self.key_locks)]
+
+
+class TieredCache(BaseCache):
+    """Per-process LRU in front of the cache alias named by LOCATION
+
+    OPTIONS:
+        LOCAL_TIMEOUT: seconds an entry is kept in the process (5)
+        MAX_ENTRIES: entries kept in the process (300)
+        LOCK_TIMEOUT: seconds a recomputation may hold its lock (10)
+        POLL_INTERVAL: seconds between checks while waiting (0.05)
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = location
+        self.local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        self.lock_timeout = options.get('LOCK_TIMEOUT', 10)
+        self.poll_interval = options.get('POLL_INTERVAL', 0.05)
+        with _stores_lock:
+            self.store = _stores.setdefault(
+                location, LocalStore(self._max_entries),
+            )
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def local_key(self, key, version=None):
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        return key
+
+    def resolve_timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def keep_local(self, key, value, timeout, version=None):
+        """Store value locally for no longer than the shared timeout"""
+        local_timeout = self.local_timeout
+        if timeout is not None:
+            local_timeout = min(local_timeout, timeout)
+        self.store.set(self.local_key(key, version), value, local_timeout)
+
+    def get(self, key, default=None, version=None):
+        value = self.store.get(self.local_key(key, version))
+        if value is not MISSING:
+            return value
+        value = self.shared.get(key, MISSING, version)
+        if value is MISSING:
+            return default
+        self.keep_local(key, value, None, version)
+        return value
+
+    def get_many(self, keys, version=None):
+        found, missing = {}, []
+        for key in keys:
+            value = self.store.get(self.local_key(key, version))
+            if value is MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing:
+            fetched = self.shared.get_many(missing, version)
+            for key, value in fetched.items():
+                self.keep_local(key, value, None, version)
+            found.update(fetched)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self.resolve_timeout(timeout)
+        self.shared.set(key, value, timeout, version)
+        self.keep_local(key, value, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self.resolve_timeout(timeout)
+        failed = self.shared.set_many(data, timeout, version)
+        for key, value in data.items():
+            self.keep_local(key, value, timeout, version)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self.resolve_timeout(timeout)
+        added = self.shared.add(key, value, timeout, version)
+        if added:
+            self.keep_local(key, value, timeout, version)
+        else:
+            self.store.delete(self.local_key(key, version))
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self.store.delete(self.local_key(key, version))
+        return self.shared.touch(key, self.resolve_timeout(timeout), version)
+
+    def delete(self, key, version=None):
+        self.store.delete(self.local_key(key, version))
+        return self.shared.delete(key, version)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self.store.delete(self.local_key(key, version))
+        self.shared.delete_many(keys, version)
+
+    def has_key(self, key, version=None):
+        if self.store.get(self.local_key(key, version)) is not MISSING:
+            return True
+        return self.shared.has_key(key, version)  # noqa: W601
+
+    def incr(self, key, delta=1, version=None):
+        self.store.delete(self.local_key(key, version))
+        return self.shared.incr(key, delta, version)
+
+    def clear(self):
+        self.store.clear()
+        self.shared.clear()
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        """Return the cached value of key, computing a missing one once"""
+        value = self.get(key, MISSING, version)
+        if value is not MISSING:
+            return value
+        if not callable(default):
+            return super().get_or_set(key, default, timeout, version)
+
+        with self.store.key_lock(self.local_key(key, version)):
+            value = self.get(key, MISSING, version)
+            if value is MISSING:
+                value = self.compute(key, default, timeout, version)
+        return value
+
+    def compute(self, key, default, timeout, version):
+        """Compute and set key while holding its lock in the shared cache"""
+        lock_key, token = f'{key}:lock', uuid4().hex
+        deadline = time.monotonic() + self.lock_timeout
+        while not self.shared.add(lock_key, token, self.lock_timeout, version):
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(self.poll_interval)
+            value = self.shared.get(key, MISSING, version)
+            if value is not MISSING:
+                self.keep_local(key, value, None, version)
+                return value
+
+        try:
+            value = default()
+            self.set(key, value, timeout, version)
+        finally:
+            if self.shared.get(lock_key, version=version) == token:
+                self.shared.delete(lock_key, version)
+        return value
+
+
+def isolated_caches():
+    """Return an override_settings keeping every cache in process memory
+
+    Tiered aliases keep their backend over the replaced shared alias.
+    """
+    from django.test.utils import override_settings
+
+    isolated = {}
+    for alias, config in settings.CACHES.items():
+        if config['BACKEND'] == 'extensions.cache.TieredCache':
+            isolated[alias] = config
+            continue
+        isolated[alias] = {
+            **config,
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': alias,
+        }
+    return override_settings(CACHES=isolated)
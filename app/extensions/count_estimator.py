@@ -0,0 +1,36 @@
+from django.db import connections
+
+
+def estimate_count(queryset, threshold=1000):
+    """Return an estimated number of rows in queryset
+
+    On PostgreSQL an unfiltered queryset reads pg_class.reltuples and any
+    other queryset asks the planner for its row estimate. Estimates below
+    threshold are replaced by an exact count, since small tables are cheap
+    to count and their statistics are the least reliable. Other databases
+    always return an exact count.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    estimate = None
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            if row and row[0] >= 0:
+                estimate = int(row[0])
+
+        if estimate is None:
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            estimate = int(plan[0]['Plan']['Plan Rows'])
+
+    if estimate < threshold:
+        return queryset.count()
+    return estimate
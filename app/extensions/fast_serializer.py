@@ -0,0 +1,172 @@
+"""
+Compiled read-only serializers.
+
+DRF serializers bind a field object per field and walk it for every
+value of every row. `FastSerializer` resolves its fields once per instance
+into plain accessor functions, so a row costs one attribute lookup per
+field plus a conversion only where DRF's representation differs from
+the database value. Rows are named tuples from
+`values_list(..., named=True)`, or model instances.
+
+A fast serializer is meant to mirror a DRF serializer field by field,
+and its output must stay identical to it.
+"""
+from operator import attrgetter
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+def datetime_representation():
+    """Return DRF's ISO 8601 conversion of datetimes to the current zone
+
+    The zone is looked up once instead of for every value.
+    """
+    to_representation = serializers.DateTimeField().to_representation
+    if not settings.USE_TZ or api_settings.DATETIME_FORMAT != ISO_8601:
+        return lambda value: (
+            None if value is None else to_representation(value)
+        )
+
+    zone = timezone.get_current_timezone()
+
+    def convert(value):
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            return to_representation(value)
+        value = value.astimezone(zone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+def representation(model_field):
+    """Return DRF's conversion of values of model_field, None if identity"""
+    if isinstance(model_field, models.DateTimeField):
+        return datetime_representation()
+    elif isinstance(model_field, models.DateField):
+        field = serializers.DateField()
+    elif isinstance(model_field, models.DecimalField):
+        field = serializers.DecimalField(
+            model_field.max_digits, model_field.decimal_places,
+        )
+    elif isinstance(model_field, models.UUIDField):
+        field = serializers.UUIDField()
+    else:
+        return None
+
+    to_representation = field.to_representation
+
+    def convert(value):
+        return None if value is None else to_representation(value)
+    return convert
+
+
+class FastSerializer:
+    """Read-only serializer of rows compiled to one accessor per field
+
+    Subclasses set `model` and `fields`, the output names in order.
+    `sources` maps output names to row attributes where they differ and
+    `method_columns` lists the attributes read by methods. Like
+    SerializerMethodField, a `get_<name>` method computes a field from
+    the row; `prepare` can load data for all rows at once first.
+    `required_columns` are selected even when no selected field reads
+    them. Only the fields in `context['fields']` are rendered, if set.
+    """
+
+    model = None
+    fields = ()
+    sources = {}
+    method_columns = {}
+    required_columns = ()
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        selected = self.context.get('fields')
+        if selected is not None:
+            self.fields = tuple(
+                name for name in self.fields if name in selected
+            )
+        self.accessors = [
+            (name, self.accessor(name)) for name in self.fields
+        ]
+
+    def accessor(self, name):
+        method = getattr(self, f'get_{name}', None)
+        if method is not None:
+            return method
+
+        source = self.sources.get(name, name)
+        get = attrgetter(source)
+        convert = representation(self.field_for(source))
+        if convert is None:
+            return get
+        return lambda row: convert(get(row))
+
+    def field_for(self, source):
+        """Return the model field behind a row attribute such as user__name"""
+        model, *path, name = [self.model, *source.split('__')]
+        for part in path:
+            model = model._meta.get_field(part).related_model
+        field = model._meta.get_field(name)
+        if field.is_relation:
+            return field.target_field
+        return field
+
+    def columns(self):
+        """Return the row attributes to select with values_list"""
+        columns = list(self.required_columns)
+        for name in self.fields:
+            if hasattr(self, f'get_{name}'):
+                names = self.method_columns.get(name, ())
+            else:
+                names = (self.sources.get(name, name),)
+            columns += [
+                column for column in names if column not in columns
+            ]
+        return columns
+
+    def prepare(self, rows):
+        pass
+
+    def serialize(self, rows):
+        """Return the representations of rows"""
+        rows = list(rows)
+        self.prepare(rows)
+        return self.represent(rows)
+
+    def represent(self, rows):
+        """Return the representations of prepared rows"""
+        accessors = self.accessors
+        return [
+            {name: get(row) for name, get in accessors} for row in rows
+        ]
+
+
+class FastListMixin:
+    """Serves list views through `fast_serializer_class`
+
+    The filtered queryset is read with values_list instead of building
+    model instances, then paginated and serialized as usual.
+    `serializer_class` still describes the output, e.g. for the schema.
+    """
+
+    fast_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.fast_serializer_class(self.get_serializer_context())
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.prefetch_related(None).values_list(
+            *serializer.columns(), named=True,
+        )
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(serializer.serialize(rows))
+        return self.get_paginated_response(serializer.serialize(page))
@@ -0,0 +1,61 @@
+"""
+Sliding window rate limiter.
+
+Hits are counted per fixed window with cache increments. The rate of
+the sliding window ending now is estimated from the current window plus
+the part of the previous window it still covers, so bursts at a window
+boundary can not double the limit. A hit costs two cache round trips and
+no database query.
+
+Increments are atomic with Redis (`CACHE_URL`) only. The file based
+cache used without it reads and rewrites counters, so concurrent hits
+of one key can be lost and a burst may exceed the limit somewhat.
+"""
+import time
+
+from django.core.cache import caches
+
+
+class SlidingWindowLimiter:
+    """Allow `limit` hits per `window` seconds for every key"""
+
+    def __init__(self, limit, window, cache_alias='throttle'):
+        self.limit = limit
+        self.window = window
+        self.cache_alias = cache_alias
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def increment(self, key):
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # The counter does not exist yet or expired after the check
+            if self.cache.add(key, 1, self.window * 2):
+                return 1
+            return self.cache.incr(key)
+
+    def hit(self, key, now=None):
+        """Count a hit of key and return how long to wait before the next
+
+        The returned wait is 0 when the hit is allowed. Rejected hits are
+        counted too, so clients that keep retrying stay limited.
+        """
+        now = time.time() if now is None else now
+        index, offset = divmod(now, self.window)
+        index = int(index)
+        current = self.increment(f'{key}:{index}')
+        previous = self.cache.get(f'{key}:{index - 1}', 0)
+
+        covered = 1 - offset / self.window
+        if previous * covered + current <= self.limit:
+            return 0
+
+        if current > self.limit:
+            # Only the next window can bring the rate down
+            return self.window - offset
+        # Wait until enough of the previous window has slid out
+        needed = 1 - (self.limit - current) / previous
+        return max((needed - offset / self.window) * self.window, 0)
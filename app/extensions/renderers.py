@@ -0,0 +1,102 @@
+"""
+JSON rendering and parsing with orjson.
+
+orjson encodes dicts, lists, datetimes, dates and UUIDs natively and
+several times faster than the json module. Output is the same as DRF's
+compact JSON, datetimes included. Other types go through DRF's encoder.
+Without orjson installed, or with settings it does not support such as
+indented output, DRF's renderer and parser are used as they are.
+
+Long lists can be sent with `StreamingJSONResponse`, which encodes and
+sends them a chunk of items at a time.
+"""
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+OPTIONS = 0 if orjson is None else orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def encode_default(obj):
+    return JSONEncoder().default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer encoding with orjson when it is installed"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type or '',
+                                   renderer_context or {})):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        content = orjson.dumps(data, default=encode_default, option=OPTIONS)
+        # Like DRF, escape the separators that are not valid in JavaScript.
+        # Their first byte is looked for alone, which is much faster.
+        if b'\xe2' in content:
+            content = content.replace(
+                b'\xe2\x80\xa8', b'\\u2028',
+            ).replace(b'\xe2\x80\xa9', b'\\u2029')
+        return content
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser decoding with orjson when it is installed"""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+def chunks(items, size):
+    """Yield lists of up to size items of an iterable"""
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def json_array(batches, renderer=None):
+    """Yield the bytes of a JSON array of the items of batches of items"""
+    renderer = renderer or FastJSONRenderer()
+    separator = b'['
+    for chunk in batches:
+        if chunk:
+            yield separator + renderer.render(chunk)[1:-1]
+            separator = b','
+    yield b'[]' if separator == b'[' else b']'
+
+
+class StreamingJSONResponse(StreamingHttpResponse):
+    """Sends a JSON array encoded one chunk of items at a time
+
+    Only the chunk being encoded is held in memory, so the items can
+    be read lazily, e.g. from a queryset iterator.
+    """
+
+    def __init__(self, batches, status=None):
+        super().__init__(
+            json_array(batches), status=status,
+            content_type='application/json',
+        )
@@ -0,0 +1,143 @@
+"""
+Sparse fieldsets.
+
+`?fields=id,title` limits a read to the named fields of the response and
+`?exclude=body` leaves fields out of it. The selection is put in the
+serializer context as `fields`; serializers drop the other fields and
+views select only the columns the remaining fields read, so unused
+columns such as long texts are not fetched at all.
+"""
+from functools import lru_cache
+
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+
+FIELDS_PARAM = 'fields'
+EXCLUDE_PARAM = 'exclude'
+
+
+def split_names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def requested_fields(request, available):
+    """Return the names of available fields a request selects, in order
+
+    None when the request names no fields. Unknown names are rejected.
+    """
+    fields = request.query_params.get(FIELDS_PARAM)
+    exclude = request.query_params.get(EXCLUDE_PARAM)
+    if fields is None and exclude is None:
+        return None
+
+    errors = {}
+    selected = list(available)
+    for param, value in ((FIELDS_PARAM, fields), (EXCLUDE_PARAM, exclude)):
+        if value is None:
+            continue
+        names = split_names(value)
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            errors[param] = [f'Unknown field: {name}' for name in unknown]
+        elif param == FIELDS_PARAM:
+            selected = [name for name in selected if name in names]
+        else:
+            selected = [name for name in selected if name not in names]
+    if errors:
+        raise ValidationError(errors)
+    return tuple(selected)
+
+
+@lru_cache(maxsize=None)
+def serializer_fields(serializer_class):
+    """Return the fields of serializer_class, built once per process"""
+    return serializer_class().fields
+
+
+def readable_fields(serializer_class):
+    """Return the names of the fields serializer_class renders"""
+    return tuple(
+        name for name, field in serializer_fields(serializer_class).items()
+        if not field.write_only
+    )
+
+
+class SparseFieldsSerializerMixin:
+    """Renders only the fields named in `context['fields']`, if any
+
+    Method fields list the columns they read in `field_columns`, other
+    fields read the column of their source.
+    """
+
+    field_columns = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = self.context.get('fields')
+        if selected is None:
+            return fields
+        return {
+            name: field for name, field in fields.items()
+            if name in selected or field.write_only
+        }
+
+    @classmethod
+    def columns(cls, names):
+        """Return the model columns read to render the named fields"""
+        fields = serializer_fields(cls)
+        model = cls.Meta.model
+        columns = []
+        for name in names:
+            field = fields[name]
+            if name in cls.field_columns:
+                columns += cls.field_columns[name]
+            elif isinstance(field, serializers.SerializerMethodField):
+                continue
+            elif not field.source_attrs:
+                continue
+            else:
+                model_field = model._meta.get_field(field.source_attrs[0])
+                if model_field.concrete and not model_field.many_to_many:
+                    columns.append(model_field.name)
+        return columns
+
+
+class SparseFieldsMixin:
+    """Reads only the fields selected with `?fields=` or `?exclude=`
+
+    The selection applies to safe requests and is passed to serializers
+    in their context. `get_sparse_queryset` prunes a queryset to the
+    columns the selected fields read.
+    """
+
+    def get_selected_fields(self):
+        if self.request.method not in SAFE_METHODS:
+            return None
+        if not hasattr(self, '_selected_fields'):
+            self._selected_fields = requested_fields(
+                self.request, readable_fields(self.get_serializer_class()),
+            )
+        return self._selected_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_selected_fields()
+        return context
+
+    def get_sparse_queryset(self, queryset):
+        """Return queryset reading only the columns of the selection
+
+        Only relations that selected columns go through stay joined.
+        """
+        selected = self.get_selected_fields()
+        if selected is None:
+            return queryset
+        columns = self.get_serializer_class().columns(selected)
+        related = {
+            column.rsplit('__', 1)[0] for column in columns if '__' in column
+        }
+        return queryset.select_related(None).select_related(
+            *related
+        ).only(*columns)
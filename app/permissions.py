@@ -30,7 +30,7 @@ class IsSuperUserOrAuthor(BasePermission):
     def has_permission(self, request, view):
         return bool(
             request.user.is_authenticated and request.user.is_superuser
-            or request.user.is_authenticated and request.user.is_author
+            or request.user.is_authenticated and request.user.author
         )
 
 
@@ -43,5 +43,6 @@ class IsSuperUserOrAuthorOrReadOnly(BasePermission):
 
         return bool(
             request.user.is_authenticated and request.user.is_superuser
-            or request.user.is_authenticated and obj.author == request.user
+            or request.user.is_authenticated
+            and obj.author_id == request.user.pk
         )
@@ -0,0 +1,86 @@
+from rest_framework.throttling import SimpleRateThrottle
+
+from extensions.rate_limit import SlidingWindowLimiter
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """Throttle with a sliding window counter instead of a request log
+
+    Rates come from `DEFAULT_THROTTLE_RATES` by scope like every DRF
+    throttle; counters live in the shared `throttle` cache.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.limiter = SlidingWindowLimiter(self.num_requests, self.duration)
+        self.wait_seconds = None
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        self.wait_seconds = self.limiter.hit(key, self.timer())
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class PhoneRateThrottle(SlidingWindowThrottle):
+    """Limits requests for the phone number sent in the request body
+
+    Phone numbers may contain whitespace, which is removed so that every
+    spelling of a number shares its limit.
+    """
+
+    def get_cache_key(self, request, view):
+        data = request.data
+        phone = data.get('phone') if hasattr(data, 'get') else None
+        phone = ''.join(str(phone or '').split())
+        if not phone:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': phone}
+
+
+class IpRateThrottle(SlidingWindowThrottle):
+    """Limits requests by client address"""
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope, 'ident': self.get_ident(request),
+        }
+
+
+class UserRateThrottle(SlidingWindowThrottle):
+    """Limits requests by user, or by address for anonymous users"""
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class OtpPhoneThrottle(PhoneRateThrottle):
+    scope = 'otp_phone'
+
+
+class OtpIpThrottle(IpRateThrottle):
+    scope = 'otp_ip'
+
+
+class VerifyOtpThrottle(PhoneRateThrottle):
+    scope = 'otp_verify'
+
+
+class CommentThrottle(UserRateThrottle):
+    scope = 'comment'
+
+
+class LikeThrottle(UserRateThrottle):
+    scope = 'like'
@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+
+from user.tokens import is_revoked
+
+
+class ClaimsUser(TokenUser):
+    """User built from the claims of a validated token
+
+    Views that need other fields or want to save the user must load it
+    with `request.user.pk`.
+    """
+
+    @cached_property
+    def author(self):
+        return self.token.get('author', False)
+
+    @cached_property
+    def two_step_password(self):
+        return self.token.get('two_step_password', False)
+
+    @cached_property
+    def special_user(self):
+        return datetime.fromtimestamp(self.token['special_user'], timezone.utc)
+
+    def is_special_user(self):
+        return self.special_user > datetime.now(timezone.utc)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """Authenticates from token claims without querying the user
+
+    Tokens issued before the claims existed are authenticated from the
+    database as before.
+    """
+
+    def get_user(self, validated_token):
+        if 'author' not in validated_token:
+            return super().get_user(validated_token)
+
+        if is_revoked(validated_token):
+            raise AuthenticationFailed(
+                _('Token has been revoked'), code='token_revoked',
+            )
+        return ClaimsUser(validated_token)
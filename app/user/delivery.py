@@ -0,0 +1,70 @@
+"""
+Delivery of queued OTP codes.
+
+Requests only queue codes in `OtpDelivery`; the `deliver_otps` worker
+claims due rows in batches, sends them concurrently through the
+configured gateway and records the results in bulk. Failed sends are
+retried with exponential backoff until `OTP_DELIVERY_MAX_ATTEMPTS`, and
+codes older than `OTP_TIMEOUT` are dropped since they can no longer be
+verified. Codes are erased from rows once they are sent or given up, and
+`clean_otps` deletes rows older than `OTP_TIMEOUT`.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.models import OtpDelivery
+
+
+def backoff(attempts):
+    """Return the delay before retrying a delivery tried attempts times"""
+    delay = settings.OTP_DELIVERY_BACKOFF * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.OTP_TIMEOUT))
+
+
+def deliver_batch(gateway, executor, batch_size=100, lease=60):
+    """Send one batch of due deliveries and return the number per status"""
+    deliveries = OtpDelivery.objects.claim(
+        batch_size, timedelta(seconds=lease),
+    )
+    now = timezone.now()
+    expired_before = now - timedelta(seconds=settings.OTP_TIMEOUT)
+
+    futures, finished = [], []
+    for delivery in deliveries:
+        if delivery.create < expired_before:
+            delivery.status, delivery.last_error = 'f', 'Code expired'
+            finished.append(delivery)
+        else:
+            futures.append((
+                delivery,
+                executor.submit(
+                    gateway.send, phone=delivery.phone, otp=delivery.otp,
+                ),
+            ))
+
+    for delivery, future in futures:
+        error = future.exception()
+        if error is None:
+            delivery.status, delivery.last_error = 's', ''
+        else:
+            delivery.last_error = str(error)[:255] or type(error).__name__
+            if delivery.attempts >= settings.OTP_DELIVERY_MAX_ATTEMPTS:
+                delivery.status = 'f'
+            else:
+                delivery.next_attempt = now + backoff(delivery.attempts)
+        finished.append(delivery)
+
+    for delivery in finished:
+        if delivery.status != 'q':
+            delivery.otp = ''
+    OtpDelivery.objects.bulk_update(
+        finished, ('status', 'otp', 'next_attempt', 'last_error'),
+    )
+
+    counts = {'sent': 0, 'retried': 0, 'failed': 0}
+    for delivery in finished:
+        status = {'s': 'sent', 'q': 'retried', 'f': 'failed'}[delivery.status]
+        counts[status] += 1
+    return counts
@@ -0,0 +1,16 @@
+import csv
+
+
+class Echo:
+    """File-like object that returns what is written to it"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(columns, rows):
+    """Yield the CSV lines of a header and rows one at a time"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
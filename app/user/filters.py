@@ -0,0 +1,43 @@
+import re
+
+from django.db.models import Q
+
+from rest_framework.filters import SearchFilter
+
+
+class UserSearchFilter(SearchFilter):
+    """Index-backed search of users by phone prefix or name
+
+    Terms made of digits match the start of the phone number, so the
+    `varchar_pattern_ops` index of the phone column is used; a leading
+    `0` or `+98` is read as the country code. Other terms match a part
+    of the first or last name, which the trigram indexes serve on
+    PostgreSQL with pg_trgm. Elsewhere the same lookups scan the table.
+    """
+
+    phone_pattern = re.compile(r'^(\+|0)?\d+$')
+
+    def phone_prefix(self, term):
+        if not self.phone_pattern.match(term):
+            return None
+        if term.startswith('+'):
+            return term[1:]
+        if term.startswith('0'):
+            return '98' + term[1:]
+        return term
+
+    def term_query(self, term):
+        prefix = self.phone_prefix(term)
+        if prefix is not None:
+            return Q(phone__startswith=prefix)
+        return Q(first_name__icontains=term) | Q(last_name__icontains=term)
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+
+        query = Q()
+        for term in search_terms:
+            query &= self.term_query(term)
+        return queryset.filter(query)
@@ -0,0 +1,48 @@
+"""
+SMS gateways the OTP delivery worker sends codes through.
+
+The gateway class is chosen with the `OTP_GATEWAY` setting. A gateway
+has a `send(phone=..., otp=...)` method that raises on failure; it is
+called from worker threads and must not use the database.
+"""
+from threading import Lock
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class GatewayError(Exception):
+    """Raised when a gateway could not send a message"""
+
+
+class ConsoleGateway:
+    """Prints codes, for development"""
+
+    def send(self, *, phone, otp):
+        print(f'Your phone number: {phone}')
+        print(f'Your otp code: {otp}')
+
+
+class StubGateway:
+    """Records codes in memory and fails the first `failures` sends
+
+    `outbox` is shared by all instances so tests can inspect what a
+    worker sent.
+    """
+
+    outbox = []
+    lock = Lock()
+
+    def __init__(self, failures=0):
+        self.failures = failures
+
+    def send(self, *, phone, otp):
+        with self.lock:
+            if self.failures > 0:
+                self.failures -= 1
+                raise GatewayError('Stub gateway failure')
+            self.outbox.append((phone, otp))
+
+
+def get_gateway():
+    return import_string(settings.OTP_GATEWAY)()
@@ -0,0 +1,38 @@
+"""
+Store of sent OTP codes.
+
+Codes are kept in the shared `otp` cache, so a code sent by one worker
+can be verified by any other. The store skips the per-process cache
+level, which could still hold a replaced code.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from core.models import PhoneOtp
+
+
+def save_code(phone, code):
+    caches['otp'].set(phone, code, settings.OTP_TIMEOUT)
+
+
+def get_code(phone):
+    return caches['otp'].get(phone)
+
+
+def delete_code(phone):
+    caches['otp'].delete(phone)
+
+
+def record_sent(phone, code):
+    """Store code on the PhoneOtp row of phone and count the sent codes"""
+    updated = PhoneOtp.objects.filter(phone=phone).update(
+        otp=code, count=F('count') + 1,
+    )
+    if not updated:
+        try:
+            with transaction.atomic():
+                PhoneOtp.objects.create(phone=phone, otp=code, count=1)
+        except IntegrityError:
+            record_sent(phone, code)
@@ -0,0 +1,14 @@
+from rest_framework.pagination import CursorPagination
+
+
+class UserCursorPagination(CursorPagination):
+    """Keyset pagination for the user directory ordered by id
+
+    Pages are found with an indexed `id` range instead of OFFSET, so deep
+    pages cost the same as the first one, and no total count is run.
+    """
+
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = 'id'
@@ -1,3 +1,6 @@
+from core.models import OtpDelivery
+
+
 def send_otp(*, phone: str, otp: str):
-    print(f'Your phone number: {phone}')
-    print(f'Your otp code: {otp}')
+    """Queue otp for the `deliver_otps` worker"""
+    OtpDelivery.objects.enqueue(phone=phone, otp=otp)
@@ -2,6 +2,13 @@ from django.contrib.auth import get_user_model
 
 from rest_framework import serializers
 
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from extensions.sparse_fields import SparseFieldsSerializerMixin
+from user.tokens import ClaimsRefreshToken, is_revoked
+
 
 class AuthenticationSerializer(serializers.Serializer):
     """validate user phone number for authentication"""
@@ -17,8 +24,8 @@ class AuthenticationSerializer(serializers.Serializer):
         return value
 
 
-class OtpSerializer(serializers.Serializer):
-    """Create and validate otp code"""
+class OtpSerializer(AuthenticationSerializer):
+    """Validate otp code sent to a phone number"""
 
     code = serializers.CharField(max_length=6, min_length=6)
     password = serializers.CharField(max_length=20, required=False)
@@ -68,7 +75,8 @@ class ChangeTwoStepPasswordSerializer(serializers.Serializer):
         return data
 
 
-class UsersListSerializer(serializers.ModelSerializer):
+class UsersListSerializer(SparseFieldsSerializerMixin,
+                          serializers.ModelSerializer):
     """List all users in database"""
 
     class Meta:
@@ -76,7 +84,8 @@ class UsersListSerializer(serializers.ModelSerializer):
         fields = ('id', 'phone', 'first_name', 'last_name', 'author')
 
 
-class UserDetailUpdateDeleteSerializer(serializers.ModelSerializer):
+class UserDetailUpdateDeleteSerializer(SparseFieldsSerializerMixin,
+                                       serializers.ModelSerializer):
     """Serializer for detail, update and delete user"""
 
     class Meta:
@@ -92,3 +101,27 @@ class UserProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = get_user_model()
         fields = ('id', 'phone', 'first_name', 'last_name', 'two_step_password')
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh tokens, reissuing them with current claims when revoked"""
+
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = get_user_model().objects.filter(
+            pk=refresh[api_settings.USER_ID_CLAIM], is_active=True,
+        ).first()
+        if user is None:
+            raise InvalidToken('User is inactive or deleted')
+
+        # Revocations are read from the user, never from a cache.
+        revoked_at = 0
+        if user.tokens_valid_after is not None:
+            revoked_at = user.tokens_valid_after.timestamp()
+        if 'author' in refresh and not is_revoked(refresh, revoked_at):
+            return super().validate(attrs)
+
+        refresh = self.token_class.for_user(user)
+        return {'access': str(refresh.access_token), 'refresh': str(refresh)}
@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from user.tokens import CLAIM_FIELDS, revocations
+
+
+@receiver(pre_save, sender=get_user_model())
+def detect_claim_changes(sender, instance, update_fields, **kwargs):
+    """Mark users whose token claims are changed by this save"""
+    if instance.pk is None:
+        return
+    if update_fields and not set(CLAIM_FIELDS) & set(update_fields):
+        return
+    saved = sender.objects.filter(pk=instance.pk).values(*CLAIM_FIELDS).first()
+    instance._claims_changed = saved is not None and any(
+        saved[field] != getattr(instance, field) for field in CLAIM_FIELDS
+    )
+
+
+@receiver(post_save, sender=get_user_model())
+def revoke_changed_tokens(sender, instance, **kwargs):
+    """Save the revocation with the change, then drop cached copies"""
+    if instance.__dict__.pop('_claims_changed', False):
+        instance.tokens_valid_after = timezone.now()
+        sender.objects.filter(pk=instance.pk).update(
+            tokens_valid_after=instance.tokens_valid_after,
+        )
+        transaction.on_commit(lambda: revocations.forget(instance.pk))
+
+
+@receiver(post_delete, sender=get_user_model())
+def revoke_deleted_tokens(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: revocations.forget(pk))
@@ -0,0 +1,199 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework import status
+
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.models import Blog
+from user.authentication import ClaimsJWTAuthentication, ClaimsUser
+from user.tokens import (
+    ClaimsRefreshToken,
+    load_revocation,
+    revocation_key,
+    revocations,
+)
+
+
+REFRESH_URL = reverse('token_refresh')
+
+
+class ClaimsAuthenticationTests(TestCase):
+    """Test authenticating from token claims"""
+
+    def setUp(self):
+        caches['auth'].clear()
+        caches['throttle'].clear()
+        revocations.clear()
+        self.user = get_user_model().objects.create_user(
+            phone='989361234567', author=True,
+        )
+        self.authentication = ClaimsJWTAuthentication()
+
+    def authenticate(self, token):
+        request = APIRequestFactory().get(
+            '/', HTTP_AUTHORIZATION=f'Bearer {token}',
+        )
+        return self.authentication.authenticate(request)[0]
+
+    def test_user_built_from_claims_without_queries(self):
+        """Test that the user comes from the token, not the database"""
+        access = ClaimsRefreshToken.for_user(self.user).access_token
+        self.authenticate(access)
+
+        with self.assertNumQueries(0):
+            user = self.authenticate(access)
+
+        self.assertIsInstance(user, ClaimsUser)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertTrue(user.author)
+        self.assertFalse(user.is_superuser)
+        self.assertFalse(user.two_step_password)
+        self.assertFalse(user.is_special_user())
+
+    def test_token_without_claims_loads_user(self):
+        """Test that tokens issued before claims existed still work"""
+        access = RefreshToken.for_user(self.user).access_token
+
+        with self.assertNumQueries(1):
+            user = self.authenticate(access)
+
+        self.assertEqual(user, self.user)
+
+    def test_changed_claims_revoke_tokens(self):
+        """Test that tokens with outdated claims are refused"""
+        refresh = ClaimsRefreshToken.for_user(self.user)
+        refresh['iat'] -= 1
+        self.user.author = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(refresh.access_token)
+
+        res = APIClient().post(REFRESH_URL, {'refresh': str(refresh)})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user = self.authenticate(res.data['access'])
+        self.assertFalse(user.author)
+
+    def test_unrelated_changes_keep_tokens(self):
+        """Test that saving other fields does not revoke tokens"""
+        refresh = ClaimsRefreshToken.for_user(self.user)
+        refresh['iat'] -= 1
+        self.user.first_name = 'name'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        self.assertTrue(self.authenticate(refresh.access_token).author)
+
+    def test_inactive_user_can_not_refresh(self):
+        """Test that deactivated users get no new tokens"""
+        refresh = ClaimsRefreshToken.for_user(self.user)
+        refresh['iat'] -= 1
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        res = APIClient().post(REFRESH_URL, {'refresh': str(refresh)})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revocation_survives_lost_cache(self):
+        """Test that revocations are reloaded from the database"""
+        access = ClaimsRefreshToken.for_user(self.user).access_token
+        self.user.is_staff = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        caches['auth'].clear()
+        revocations.clear()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(access)
+
+    def test_revocation_during_cache_miss(self):
+        """Test that a time loaded before a revocation is not cached"""
+        access = ClaimsRefreshToken.for_user(self.user).access_token
+
+        def load_then_revoke(user_id):
+            revoked_at = load_revocation(user_id)
+            self.user.is_staff = True
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.save()
+            return revoked_at
+
+        with patch('user.tokens.load_revocation', load_then_revoke):
+            revocations.revoked_at(self.user.pk)
+        revocations.clear()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(access)
+
+    def test_token_issued_in_second_of_revocation(self):
+        """Test that revocations are compared below a second"""
+        refresh = ClaimsRefreshToken.for_user(self.user)
+        self.user.author = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        self.assertIsInstance(refresh['iat'], float)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(refresh.access_token)
+
+    def test_deleted_user_tokens_refused_without_cache(self):
+        """Test that tokens of deleted users stay refused"""
+        refresh = ClaimsRefreshToken.for_user(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        caches['auth'].clear()
+        revocations.clear()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(refresh.access_token)
+        res = APIClient().post(REFRESH_URL, {'refresh': str(refresh)})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_reads_revocation_from_database(self):
+        """Test that refreshing ignores cached revocation times"""
+        refresh = ClaimsRefreshToken.for_user(self.user)
+        refresh['iat'] -= 1
+        self.user.author = False
+        self.user.save()
+        caches['auth'].set(
+            revocation_key(self.user.pk, revocations.version(self.user.pk)), 0,
+        )
+
+        res = APIClient().post(REFRESH_URL, {'refresh': str(refresh)})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(ClaimsRefreshToken(res.data['refresh'])['author'])
+
+    def test_like_skips_user_query(self):
+        """Test that an authenticated write never loads the user"""
+        blog = Blog.objects.create(
+            author=self.user, title='blog', slug='blog', body='body',
+            summery='summery', status='p',
+        )
+        client = APIClient()
+        access = ClaimsRefreshToken.for_user(self.user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        # The revocation time is read once, then served from the cache.
+        self.authenticate(access)
+
+        with CaptureQueriesContext(connection) as context:
+            res = client.get(reverse('blog:like', args=[blog.pk]))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user_table = get_user_model()._meta.db_table
+        self.assertFalse([
+            query for query in context.captured_queries
+            if f'FROM "{user_table}"' in query['sql']
+        ])
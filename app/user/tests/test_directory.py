@@ -0,0 +1,110 @@
+import csv
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+
+USERS_URL = reverse('user:users')
+EXPORT_URL = reverse('user:export')
+
+
+class UserDirectoryTests(TestCase):
+    """Test paginated search and export of users"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser(
+            phone='989000000000', password='pass',
+        )
+        get_user_model().objects.bulk_create([
+            get_user_model()(
+                phone=f'98912{number:07d}',
+                first_name=f'name{number}',
+                last_name='Rezaei' if number % 2 else 'Karimi',
+                author=number % 3 == 0,
+            )
+            for number in range(120)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_pages_follow_cursor_without_overlap(self):
+        """Test that keyset pages cover every user exactly once"""
+        url, ids = USERS_URL, []
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(res.data['results']), 50)
+            ids += [user['id'] for user in res.data['results']]
+            url = res.data['next']
+
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(ids), get_user_model().objects.count())
+        self.assertNotIn('count', res.data)
+
+    def test_page_is_one_query(self):
+        """Test that a page of users is read with a single query"""
+        with self.assertNumQueries(1):
+            self.client.get(USERS_URL, {'page_size': 100})
+
+    def test_search_by_phone_prefix(self):
+        """Test that digits match the start of the phone number"""
+        res = self.client.get(USERS_URL, {'search': '0912000001'})
+        phones = [user['phone'] for user in res.data['results']]
+
+        self.assertEqual(len(phones), 10)
+        self.assertTrue(all(p.startswith('98912000001') for p in phones))
+        res = self.client.get(USERS_URL, {'search': '0000001'})
+        self.assertEqual(res.data['results'], [])
+
+    def test_search_by_name(self):
+        """Test that other terms match a part of either name"""
+        res = self.client.get(USERS_URL, {'search': 'reza name11'})
+
+        names = {user['first_name'] for user in res.data['results']}
+        self.assertEqual(names, {
+            'name11', 'name111', 'name113', 'name115', 'name117', 'name119',
+        })
+
+    def test_export_streams_filtered_users(self):
+        """Test that the export streams all matching users as CSV"""
+        res = self.client.get(EXPORT_URL, {'author': 'true'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        content = b''.join(res.streaming_content).decode()
+        rows = list(csv.reader(StringIO(content)))
+        self.assertEqual(rows[0][:3], ['id', 'phone', 'first_name'])
+        self.assertEqual(len(rows) - 1, 40)
+
+    def test_export_requires_superuser(self):
+        """Test that other users can not export the directory"""
+        user = get_user_model().objects.get(phone='989120000001')
+        self.client.force_authenticate(user)
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_phone_prefix_search_uses_index(self):
+        """Test that phone prefix search can use an index scan"""
+        if connection.vendor != 'postgresql':
+            self.skipTest('Index plans are checked on PostgreSQL only')
+        queryset = get_user_model().objects.filter(
+            phone__startswith='98912',
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+
+        self.assertIn('phone', plan)
+        self.assertIn('Index', plan)
@@ -0,0 +1,139 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import OtpDelivery
+from user.delivery import backoff, deliver_batch
+from user.gateways import StubGateway
+
+
+PHONE = '989361234567'
+
+
+@override_settings(OTP_DELIVERY_MAX_ATTEMPTS=3, OTP_DELIVERY_BACKOFF=2)
+class OtpDeliveryTests(TestCase):
+    """Test queueing and delivering otp codes"""
+
+    def setUp(self):
+        caches['throttle'].clear()
+        StubGateway.outbox.clear()
+        self.executor = ThreadPoolExecutor(4)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def deliver(self, gateway):
+        return deliver_batch(gateway, self.executor, batch_size=10)
+
+    def test_register_queues_code(self):
+        """Test that requesting a code queues it without sending"""
+        res = APIClient().post(reverse('user:register'), {'phone': PHONE})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        delivery = OtpDelivery.objects.get(phone=PHONE)
+        self.assertEqual(delivery.status, 'q')
+        self.assertEqual(StubGateway.outbox, [])
+
+    def test_deliver_batch_sends_due_codes(self):
+        """Test that due codes are sent and marked as sent"""
+        for number in range(5):
+            OtpDelivery.objects.enqueue(f'98936123456{number}', '123456')
+        OtpDelivery.objects.enqueue(PHONE, '111111')
+        OtpDelivery.objects.filter(phone=PHONE).update(
+            next_attempt=timezone.now() + timedelta(minutes=1),
+        )
+
+        counts = self.deliver(StubGateway())
+
+        self.assertEqual(counts, {'sent': 5, 'retried': 0, 'failed': 0})
+        self.assertEqual(len(StubGateway.outbox), 5)
+        self.assertEqual(OtpDelivery.objects.filter(status='s').count(), 5)
+        self.assertFalse(
+            OtpDelivery.objects.filter(status='s').exclude(otp='').exists()
+        )
+        queued = OtpDelivery.objects.get(phone=PHONE)
+        self.assertEqual((queued.status, queued.otp), ('q', '111111'))
+
+    def test_failed_send_is_retried_with_backoff(self):
+        """Test that a failure schedules a later attempt"""
+        OtpDelivery.objects.enqueue(PHONE, '123456')
+        before = timezone.now()
+
+        counts = self.deliver(StubGateway(failures=1))
+
+        self.assertEqual(counts['retried'], 1)
+        delivery = OtpDelivery.objects.get()
+        self.assertEqual(delivery.attempts, 1)
+        self.assertGreaterEqual(delivery.next_attempt, before + backoff(1))
+        self.assertEqual(self.deliver(StubGateway())['sent'], 0)
+
+        delivery.next_attempt = timezone.now()
+        delivery.save()
+        self.assertEqual(self.deliver(StubGateway())['sent'], 1)
+        self.assertEqual(StubGateway.outbox, [(PHONE, '123456')])
+
+    def test_delivery_fails_after_max_attempts(self):
+        """Test that a delivery is given up after the last attempt"""
+        OtpDelivery.objects.enqueue(PHONE, '123456')
+        gateway = StubGateway(failures=3)
+
+        for _ in range(3):
+            OtpDelivery.objects.update(next_attempt=timezone.now())
+            self.deliver(gateway)
+
+        delivery = OtpDelivery.objects.get()
+        self.assertEqual(delivery.status, 'f')
+        self.assertEqual(delivery.last_error, 'Stub gateway failure')
+        self.assertEqual(delivery.otp, '')
+
+    def test_expired_codes_are_not_sent(self):
+        """Test that codes older than their timeout are dropped"""
+        delivery = OtpDelivery.objects.enqueue(PHONE, '123456')
+        OtpDelivery.objects.filter(pk=delivery.pk).update(
+            create=timezone.now() - timedelta(hours=1),
+        )
+
+        counts = self.deliver(StubGateway())
+
+        self.assertEqual(counts['failed'], 1)
+        self.assertEqual(StubGateway.outbox, [])
+        self.assertEqual(OtpDelivery.objects.get().otp, '')
+
+    def test_backoff_doubles(self):
+        """Test that the retry delay doubles per attempt"""
+        self.assertEqual(backoff(1), timedelta(seconds=2))
+        self.assertEqual(backoff(3), timedelta(seconds=8))
+
+    @override_settings(OTP_GATEWAY='user.gateways.StubGateway')
+    def test_command_drains_queue(self):
+        """Test that the worker command sends every queued code"""
+        for number in range(7):
+            OtpDelivery.objects.enqueue(f'98936123456{number}', '123456')
+
+        call_command(
+            'deliver_otps', once=True, batch_size=3, stdout=StringIO(),
+        )
+
+        self.assertEqual(len(StubGateway.outbox), 7)
+        self.assertFalse(OtpDelivery.objects.filter(status='q').exists())
+
+    def test_clean_command_deletes_expired_deliveries(self):
+        """Test that deliveries of expired codes are deleted"""
+        old = OtpDelivery.objects.enqueue(PHONE, '123456')
+        OtpDelivery.objects.filter(pk=old.pk).update(
+            create=timezone.now() - timedelta(hours=1),
+        )
+        recent = OtpDelivery.objects.enqueue('989361234568', '123456')
+
+        call_command('clean_otps', stdout=StringIO())
+
+        self.assertEqual(list(OtpDelivery.objects.all()), [recent])
@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+USERS_URL = reverse('user:users')
+
+
+class UserSparseFieldsTests(TestCase):
+    """Test selecting the fields of users"""
+
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            phone='989000000000', password='pass',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_list_fields(self):
+        """Test that only the selected columns of users are read"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(USERS_URL, {'fields': 'id,phone'})
+
+        self.assertEqual(res.data['results'], [
+            {'id': self.admin.id, 'phone': '989000000000'},
+        ])
+        self.assertNotIn('first_name', queries[-1]['sql'])
+
+    def test_detail_exclude(self):
+        """Test that excluded fields are left out of a user detail"""
+        url = reverse('user:detail', args=[self.admin.id])
+
+        res = self.client.get(url, {'exclude': 'groups,user_permissions'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['phone'], '989000000000')
+        self.assertNotIn('groups', res.data)
+
+    def test_fields_are_ignored_on_update(self):
+        """Test that writes return every field"""
+        url = reverse('user:detail', args=[self.admin.id]) + '?fields=id'
+
+        res = self.client.patch(url, {'first_name': 'name'})
+
+        self.assertEqual(res.data['first_name'], 'name')
@@ -0,0 +1,71 @@
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from throttles import OtpIpThrottle, OtpPhoneThrottle, VerifyOtpThrottle
+
+
+REGISTER_URL = reverse('user:register')
+VERIFY_URL = reverse('user:verify')
+PHONE = '989361234567'
+
+
+@patch('user.views.send_otp')
+class OtpThrottleTests(TestCase):
+    """Test rate limits of the OTP endpoints"""
+
+    def setUp(self):
+        caches['throttle'].clear()
+        self.client = APIClient()
+
+    def test_register_throttled_per_phone(self, send_otp):
+        """Test that codes for one phone are limited before any query"""
+        with patch.object(OtpPhoneThrottle, 'rate', '2/hour', create=True):
+            for _ in range(2):
+                res = self.client.post(REGISTER_URL, {'phone': PHONE})
+                self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+            with self.assertNumQueries(0):
+                res = self.client.post(REGISTER_URL, {'phone': PHONE})
+
+            other = self.client.post(REGISTER_URL, {'phone': '989361234568'})
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(other.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(send_otp.call_count, 3)
+
+    def test_phone_spellings_share_limit(self, send_otp):
+        """Test that whitespace in a phone number gives no new budget"""
+        with patch.object(OtpPhoneThrottle, 'rate', '1/hour', create=True):
+            self.client.post(REGISTER_URL, {'phone': PHONE})
+            res = self.client.post(REGISTER_URL, {'phone': '98936 123 4567'})
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_register_throttled_per_address(self, send_otp):
+        """Test that one address can not request codes for many phones"""
+        with patch.object(OtpIpThrottle, 'rate', '2/hour', create=True):
+            self.client.post(REGISTER_URL, {'phone': '989361234567'})
+            self.client.post(REGISTER_URL, {'phone': '989361234568'})
+            res = self.client.post(REGISTER_URL, {'phone': '989361234569'})
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_verify_throttled_per_phone(self, send_otp):
+        """Test that codes of one phone can not be guessed endlessly"""
+        payload = {'phone': PHONE, 'code': '000000'}
+        with patch.object(VerifyOtpThrottle, 'rate', '3/hour', create=True):
+            for _ in range(3):
+                res = self.client.post(VERIFY_URL, payload)
+                self.assertNotEqual(
+                    res.status_code, status.HTTP_429_TOO_MANY_REQUESTS,
+                )
+            res = self.client.post(VERIFY_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', res)
@@ -1,3 +1,4 @@
+from django.core.cache import caches
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
@@ -20,6 +21,7 @@ class PublicUserApiTests(TestCase):
     """Test the users API (public)"""
 
     def setUp(self):
+        caches['throttle'].clear()
         self.client = APIClient()
 
     def test_create_valid_user_success(self):
@@ -97,6 +99,7 @@ class PrivateUserApiTests(TestCase):
     """Test API requests that require authentication"""
 
     def setUp(self):
+        caches['throttle'].clear()
         self.user = create_user(
             phone='989361234567',
             password='testpass',
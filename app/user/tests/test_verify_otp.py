@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import PhoneOtp
+from user.otp import get_code, save_code
+
+
+VERIFY_URL = reverse('user:verify')
+PHONE = '989361234567'
+OTHER_PHONE = '989361234568'
+
+
+class VerifyOtpApiTests(TestCase):
+    """Test verifying otp codes by phone number"""
+
+    def setUp(self):
+        caches['otp'].clear()
+        caches['throttle'].clear()
+        self.client = APIClient()
+        PhoneOtp.objects.create(phone=PHONE, otp='123456', count=2)
+
+    def test_verify_creates_user(self):
+        """Test that a correct code creates the user and returns tokens"""
+        save_code(PHONE, '123456')
+
+        res = self.client.post(VERIFY_URL, {'phone': PHONE, 'code': '123456'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data['created'])
+        self.assertIn('access', res.data)
+        self.assertTrue(get_user_model().objects.filter(phone=PHONE).exists())
+        self.assertIsNone(get_code(PHONE))
+        otp = PhoneOtp.objects.get(phone=PHONE)
+        self.assertTrue(otp.verify)
+        self.assertEqual(otp.count, 0)
+
+    def test_verify_requires_phone(self):
+        """Test that a code alone is rejected"""
+        save_code(PHONE, '123456')
+
+        res = self.client.post(VERIFY_URL, {'code': '123456'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_code_of_other_phone_is_rejected(self):
+        """Test that equal codes of different phones never collide"""
+        save_code(PHONE, '123456')
+        save_code(OTHER_PHONE, '654321')
+
+        res = self.client.post(
+            VERIFY_URL, {'phone': OTHER_PHONE, 'code': '123456'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+        self.assertFalse(
+            get_user_model().objects.filter(phone=OTHER_PHONE).exists()
+        )
+
+    def test_expired_code(self):
+        """Test that a phone without a stored code is told it expired"""
+        res = self.client.post(VERIFY_URL, {'phone': PHONE, 'code': '123456'})
+
+        self.assertEqual(res.status_code, status.HTTP_408_REQUEST_TIMEOUT)
+
+    def test_wrong_code_touches_no_table(self):
+        """Test that a wrong code is rejected without queries"""
+        save_code(PHONE, '123456')
+
+        with self.assertNumQueries(0):
+            res = self.client.post(
+                VERIFY_URL, {'phone': PHONE, 'code': '000000'},
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+
+    def test_two_step_password_is_checked(self):
+        """Test that users with a two step password must send it"""
+        user = get_user_model().objects.create_user(
+            phone=PHONE, password='testpass',
+        )
+        user.two_step_password = True
+        user.save()
+        save_code(PHONE, '123456')
+
+        res = self.client.post(
+            VERIFY_URL, {'phone': PHONE, 'code': '123456', 'password': 'x'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_406_NOT_ACCEPTABLE)
@@ -0,0 +1,141 @@
+"""
+JWT tokens carrying the claims the API authorizes with.
+
+Tokens issued by `ClaimsRefreshToken.for_user` include the role flags of
+the user, so `ClaimsJWTAuthentication` can authenticate requests without
+loading the user. When any of these flags change the user's tokens are
+revoked: the time of the change is saved as the user's
+`tokens_valid_after`, and tokens issued before it are refused until
+refreshed with new claims. Tokens of deleted or inactive users are
+always refused. The shared `auth` cache holds a read-through copy of the
+revocation time, so requests do not read the user. Copies are stored
+under a per-user version token that is replaced when the time changes, so
+a copy loaded before a revocation is never read after it.
+"""
+from calendar import timegm
+import math
+import threading
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+CLAIM_FIELDS = (
+    'is_active', 'is_superuser', 'is_staff', 'author', 'two_step_password',
+    'special_user',
+)
+
+
+class ClaimsRefreshToken(RefreshToken):
+
+    def set_iat(self, claim='iat', at_time=None):
+        # With microseconds, a token issued in the second of a revocation
+        # but before it is still refused.
+        at_time = at_time or self.current_time
+        self.payload[claim] = (
+            timegm(at_time.utctimetuple()) + at_time.microsecond / 1e6
+        )
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['is_superuser'] = user.is_superuser
+        token['is_staff'] = user.is_staff
+        token['author'] = user.author
+        token['two_step_password'] = user.two_step_password
+        token['special_user'] = int(user.special_user.timestamp())
+        return token
+
+
+def revocation_version_key(user_id):
+    return f'revoked:version:{user_id}'
+
+
+def revocation_key(user_id, version):
+    return f'revoked:{user_id}:{version}'
+
+
+def load_revocation(user_id):
+    """Return the time before which tokens of a user are refused"""
+    user = get_user_model().objects.filter(pk=user_id).values(
+        'is_active', 'tokens_valid_after',
+    ).first()
+    if user is None or not user['is_active']:
+        return math.inf
+    if user['tokens_valid_after'] is None:
+        return 0
+    return user['tokens_valid_after'].timestamp()
+
+
+class RevocationCache:
+    """Per-process copy of revocation times, kept for a few seconds
+
+    Most requests of a user arrive within a short time of each other, so
+    the shared cache is read once per user and interval, and the database
+    only when the shared cache has lost the entry.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def revoked_at(self, user_id):
+        now = time.monotonic()
+        entry = self.entries.get(user_id)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        key = revocation_key(user_id, self.version(user_id))
+        revoked_at = caches['auth'].get(key)
+        if revoked_at is None:
+            revoked_at = load_revocation(user_id)
+            caches['auth'].add(
+                key, revoked_at,
+                int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds()),
+            )
+        with self.lock:
+            if len(self.entries) >= 10000:
+                self.entries.clear()
+            self.entries[user_id] = (
+                now + settings.AUTH_STATE_CACHE_TIMEOUT, revoked_at,
+            )
+        return revoked_at
+
+    def version(self, user_id):
+        """Return the version token of a user's revocation time"""
+        key = revocation_version_key(user_id)
+        version = caches['auth'].get(key)
+        if version is None:
+            caches['auth'].add(key, uuid4().hex, None)
+            version = caches['auth'].get(key)
+        return version
+
+    def forget(self, user_id):
+        """Drop the copies of a user's revocation time after it changed"""
+        caches['auth'].set(revocation_version_key(user_id), uuid4().hex, None)
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+revocations = RevocationCache()
+
+
+def is_revoked(token, revoked_at=None):
+    """Return whether token was issued before the user's last change
+
+    revoked_at is read from the caches unless given.
+    """
+    if revoked_at is None:
+        user_id = token[api_settings.USER_ID_CLAIM]
+        revoked_at = revocations.revoked_at(user_id)
+    return token.get('iat', 0) < revoked_at
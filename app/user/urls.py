@@ -7,6 +7,7 @@ app_name = 'user'
 
 urlpatterns = [
     path('', views.UsersListApiView.as_view(), name='users'),
+    path('export/', views.UsersExportApiView.as_view(), name='export'),
     path('register/', views.UserRegisterApiView.as_view(), name='register'),
     path('login/', views.UserLoginApiView.as_view(), name='login'),
     path('verify/', views.VerifyOtpApiView.as_view(), name='verify'),
@@ -1,16 +1,24 @@
 from django.contrib.auth import get_user_model
-from django.core.cache import cache
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from django.http import StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
+
+from django_filters.rest_framework import DjangoFilterBackend
 
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework.generics import ListAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.filters import OrderingFilter
+from rest_framework.generics import (
+    GenericAPIView,
+    ListAPIView,
+    RetrieveUpdateDestroyAPIView,
+)
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
 
-from rest_framework_simplejwt.tokens import RefreshToken
+from user.tokens import ClaimsRefreshToken
 
 from user.serializers import (
     UsersListSerializer,
@@ -21,9 +29,15 @@ from user.serializers import (
     UserDetailUpdateDeleteSerializer,
     UserProfileSerializer,
 )
+from user.export import csv_lines
+from user.filters import UserSearchFilter
+from user.pagination import UserCursorPagination
 from user.send_otp import send_otp
+from user.otp import save_code, get_code, delete_code, record_sent
 from extensions.code_generator import otp_generator
+from extensions.sparse_fields import SparseFieldsMixin
 from permissions import IsSuperUser
+from throttles import OtpIpThrottle, OtpPhoneThrottle, VerifyOtpThrottle
 from core.models import PhoneOtp
 
 
@@ -31,6 +45,7 @@ class UserRegisterApiView(APIView):
     """Register user with phone number"""
 
     permission_classes = (AllowAny,)
+    throttle_classes = (OtpIpThrottle, OtpPhoneThrottle)
 
     def post(self, request):
         """Send mobile number for register"""
@@ -39,13 +54,6 @@ class UserRegisterApiView(APIView):
         if serializer.is_valid():
             phone = serializer.data.get('phone')
 
-            user_otp, _ = PhoneOtp.objects.get_or_create(phone=phone)
-            if user_otp.count >= 5:
-                return Response(
-                    {'Many Request': 'You requested too much.'},
-                    status=status.HTTP_429_TOO_MANY_REQUESTS,
-                )
-
             user_is_exists: bool = get_user_model().objects.filter(
                 phone=phone
             ).values('phone').exists()
@@ -57,11 +65,9 @@ class UserRegisterApiView(APIView):
                 )
 
             code = otp_generator()
-            user_otp.otp = code
-            cache.set(phone, code, 300)
+            save_code(phone, code)
             send_otp(phone=phone, otp=code)
-            user_otp.count += 1
-            user_otp.save(update_fields=['otp', 'count'])
+            record_sent(phone, code)
 
             context = {
                 "code sent": "The code has been sent to the phone number."
@@ -82,23 +88,13 @@ class UserLoginApiView(APIView):
     """Login user with phone number"""
 
     permission_classes = (AllowAny,)
+    throttle_classes = (OtpIpThrottle, OtpPhoneThrottle)
 
     def post(self, request):
         serializer = AuthenticationSerializer(data=request.data)
         if serializer.is_valid():
             phone = serializer.data.get("phone")
 
-            user_otp, _ = PhoneOtp.objects.get_or_create(
-                phone=phone,
-            )
-            if user_otp.count >= 5:
-                return Response(
-                    {
-                        "Many Request": "You requested too much.",
-                    },
-                    status=status.HTTP_429_TOO_MANY_REQUESTS,
-                )
-
             user_is_exists: bool = get_user_model().objects.filter(
                 phone=phone
             ).values("phone").exists()
@@ -112,11 +108,9 @@ class UserLoginApiView(APIView):
                 )
 
             code = otp_generator()
-            user_otp.otp = code
-            cache.set(phone, code, 300)
+            save_code(phone, code)
             send_otp(phone=phone, otp=code)
-            user_otp.count += 1
-            user_otp.save(update_fields=["otp", "count"])
+            record_sent(phone, code)
 
             context = {
                 "code sent": "The code has been sent to the phone number.",
@@ -133,70 +127,57 @@ class UserLoginApiView(APIView):
 
 
 class VerifyOtpApiView(APIView):
-    """Verify otp code and register user"""
+    """Verify otp code and register user
+
+    The code is looked up by the phone it was sent to, with one read of
+    the OTP store, so codes of different phones can never be confused.
+    """
 
     permission_classes = (AllowAny,)
-    confirm_for_authentication = False
+    throttle_classes = (VerifyOtpThrottle,)
 
     def post(self, request):
         serializer = OtpSerializer(data=request.data)
         if serializer.is_valid():
+            phone = serializer.data.get('phone')
             received_code = serializer.data.get('code')
-            query = PhoneOtp.objects.filter(otp=received_code)
+            code_in_cache = get_code(phone)
 
-            if not query.exists():
+            if code_in_cache is None:
                 return Response(
-                    {'Incorrect code": "The code entered is incorrect.'},
-                    status=status.HTTP_406_NOT_ACCEPTABLE,
+                    {'Code expired': 'The entered code has expired.'},
+                    status=status.HTTP_408_REQUEST_TIMEOUT,
                 )
 
-            object = query.first()
-            code_in_cache = cache.get(object.phone)
+            if not constant_time_compare(code_in_cache, received_code):
+                return Response(
+                    {'Incorrect code': 'The code entered is incorrect.'},
+                    status=status.HTTP_406_NOT_ACCEPTABLE,
+                )
 
-            if code_in_cache is not None:
-                if code_in_cache == received_code:
-                    user, created = get_user_model().objects.get_or_create(
-                        phone=object.phone
-                    )
-                    if user.two_step_password:
-                        password = serializer.data.get('password')
-                        check_password = user.check_password(password)
-                        if check_password:
-                            self.confirm_for_authentication = True
-                        else:
-                            return Response(
-                                {
-                                    'Incorrect password": "Password is incorrect.'
-                                },
-                                status=status.HTTP_406_NOT_ACCEPTABLE,
-                            )
-                    else:
-                        self.confirm_for_authentication = True
-
-                    if self.confirm_for_authentication:
-                        refresh = RefreshToken.for_user(user)
-                        cache.delete(object.phone)
-                        object.verify, object.count = True, 0
-                        object.save(update_fields=['verify', 'count'])
-                        context = {
-                            'created': created,
-                            'refresh': str(refresh),
-                            'access': str(refresh.access_token),
-                        }
-                        return Response(
-                            context,
-                            status=status.HTTP_200_OK,
-                        )
-                else:
+            user, created = get_user_model().objects.get_or_create(
+                phone=phone
+            )
+            if user.two_step_password:
+                password = serializer.data.get('password')
+                if not user.check_password(password):
                     return Response(
-                        {'Incorrect code': 'The code entered is incorrect.'},
+                        {'Incorrect password': 'Password is incorrect.'},
                         status=status.HTTP_406_NOT_ACCEPTABLE,
                     )
-            else:
-                return Response(
-                    {'Code expired': 'The entered code has expired.'},
-                    status=status.HTTP_408_REQUEST_TIMEOUT,
-                )
+
+            refresh = ClaimsRefreshToken.for_user(user)
+            delete_code(phone)
+            PhoneOtp.objects.filter(phone=phone).update(verify=True, count=0)
+            context = {
+                'created': created,
+                'refresh': str(refresh),
+                'access': str(refresh.access_token),
+            }
+            return Response(
+                context,
+                status=status.HTTP_200_OK,
+            )
         else:
             return Response(
                 serializer.errors,
@@ -207,7 +188,7 @@ class VerifyOtpApiView(APIView):
 class CreateTwoStepPasswordApiView(APIView):
     """Send a password to create two step password"""
 
-    permission_classes = (AllowAny,)
+    permission_classes = (IsAuthenticated,)
 
     def post(self, request):
         if not request.user.two_step_password:
@@ -282,18 +263,54 @@ class ChangeTwoStepPasswordApiView(APIView):
         )
 
 
-class UsersListApiView(ListAPIView):
-    """Returns a list of all existing users"""
+class UsersListApiView(SparseFieldsMixin, ListAPIView):
+    """Returns a page of existing users
+
+    `?search=` matches a phone prefix or a part of a name and `?fields=`
+    or `?exclude=` select the fields of each user.
+    """
 
     serializer_class = UsersListSerializer
     permission_classes = (IsSuperUser,)
+    pagination_class = UserCursorPagination
+    filter_backends = (DjangoFilterBackend, UserSearchFilter, OrderingFilter)
+    filterset_fields = ('author',)
+    ordering_fields = ('id',)
+    ordering = ('id',)
+    queryset = get_user_model().objects.only(*UsersListSerializer.Meta.fields)
+
+    def get_queryset(self):
+        return self.get_sparse_queryset(super().get_queryset())
+
+
+class UsersExportApiView(GenericAPIView):
+    """Streams all users matching the list filters as CSV
+
+    Rows are read from the database in chunks while they are sent, so
+    the export never holds the whole table in memory.
+    """
+
+    permission_classes = (IsSuperUser,)
+    filter_backends = (DjangoFilterBackend, UserSearchFilter)
     filterset_fields = ('author',)
-    search_fields = ('phone', 'first_name', 'last_name')
-    ordering_fields = ('id', 'author')
     queryset = get_user_model().objects.all()
+    columns = ('id', 'phone', 'first_name', 'last_name', 'author',
+               'date_joined')
+    chunk_size = 2000
+
+    def get(self, request):
+        rows = self.filter_queryset(self.get_queryset()).order_by(
+            'id'
+        ).values_list(*self.columns).iterator(chunk_size=self.chunk_size)
+        response = StreamingHttpResponse(
+            csv_lines(self.columns, rows), content_type='text/csv',
+        )
+        response['Content-Disposition'] = 'attachment; filename="users.csv"'
+        return response
 
 
-class UserDetailUpdateDeleteApiView(RetrieveUpdateDestroyAPIView):
+class UserDetailUpdateDeleteApiView(SparseFieldsMixin,
+                                    RetrieveUpdateDestroyAPIView):
     """Retrieve detail, update and delete user instance"""
 
     serializer_class = UserDetailUpdateDeleteSerializer
@@ -301,7 +318,9 @@ class UserDetailUpdateDeleteApiView(RetrieveUpdateDestroyAPIView):
 
     def get_object(self):
         pk = self.kwargs.get('pk')
-        user = get_object_or_404(get_user_model(), pk=pk)
+        user = get_object_or_404(
+            self.get_sparse_queryset(get_user_model().objects.all()), pk=pk,
+        )
         return user
 
 
@@ -312,4 +331,4 @@ class UserProfileApiView(RetrieveUpdateDestroyAPIView):
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
-        return self.request.user
+        return get_object_or_404(get_user_model(), pk=self.request.user.pk)
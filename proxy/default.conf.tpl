@@ -5,6 +5,13 @@ server {
     alias /vol/static;
   }
 
+  # Image chunks are limited to UPLOAD_CHUNK_SIZE by the app
+  location /api/blog/uploads/ {
+    uwsgi_pass    ${APP_HOST}:${APP_PORT}
+    include       /etc/nginx/uwsgi_pass;
+    client_max_body_size    1M;
+  }
+
   location / {
     uwsgi_pass    ${APP_HOST}:${APP_PORT}
     include       /etc/nginx/uwsgi_pass;